@@ -0,0 +1,93 @@
+"""Оценка базиса спот - фьючерс с учетом финансирования на синтетической вселенной.
+
+Запуск: python -m crypto_arbitrage.benchmarks.basis --symbols 3000 [--json]
+"""
+import argparse
+import json
+import random
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+
+from ..core.basis import BasisScanner
+from ..core.data_processor import PriceBook
+from ..exchanges.base_exchange import FundingColumns
+
+VENUES = ('Binance', 'KuCoin', 'Bybit', 'Mexc', 'Okx', 'Htx', 'Bitget', 'Bingx', 'Gate', 'Lbank', 'Coinw')
+SPOT_LISTING = 0.6
+FUTURES_LISTING = 0.4
+SPREAD = 0.0005
+NOISE = 0.002
+
+
+def make_inputs(symbols: int, seed: int = 1) -> Tuple[PriceBook, Dict[str, FundingColumns]]:
+    """Книга спота и бессрочных контрактов и ставки финансирования по всем биржам"""
+    rng = random.Random(seed)
+    now = time.time()
+    book = PriceBook(VENUES, capacity=symbols)
+    funding = {}
+    for venue in VENUES:
+        listed, rates, next_times, intervals = [], [], [], []
+        for i in range(symbols):
+            symbol = f"C{i}/USDT"
+            mid = 10 ** rng.uniform(-4, 3)
+            if rng.random() < SPOT_LISTING:
+                spot = mid * (1 + rng.gauss(0, NOISE))
+                book.upsert(symbol, venue, 'spot', spot * (1 - SPREAD), spot * (1 + SPREAD), timestamp=now)
+            if rng.random() < FUTURES_LISTING:
+                perp = mid * (1 + rng.gauss(0, NOISE))
+                book.upsert(symbol, venue, 'futures', perp * (1 - SPREAD), perp * (1 + SPREAD), timestamp=now)
+                interval = rng.choice((1.0, 4.0, 8.0))
+                listed.append(symbol)
+                rates.append(rng.gauss(0.0001, 0.0003))
+                next_times.append(now + rng.uniform(0, interval * 3600))
+                intervals.append(interval)
+        funding[venue] = FundingColumns(listed, np.array(rates), np.array(next_times), np.array(intervals), now)
+    return book, funding
+
+
+def run(symbols: int, repeat: int) -> Dict:
+    book, funding = make_inputs(symbols)
+    view = book.view()
+    scanner = BasisScanner(VENUES, {venue: {'spot': 0.1, 'futures': 0.05} for venue in VENUES})
+
+    started = time.perf_counter()
+    scanner.scan(view, funding, 1000, 10.0)
+    first = time.perf_counter() - started
+
+    timings = []
+    trades = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        trades = scanner.scan(view, funding, 1000, 10.0)
+        timings.append(time.perf_counter() - started)
+
+    return {
+        'meta': {'symbols': symbols, 'venues': len(VENUES), 'quotes': book.quote_count(), 'repeat': repeat},
+        'first_ms': 1000 * first,
+        'scan_ms': 1000 * min(timings),
+        'trades': len(trades),
+        'best_carry_apr': trades[0]['carry_apr'] if trades else None
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=3000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help='вывод в JSON')
+    args = parser.parse_args(argv)
+
+    result = run(args.symbols, args.repeat)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    meta = result['meta']
+    print(f"{meta['venues']} venues, {meta['quotes']} quotes")
+    print(f"first scan {result['first_ms']:.1f} ms  scan {result['scan_ms']:.1f} ms  {result['trades']} trades")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
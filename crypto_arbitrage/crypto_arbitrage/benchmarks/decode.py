@@ -0,0 +1,90 @@
+"""Сравнение разбора ответов: json + словарные парсеры против быстрого decode + колоночного разбора.
+
+Запуск: python -m crypto_arbitrage.benchmarks.decode --symbols 5000 [--json]
+"""
+import argparse
+import asyncio
+import json
+from typing import Dict
+
+import numpy as np
+
+from ..exchanges import get_exchange
+from ..exchanges.base_exchange import _json_loads
+from .payloads import make_payloads
+from .pipeline import _timed
+
+
+def _legacy_fetch(body: bytes):
+    """Прежний fetch_data: response.json() поверх стандартного модуля json"""
+    async def fetch_data(url: str, params=None):
+        return json.loads(body)
+    return fetch_data
+
+
+def _same(prices: Dict[str, Dict], columns) -> bool:
+    """Колоночный разбор дает те же символы и цены, что и словарный парсер"""
+    fast = dict(zip(columns.symbols, zip(columns.bid.tolist(), columns.ask.tolist())))
+    return fast == {symbol: (quote['bid'], quote['ask']) for symbol, quote in prices.items()}
+
+
+def run(symbols: int, repeat: int) -> Dict:
+    loop = asyncio.new_event_loop()
+    results = {}
+    adapters = {}
+    try:
+        for (venue, market_type), payload in make_payloads(symbols).items():
+            adapter = adapters.get(venue) or adapters.setdefault(venue, get_exchange(venue))
+            body = json.dumps(payload).encode()
+            adapter.fetch_data = _legacy_fetch(body)
+            parser = adapter.get_futures_prices if market_type == 'futures' else adapter.get_spot_prices
+
+            legacy, prices = _timed(lambda: loop.run_until_complete(parser()), repeat)
+            fast, columns = _timed(lambda: adapter.parse_columns(adapter.decode(body), market_type), repeat)
+            stdlib_decode, _ = _timed(lambda: json.loads(body), repeat)
+            fast_decode, _ = _timed(lambda: adapter.decode(body), repeat)
+
+            results[f"{venue}:{market_type}"] = {
+                'body_kb': len(body) / 1024,
+                'quotes': len(columns.symbols),
+                'identical': _same(prices, columns),
+                'legacy_ms': legacy['min_ms'],
+                'fast_ms': fast['min_ms'],
+                'speedup': legacy['min_ms'] / fast['min_ms'],
+                'stdlib_decode_ms': stdlib_decode['min_ms'],
+                'fast_decode_ms': fast_decode['min_ms']
+            }
+    finally:
+        for adapter in adapters.values():
+            loop.run_until_complete(adapter.close())
+        loop.close()
+
+    return {
+        'meta': {'symbols': symbols, 'repeat': repeat, 'decoder': _json_loads.__module__ or 'json',
+                 'numpy': np.__version__},
+        'venues': results
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help='вывод в JSON')
+    args = parser.parse_args(argv)
+
+    result = run(args.symbols, args.repeat)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"{args.symbols} symbols per response, decoder: {result['meta']['decoder']}")
+    for slot, row in result['venues'].items():
+        mark = '' if row['identical'] else '  MISMATCH'
+        print(f"{slot:>16}: json+dict {row['legacy_ms']:7.2f} ms  fast {row['fast_ms']:7.2f} ms  "
+              f"x{row['speedup']:4.1f}  (decode {row['stdlib_decode_ms']:6.2f} -> {row['fast_decode_ms']:6.2f} ms)"
+              f"{mark}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""Запись суток котировок и возможностей в хранилище истории и выборки из него.
+
+Запуск: python -m crypto_arbitrage.benchmarks.history --symbols 300 --period 15 [--json]
+"""
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+from ..core.data_processor import MARKET_TYPES, PriceBookView
+from ..utils.history import HistoryReader, HistoryStore, opportunity_runs
+
+VENUES = ('Binance', 'KuCoin', 'Bybit', 'Mexc', 'Okx', 'Htx', 'Bitget', 'Bingx', 'Gate', 'Lbank', 'Coinw')
+DAY = 86400
+CHANGED = 0.5  # доля котировок, изменившихся за цикл
+OPPORTUNITIES = 20  # возможностей за цикл
+
+
+def write_day(store: HistoryStore, symbols: int, period: float, start: float, seed: int = 1) -> Dict:
+    """Сутки циклов с периодом period: изменившиеся котировки и возможности, сброс сегмента раз в 5 минут"""
+    rng = np.random.default_rng(seed)
+    names = tuple(f"C{i}/USDT" for i in range(symbols))
+    shape = (symbols, len(VENUES), len(MARKET_TYPES))
+    mid = 10 ** rng.uniform(-4, 3, size=(symbols, 1, 1)) * np.ones(shape)
+    picker = random.Random(seed)
+
+    append, cycles = [], int(DAY / period)
+    for cycle in range(cycles):
+        now = start + cycle * period
+        moved = rng.random(shape) < CHANGED
+        mid = np.where(moved, mid * (1 + rng.normal(0, 0.0005, shape)), mid)
+        view = PriceBookView(names, VENUES, mid * 0.9995, mid * 1.0005, mid, mid, np.full(shape, now))
+        opportunities = [{
+            'symbol': names[picker.randrange(min(symbols, 50))],
+            'buy_exchange': picker.choice(VENUES), 'sell_exchange': picker.choice(VENUES),
+            'buy_market_type': 'spot', 'sell_market_type': picker.choice(MARKET_TYPES),
+            'buy_price': 1.0, 'sell_price': 1.01, 'spread_percent': 1.0, 'profit_amount': 10.0
+        } for _ in range(OPPORTUNITIES)]
+
+        started = time.perf_counter()
+        store.append_quotes(view)
+        store.append_opportunities(opportunities, timestamp=now)
+        append.append(time.perf_counter() - started)
+        if (cycle + 1) % max(int(300 / period), 1) == 0:
+            store.flush()
+    store.flush()
+    return {'cycles': cycles, 'append_ms_median': 1000 * float(np.median(append))}
+
+
+def run(symbols: int, period: float, directory: str = None) -> Dict:
+    root = Path(directory or tempfile.mkdtemp(prefix='history-bench-'))
+    try:
+        start = (time.time() // DAY - 1) * DAY
+        store = HistoryStore(str(root))
+        started = time.perf_counter()
+        written = write_day(store, symbols, period, start)
+        write = time.perf_counter() - started
+        store.close()
+        size = sum(path.stat().st_size for path in root.rglob('*.seg'))
+
+        reader = HistoryReader(str(root))
+        queries = {}
+        for name, query in (
+            ('pair_day', lambda: reader.quotes(start, start + DAY, 'C7/USDT')),
+            ('pair_venue_day', lambda: reader.quotes(start, start + DAY, 'C7/USDT', 'Okx', 'futures')),
+            ('pair_hour', lambda: reader.quotes(start + 3600, start + 7200, 'C7/USDT')),
+            ('opportunities_day', lambda: reader.opportunities(start, start + DAY, 'C7/USDT')),
+        ):
+            timings = []
+            for _ in range(3):
+                began = time.perf_counter()
+                rows = len(query()['time'])
+                timings.append(time.perf_counter() - began)
+            queries[name] = {'rows': rows, 'ms': 1000 * min(timings)}
+
+        began = time.perf_counter()
+        runs = opportunity_runs(reader.opportunities(start, start + DAY), 2 * period)
+        queries['runs_day'] = {'rows': len(runs['duration']), 'ms': 1000 * (time.perf_counter() - began)}
+
+        return {
+            'meta': {'symbols': symbols, 'venues': len(VENUES), 'period': period, **written},
+            'quotes': store.stats['quotes'],
+            'opportunities': store.stats['opportunities'],
+            'segments': store.stats['segments'],
+            'dropped': store.stats['dropped'],
+            'write_s': write,
+            'bytes': size,
+            'bytes_per_quote': size / max(store.stats['quotes'], 1),
+            'queries': queries
+        }
+    finally:
+        if directory is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=300)
+    parser.add_argument('--period', type=float, default=15.0, help='период цикла скана, секунд')
+    parser.add_argument('--directory', help='каталог хранилища (по умолчанию временный, удаляется)')
+    parser.add_argument('--json', action='store_true', help='вывод в JSON')
+    args = parser.parse_args(argv)
+
+    result = run(args.symbols, args.period, args.directory)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    meta = result['meta']
+    print(f"{meta['cycles']} cycles, {result['quotes']} quotes, {result['opportunities']} opportunities "
+          f"in {result['segments']} segments, {result['bytes'] / 2 ** 20:.1f} MiB "
+          f"({result['bytes_per_quote']:.1f} bytes/quote), written in {result['write_s']:.1f}s, "
+          f"append median {meta['append_ms_median']:.2f} ms, dropped {result['dropped']}")
+    for name, query in result['queries'].items():
+        print(f"{name:18} {query['rows']:8d} rows  {query['ms']:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
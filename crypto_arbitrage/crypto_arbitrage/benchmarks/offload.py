@@ -0,0 +1,108 @@
+"""Простои цикла событий при разборе ответов: на месте против пула процессов.
+
+Запуск: python -m crypto_arbitrage.benchmarks.offload --symbols 5000 [--json]
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict
+
+from ..exchanges import get_exchange
+from ..exchanges.parse_pool import parse_pool
+from ..utils.loop_monitor import LoopMonitor
+from .payloads import make_payloads
+
+
+def _serve_body(body: bytes):
+    """Замена fetch_body адаптера, отдающая готовое тело без сети"""
+    async def fetch_body(url: str, params=None):
+        return body
+    return fetch_body
+
+
+async def _cycle(adapters: Dict, min_bytes: int, repeat: int) -> Dict:
+    """Разбор всех ответов параллельно, как в цикле сбора цен, под замером простоев"""
+    parse_pool.min_bytes = min_bytes
+    monitor = LoopMonitor(interval=0.01, threshold=0.0)
+    monitor.start()
+    await asyncio.sleep(monitor.interval * 2)
+    monitor.take()
+
+    started = time.perf_counter()
+    columns = None
+    for _ in range(repeat):
+        columns = await asyncio.gather(*(adapter.get_price_columns(market_type)
+                                         for (_, market_type), adapter in adapters.items()))
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(monitor.interval * 2)
+    stats = monitor.take()
+    await monitor.stop()
+    return {
+        'cycle_ms': 1000 * elapsed / repeat,
+        'max_stall_ms': 1000 * stats['max_stall'],
+        'stalled_ms': 1000 * stats['stalled'] / repeat,
+        'quotes': sum(len(result.symbols) for result in columns),
+        'symbols': [result.symbols for result in columns]
+    }
+
+
+async def _run(symbols: int, repeat: int) -> Dict:
+    adapters, sizes = {}, {}
+    for (venue, market_type), payload in make_payloads(symbols).items():
+        adapter = get_exchange(venue)
+        if market_type not in adapter.TICKER_SPECS:
+            continue
+        body = json.dumps(payload).encode()
+        adapter.fetch_body = _serve_body(body)
+        adapters[(venue, market_type)] = adapter
+        sizes[f"{venue}:{market_type}"] = len(body)
+
+    await parse_pool.start()
+    try:
+        inline = await _cycle(adapters, 1 << 62, repeat)
+        pooled = await _cycle(adapters, 0, repeat)
+    finally:
+        parse_pool.shutdown()
+        for adapter in adapters.values():
+            await adapter.close()
+
+    identical = inline.pop('symbols') == pooled.pop('symbols')
+    return {
+        'meta': {'symbols': symbols, 'repeat': repeat, 'slots': len(adapters), 'workers': parse_pool.workers,
+                 'body_mb': sum(sizes.values()) / 2 ** 20},
+        'inline': inline,
+        'pool': pooled,
+        'identical': identical
+    }
+
+
+def run(symbols: int, repeat: int) -> Dict:
+    return asyncio.run(_run(symbols, repeat))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help='вывод в JSON')
+    args = parser.parse_args(argv)
+
+    result = run(args.symbols, args.repeat)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    meta = result['meta']
+    print(f"{meta['slots']} responses x {meta['symbols']} symbols ({meta['body_mb']:.1f} MB), "
+          f"{meta['workers']} workers, {meta['repeat']} runs")
+    for mode in ('inline', 'pool'):
+        row = result[mode]
+        print(f"{mode:>8}: cycle {row['cycle_ms']:8.2f} ms  loop stalled {row['stalled_ms']:8.2f} ms  "
+              f"max stall {row['max_stall_ms']:7.2f} ms")
+    if not result['identical']:
+        print("MISMATCH: pool and inline results differ")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,188 @@
+"""Синтетические ответы REST API бирж в формате, который ожидают адаптеры.
+
+Каждый генератор получает список котировок (base, bid, ask, bid_size, ask_size)
+и возвращает объект, совпадающий по структуре с ответом биржи после json().
+"""
+import random
+import string
+from typing import Any, Callable, Dict, List, Tuple
+
+Quote = Tuple[str, float, float, float, float]  # (base, bid, ask, bid_size, ask_size)
+
+
+def _s(value: float) -> str:
+    """Биржи отдают цены строками"""
+    return f"{value:.8g}"
+
+
+def _binance(quotes: List[Quote]) -> Any:
+    return [{'symbol': f"{b}USDT", 'bidPrice': _s(bid), 'bidQty': _s(bs), 'askPrice': _s(ask), 'askQty': _s(az)}
+            for b, bid, ask, bs, az in quotes]
+
+
+def _bybit(category: str) -> Callable[[List[Quote]], Any]:
+    def build(quotes: List[Quote]) -> Any:
+        return {'retCode': 0, 'retMsg': 'OK', 'result': {'category': category, 'list': [
+            {'symbol': f"{b}USDT", 'bid1Price': _s(bid), 'bid1Size': _s(bs), 'ask1Price': _s(ask),
+             'ask1Size': _s(az), 'lastPrice': _s((bid + ask) / 2)}
+            for b, bid, ask, bs, az in quotes
+        ]}}
+    return build
+
+
+def _kucoin_spot(quotes: List[Quote]) -> Any:
+    return {'code': '200000', 'data': {'time': 0, 'ticker': [
+        {'symbol': f"{b}-USDT", 'buy': _s(bid), 'sell': _s(ask), 'volValue': _s(bs * bid)}
+        for b, bid, ask, bs, az in quotes
+    ]}}
+
+
+def _kucoin_futures(quotes: List[Quote]) -> Any:
+    return {'code': '200000', 'data': [
+        {'symbol': f"{b}USDTM", 'bestBidPrice': _s(bid), 'bestAskPrice': _s(ask), 'size': int(bs)}
+        for b, bid, ask, bs, az in quotes
+    ]}
+
+
+def _mexc_futures(quotes: List[Quote]) -> Any:
+    return {'success': True, 'code': 0, 'data': [
+        {'symbol': f"{b}_USDT", 'bid1': bid, 'ask1': ask, 'lastPrice': (bid + ask) / 2}
+        for b, bid, ask, bs, az in quotes
+    ]}
+
+
+def _okx(suffix: str) -> Callable[[List[Quote]], Any]:
+    def build(quotes: List[Quote]) -> Any:
+        return {'code': '0', 'msg': '', 'data': [
+            {'instId': f"{b}-USDT{suffix}", 'bidPx': _s(bid), 'bidSz': _s(bs), 'askPx': _s(ask), 'askSz': _s(az)}
+            for b, bid, ask, bs, az in quotes
+        ]}
+    return build
+
+
+def _htx_spot(quotes: List[Quote]) -> Any:
+    return {'status': 'ok', 'data': [
+        {'symbol': f"{b.lower()}usdt", 'bid': bid, 'bidSize': bs, 'ask': ask, 'askSize': az}
+        for b, bid, ask, bs, az in quotes
+    ]}
+
+
+def _htx_futures(quotes: List[Quote]) -> Any:
+    return {'status': 'ok', 'tick': [
+        {'symbol': f"{b}-USDT", 'bid': [bid, bs], 'ask': [ask, az]}
+        for b, bid, ask, bs, az in quotes
+    ]}
+
+
+def _bitget_spot(quotes: List[Quote]) -> Any:
+    return {'code': '00000', 'data': [
+        {'symbol': f"{b}USDT", 'buyOne': _s(bid), 'sellOne': _s(ask), 'bidSz': _s(bs), 'askSz': _s(az)}
+        for b, bid, ask, bs, az in quotes
+    ]}
+
+
+def _bitget_futures(quotes: List[Quote]) -> Any:
+    return {'code': '00000', 'data': [
+        {'symbol': f"{b}USDT_UMCBL", 'bestBid': _s(bid), 'bestAsk': _s(ask), 'bidSz': _s(bs), 'askSz': _s(az)}
+        for b, bid, ask, bs, az in quotes
+    ]}
+
+
+def _bingx(quotes: List[Quote]) -> Any:
+    return {'code': 0, 'data': [
+        {'symbol': f"{b}-USDT", 'bidPrice': _s(bid), 'bidQty': _s(bs), 'askPrice': _s(ask), 'askQty': _s(az)}
+        for b, bid, ask, bs, az in quotes
+    ]}
+
+
+def _gate_spot(quotes: List[Quote]) -> Any:
+    return [{'currency_pair': f"{b}_USDT", 'highest_bid': _s(bid), 'lowest_ask': _s(ask), 'last': _s(bid)}
+            for b, bid, ask, bs, az in quotes]
+
+
+def _gate_futures(quotes: List[Quote]) -> Any:
+    return [{'contract': f"{b}_USDT", 'bid1_price': _s(bid), 'bid1_size': int(bs),
+             'ask1_price': _s(ask), 'ask1_size': int(az)}
+            for b, bid, ask, bs, az in quotes]
+
+
+def _lbank(quotes: List[Quote]) -> Any:
+    return [{'symbol': f"{b.lower()}_usdt", 'timestamp': 0,
+             'ticker': {'bid': _s(bid), 'ask': _s(ask), 'bidVol': _s(bs), 'askVol': _s(az)}}
+            for b, bid, ask, bs, az in quotes]
+
+
+def _coinw(quotes: List[Quote]) -> Any:
+    return {'code': '200', 'data': {
+        f"{b}_USDT": {'highestBid': _s(bid), 'lowestAsk': _s(ask), 'last': _s(bid)}
+        for b, bid, ask, bs, az in quotes
+    }}
+
+
+# (имя адаптера, тип рынка) -> генератор ответа
+PAYLOADS: Dict[Tuple[str, str], Callable[[List[Quote]], Any]] = {
+    ('binance', 'spot'): _binance,
+    ('binance', 'futures'): _binance,
+    ('bybit', 'spot'): _bybit('spot'),
+    ('bybit', 'futures'): _bybit('linear'),
+    ('kucoin', 'spot'): _kucoin_spot,
+    ('kucoin', 'futures'): _kucoin_futures,
+    ('mexc', 'spot'): _binance,
+    ('mexc', 'futures'): _mexc_futures,
+    ('okx', 'spot'): _okx(''),
+    ('okx', 'futures'): _okx('-SWAP'),
+    ('htx', 'spot'): _htx_spot,
+    ('htx', 'futures'): _htx_futures,
+    ('bitget', 'spot'): _bitget_spot,
+    ('bitget', 'futures'): _bitget_futures,
+    ('bingx', 'spot'): _bingx,
+    ('bingx', 'futures'): _bingx,
+    ('gate', 'spot'): _gate_spot,
+    ('gate', 'futures'): _gate_futures,
+    ('lbank', 'spot'): _lbank,
+    ('coinw', 'spot'): _coinw,
+}
+
+
+def base_names(count: int) -> List[str]:
+    """Уникальные буквенные тикеры вида XAAB"""
+    letters = string.ascii_uppercase
+    names = []
+    for i in range(count):
+        name, n = '', i
+        while True:
+            name = letters[n % 26] + name
+            n //= 26
+            if not n:
+                break
+        names.append('X' + name.rjust(3, 'A'))
+    return names
+
+
+def make_quotes(symbols: int, venues: List[str], coverage: float = 0.8, spread: float = 0.002,
+                dispersion: float = 0.0005, outliers: float = 0.01, seed: int = 1) -> Dict[str, List[Quote]]:
+    """Котировки по биржам: общая средняя цена символа, небольшое расхождение между биржами
+    и редкие выбросы, которые дают возможности выше порога"""
+    rnd = random.Random(seed)
+    names = base_names(symbols)
+    mids = [10 ** rnd.uniform(-4, 4) for _ in names]
+    result = {}
+    for venue in venues:
+        quotes = []
+        for name, mid in zip(names, mids):
+            if rnd.random() > coverage:
+                continue
+            deviation = rnd.uniform(-0.03, 0.03) if rnd.random() < outliers else rnd.gauss(0, dispersion)
+            venue_mid = mid * (1 + deviation)
+            half = venue_mid * spread * rnd.uniform(0.1, 1) / 2
+            quotes.append((name, venue_mid - half, venue_mid + half, rnd.uniform(1, 1000), rnd.uniform(1, 1000)))
+        result[venue] = quotes
+    return result
+
+
+def make_payloads(symbols: int, seed: int = 1, coverage: float = 0.8) -> Dict[Tuple[str, str], Any]:
+    """Ответы всех поддерживаемых (биржа, тип рынка) для заданного числа символов"""
+    slots = list(PAYLOADS)
+    quotes = make_quotes(symbols, [f"{venue}:{market_type}" for venue, market_type in slots],
+                         coverage=coverage, seed=seed)
+    return {slot: PAYLOADS[slot](quotes[f"{slot[0]}:{slot[1]}"]) for slot in slots}
\ No newline at end of file
@@ -0,0 +1,261 @@
+"""Нагрузочный тест пути parse -> normalize -> merge -> scan по стадиям.
+
+Рабочий путь: тело ответа -> колоночный разбор (columns) -> upsert_many (merge) -> скан.
+Разбор в словари (parse, normalize_pair, merge_dict) остается для адаптеров без TICKER_SPECS.
+
+Запуск: python -m crypto_arbitrage.benchmarks.pipeline --symbols 5000 --json
+Сравнение с сохраненной базой: --baseline crypto_arbitrage/benchmarks/baseline.json
+Обновление базы: --save-baseline crypto_arbitrage/benchmarks/baseline.json
+
+Отдельно замеряется память колоночного разбора (tracemalloc) без индекса вселенной и с ним (keep)
+на более редком листинге (--keep-coverage), где часть символов не с чем составить в пару;
+с базой этот замер не сравнивается.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from ..config import config
+from ..core.arbitrage_engine import ArbitrageEngine
+from ..exchanges import get_exchange
+from .payloads import make_payloads
+
+DEFAULT_BASELINE = Path(__file__).with_name('baseline.json')
+
+
+def _serve(payload: Any) -> Callable:
+    """Замена fetch_data адаптера, отдающая готовый ответ без сети"""
+    async def fetch_data(url: str, params=None):
+        return payload
+    return fetch_data
+
+
+def _serve_body(body: bytes) -> Callable:
+    """Замена fetch_body адаптера для колоночного разбора"""
+    async def fetch_body(url: str, params=None):
+        return body
+    return fetch_body
+
+
+def _timed(func: Callable[[], Any], repeat: int) -> Tuple[Dict[str, float], Any]:
+    func()  # прогрев
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return {'min_ms': 1000 * min(timings), 'median_ms': 1000 * statistics.median(timings)}, result
+
+
+def _peak(func: Callable[[], Any]) -> Tuple[int, Any]:
+    """Пик памяти за вызов в байтах"""
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, result
+
+
+def keep_memory(symbols: int, coverage: float) -> Dict[str, Dict[str, float]]:
+    """Пик памяти разбора уже декодированного ответа каждого слота без фильтра и с фильтром keep"""
+    payloads = make_payloads(symbols, coverage=coverage)
+    engine = ArbitrageEngine()
+    engine_names = {name.lower(): name for name in engine.exchanges_config}
+    adapters = {venue: get_exchange(venue) for venue, _ in payloads}
+    engine.set_exchanges([engine_names[venue] for venue in adapters])
+    engine.set_analysis_types(True, True, True)
+
+    # Индекс вселенной по листингам всех слотов, как после первого цикла сбора
+    for (venue, market_type), payload in payloads.items():
+        columns = adapters[venue].parse_columns(payload, market_type)
+        engine.universe.update(engine_names[venue], market_type, columns.symbols)
+    # Слоты без синтетического ответа листят пустой набор, иначе индекс не готов
+    for venue, market_type in engine.universe.slots - set(engine.universe.listings):
+        engine.universe.update(venue, market_type, ())
+    engine.universe.refresh()
+
+    memory = {}
+    for (venue, market_type), payload in payloads.items():
+        parse = adapters[venue].parse_columns
+        keep = engine.universe.keep_for(market_type)
+        peak_all, _ = _peak(lambda: parse(payload, market_type))
+        peak_keep, columns = _peak(lambda: parse(payload, market_type, keep))
+        memory[f"{venue}:{market_type}"] = {
+            'skipped': columns.skipped,
+            'peak_kb': peak_all / 1024,
+            'peak_keep_kb': peak_keep / 1024,
+            'saved_bytes_per_ticker': (peak_all - peak_keep) / columns.skipped if columns.skipped else 0.0
+        }
+    return memory
+
+
+def _calibration() -> None:
+    """Фиксированная работа интерпретатора для поправки на скорость машины"""
+    total = 0.0
+    for i in range(200000):
+        total += float(str(i))
+
+
+def run(symbols: int, repeat: int, min_profit: float = 0.5, max_profit: float = 10.0,
+        investment: float = 1000.0, keep_coverage: float = 0.1) -> Dict:
+    loop = asyncio.new_event_loop()
+    payloads = make_payloads(symbols)
+    engine = ArbitrageEngine()
+    engine_names = {name.lower(): name for name in engine.exchanges_config}
+
+    stages: Dict[str, Dict[str, float]] = {}
+    calibration, _ = _timed(_calibration, repeat)
+    parsed: Dict[Tuple[str, str], Dict[str, Dict]] = {}
+    columns = {}
+    adapters = {}
+    # Разбор в пуле процессов замеряет benchmarks.offload; здесь - работа разбора на месте
+    parse_pool_enabled, config.PARSE_POOL = config.PARSE_POOL, False
+    try:
+        for (venue, market_type), payload in payloads.items():
+            adapter = adapters.get(venue) or adapters.setdefault(venue, get_exchange(venue))
+            adapter.fetch_data = _serve(payload)
+            adapter.fetch_body = _serve_body(json.dumps(payload).encode())
+
+            stats, result = _timed(lambda: loop.run_until_complete(adapter.get_price_columns(market_type)), repeat)
+            stats['quotes'] = len(result.symbols)
+            stages[f"columns:{venue}:{market_type}"] = stats
+            columns[(venue, market_type)] = result
+
+            parser = adapter.get_futures_prices if market_type == 'futures' else adapter.get_spot_prices
+
+            stats, prices = _timed(lambda: loop.run_until_complete(parser()), repeat)
+            stats['quotes'] = len(prices)
+            stages[f"parse:{venue}:{market_type}"] = stats
+            parsed[(venue, market_type)] = prices
+
+            raw = [quote['original'] for quote in prices.values()]
+            stages[f"normalize_pair:{venue}:{market_type}"], _ = _timed(
+                lambda: [adapter.normalize_pair(symbol, market_type) for symbol in raw], repeat)
+
+        venues = [engine_names[venue] for venue in adapters]
+        engine.set_exchanges(venues)
+        engine.set_analysis_types(True, True, True)
+
+        def merge_dict():
+            for (venue, market_type), prices in parsed.items():
+                engine.price_book.update(engine_names[venue], market_type, prices)
+            return engine.price_book.view()
+
+        stages['merge_dict'], _ = _timed(merge_dict, repeat)
+        stages['merge_dict']['quotes'] = engine.price_book.quote_count()
+
+        def merge():
+            book = engine.price_book
+            for (venue, market_type), result in columns.items():
+                book.clear_slot(engine_names[venue], market_type)
+                book.upsert_many(engine_names[venue], market_type, result.symbols, result.bid, result.ask,
+                                 result.bid_size, result.ask_size, result.timestamp)
+            return book.view()
+
+        stages['merge'], view = _timed(merge, repeat)
+        stages['merge']['quotes'] = engine.price_book.quote_count()
+
+        stats, opportunities = _timed(lambda: loop.run_until_complete(
+            engine._find_opportunities(view, min_profit, max_profit, investment)), repeat)
+        stats['opportunities'] = len(opportunities)
+        stages['find_opportunities'] = stats
+    finally:
+        config.PARSE_POOL = parse_pool_enabled
+        for adapter in adapters.values():
+            loop.run_until_complete(adapter.close())
+        loop.close()
+
+    return {
+        'meta': {
+            'symbols': symbols,
+            'venues': len(adapters),
+            'slots': len(payloads),
+            'repeat': repeat,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'calibration_ms': calibration['min_ms']
+        },
+        'stages': stages,
+        'memory': keep_memory(symbols, keep_coverage)
+    }
+
+
+def compare(result: Dict, baseline: Dict, tolerance: float) -> List[Dict]:
+    """Сравнение по стадиям с поправкой на скорость машины по калибровочному прогону;
+    минимум по запускам устойчивее медианы к фоновому шуму"""
+    scale = 1.0
+    base_calibration = baseline.get('meta', {}).get('calibration_ms')
+    if base_calibration:
+        scale = result['meta']['calibration_ms'] / base_calibration
+
+    rows = []
+    for stage, stats in result['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        row = {'stage': stage, 'min_ms': stats['min_ms'], 'baseline_ms': None, 'ratio': None, 'regression': False}
+        if base is not None and base['min_ms']:
+            row['baseline_ms'] = base['min_ms']
+            row['ratio'] = stats['min_ms'] / (base['min_ms'] * scale)
+            row['regression'] = row['ratio'] > 1 + tolerance
+        rows.append(row)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--keep-coverage', type=float, default=0.1,
+                        help='доля слотов, листящих символ, для замера памяти с keep')
+    parser.add_argument('--json', action='store_true', help='вывод в JSON')
+    parser.add_argument('--baseline', nargs='?', const=str(DEFAULT_BASELINE), help='файл базы для сравнения')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='допустимый рост времени стадии, доля')
+    parser.add_argument('--save-baseline', nargs='?', const=str(DEFAULT_BASELINE), help='сохранить результат как базу')
+    args = parser.parse_args(argv)
+
+    result = run(args.symbols, args.repeat, keep_coverage=args.keep_coverage)
+
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(result, indent=2) + '\n')
+
+    rows = None
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if baseline.get('meta', {}).get('symbols') != args.symbols:
+            print(f"Warning: baseline was recorded for {baseline.get('meta', {}).get('symbols')} symbols",
+                  file=sys.stderr)
+        rows = compare(result, baseline, args.tolerance)
+        result['comparison'] = rows
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        meta = result['meta']
+        print(f"{meta['venues']} venues ({meta['slots']} slots) x {meta['symbols']} symbols, {meta['repeat']} runs")
+        for stage, stats in result['stages'].items():
+            print(f"{stage:>32}: median {stats['median_ms']:9.2f} ms  min {stats['min_ms']:9.2f} ms")
+        for slot, row in result['memory'].items():
+            print(f"{'keep:' + slot:>32}: skipped {row['skipped']:6d}  peak {row['peak_kb']:8.0f} -> "
+                  f"{row['peak_keep_kb']:8.0f} KB  ({row['saved_bytes_per_ticker']:.0f} B per skipped ticker)")
+        for row in rows or []:
+            if row['ratio'] is not None:
+                flag = '  REGRESSION' if row['regression'] else ''
+                print(f"{row['stage']:>32}: {row['ratio']:6.2f}x baseline{flag}")
+
+    if rows and any(row['regression'] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""Сравнение слияния цен через списки словарей и через PriceBook.
+
+Запуск: python -m crypto_arbitrage.benchmarks.pricebook --symbols 5000 --venues 11
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from ..core.data_processor import PriceBook
+
+
+def make_tickers(symbols: int, venues: int, seed: int = 1) -> Dict[str, Dict[str, Dict]]:
+    """Тикеры в формате ccxt fetch_tickers для каждой биржи"""
+    rnd = random.Random(seed)
+    result = {}
+    for v in range(venues):
+        tickers = {}
+        for s in range(symbols):
+            bid = rnd.uniform(0.01, 1000)
+            tickers[f"C{s}/USDT"] = {'symbol': f"C{s}/USDT", 'bid': bid, 'ask': bid * 1.001}
+        result[f"venue{v}"] = tickers
+    return result
+
+
+def _normalize(symbol: str) -> str:
+    return symbol.upper().replace('/', '')
+
+
+def legacy_cycle(all_tickers: Dict[str, Dict[str, Dict]], state: Dict):
+    """Прежний путь: словарь котировок на каждый тикер и слияние в списки"""
+    all_prices = {}
+    for venue, tickers in all_tickers.items():
+        prices = {}
+        for symbol, ticker in tickers.items():
+            prices[_normalize(symbol)] = {
+                'exchange': venue,
+                'bid': ticker['bid'],
+                'ask': ticker['ask'],
+                'market_type': 'spot',
+                'original': symbol
+            }
+        for symbol, data in prices.items():
+            if symbol not in all_prices:
+                all_prices[symbol] = []
+            all_prices[symbol].append(data)
+    state['prices'] = all_prices
+
+
+def pricebook_cycle(all_tickers: Dict[str, Dict[str, Dict]], state: Dict):
+    """Новый путь: колонки пишутся в PriceBook, объекты на тикер не сохраняются"""
+    book = state.setdefault('book', PriceBook(list(all_tickers)))
+    for venue, tickers in all_tickers.items():
+        symbols, bids, asks = [], [], []
+        for symbol, ticker in tickers.items():
+            symbols.append(_normalize(symbol))
+            bids.append(ticker['bid'])
+            asks.append(ticker['ask'])
+        book.clear_slot(venue, 'spot')
+        book.upsert_many(venue, 'spot', symbols, bids, asks)
+    state['view'] = book.view()
+
+
+def measure(cycle: Callable, all_tickers: Dict, cycles: int) -> Dict:
+    """Время, пиковая память, удерживаемые блоки и сборки gen0 за цикл"""
+    state: Dict = {}
+    cycle(all_tickers, state)  # прогрев: интернирование символов и выделение колонок
+
+    timings: List[float] = []
+    peaks: List[int] = []
+    retained: List[int] = []
+    gen0 = gc.get_stats()[0]['collections']
+    for _ in range(cycles):
+        previous = state.pop('prices', None)
+        del previous
+        blocks = sys.getallocatedblocks()
+        tracemalloc.start()
+        started = time.perf_counter()
+        cycle(all_tickers, state)
+        timings.append(time.perf_counter() - started)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        retained.append(sys.getallocatedblocks() - blocks)
+
+    return {
+        'time_ms': 1000 * min(timings),
+        'peak_kb': max(peaks) / 1024,
+        'retained_blocks': max(retained),
+        'gen0_collections': (gc.get_stats()[0]['collections'] - gen0) / cycles
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=5000)
+    parser.add_argument('--venues', type=int, default=11)
+    parser.add_argument('--cycles', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help='вывод в JSON')
+    args = parser.parse_args(argv)
+
+    all_tickers = make_tickers(args.symbols, args.venues)
+    results = {
+        'legacy_merge': measure(legacy_cycle, all_tickers, args.cycles),
+        'pricebook': measure(pricebook_cycle, all_tickers, args.cycles)
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.venues} venues x {args.symbols} symbols, {args.cycles} cycles")
+    for name, result in results.items():
+        print(f"{name:>14}: {result['time_ms']:8.1f} ms  peak {result['peak_kb']:9.0f} KiB  "
+              f"retained {result['retained_blocks']:8d} blocks  gen0 GC {result['gen0_collections']:6.1f}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
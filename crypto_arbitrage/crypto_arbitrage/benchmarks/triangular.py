@@ -0,0 +1,113 @@
+"""Поиск циклов по графу цен спота на синтетической мультивалютной вселенной.
+
+Запуск: python -m crypto_arbitrage.benchmarks.triangular --bases 3000 [--json]
+"""
+import argparse
+import json
+import random
+import time
+from typing import Dict, List, Tuple
+
+from ..core.data_processor import PriceBook
+from ..core.triangular import PriceGraph
+
+VENUES = ('Binance', 'KuCoin', 'Bybit', 'Mexc', 'Okx', 'Htx', 'Bitget', 'Bingx', 'Gate', 'Lbank', 'Coinw')
+# Котируемая валюта и вероятность листинга базовой валюты против нее на бирже
+QUOTE_LISTING = {'USDT': 0.7, 'USDC': 0.25, 'BTC': 0.3, 'ETH': 0.12, 'BNB': 0.05, 'EUR': 0.03, 'TRY': 0.03}
+QUOTE_PRICES = {'USDT': 1.0, 'USDC': 1.0, 'BTC': 60000.0, 'ETH': 3000.0, 'BNB': 600.0, 'EUR': 1.08, 'TRY': 0.03}
+SPREAD = 0.0005
+NOISE = 0.0005
+
+
+def make_book(bases: int, planted: int, seed: int = 1) -> Tuple[PriceBook, List[Tuple[str, str]]]:
+    """Книга со всеми биржами и котировками; planted ног (биржа, символ) с заниженным ask на 2%"""
+    rng = random.Random(seed)
+    book = PriceBook(VENUES, capacity=bases * len(QUOTE_LISTING))
+    usd = dict(QUOTE_PRICES)
+    usd.update({f"C{i}": 10 ** rng.uniform(-4, 3) for i in range(bases)})
+
+    listed = []
+    for venue in VENUES:
+        for quote in QUOTE_LISTING:
+            for base in QUOTE_LISTING:
+                if base != quote and QUOTE_PRICES[base] > QUOTE_PRICES[quote] or (base, quote) == ('USDC', 'USDT'):
+                    listed.append((venue, f"{base}/{quote}"))
+        for i in range(bases):
+            for quote, probability in QUOTE_LISTING.items():
+                if rng.random() < probability:
+                    listed.append((venue, f"C{i}/{quote}"))
+
+    for venue, symbol in listed:
+        base, quote = symbol.split('/')
+        mid = usd[base] / usd[quote] * (1 + rng.gauss(0, NOISE))
+        book.upsert(symbol, venue, 'spot', mid * (1 - SPREAD), mid * (1 + SPREAD), timestamp=time.time())
+
+    targets = [(venue, symbol) for venue, symbol in listed if symbol.startswith('C') and symbol.endswith('/BTC')]
+    planted_legs = rng.sample(targets, planted)
+    for venue, symbol in planted_legs:
+        quote = book.quotes(symbol)
+        mid = next(q for q in quote if q['exchange'] == venue)['ask'] / (1 + SPREAD) * 0.98
+        book.upsert(symbol, venue, 'spot', mid * (1 - SPREAD), mid * (1 + SPREAD), timestamp=time.time())
+    return book, planted_legs
+
+
+def run(bases: int, repeat: int, planted: int, max_legs: int, max_cycles: int) -> Dict:
+    book, planted_legs = make_book(bases, planted)
+    view = book.view()
+    fees = {venue: 0.1 for venue in VENUES}
+    graph = PriceGraph(max_legs, max_cycles)
+
+    started = time.perf_counter()
+    graph.refresh(view, fees)
+    build = time.perf_counter() - started
+
+    refresh, search = [], []
+    cycles = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        graph.refresh(view, fees)
+        refresh.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        cycles = graph.find_cycles(0.1, 50, 1000)
+        search.append(time.perf_counter() - started)
+
+    legs = {(leg['exchange'], leg['symbol']) for cycle in cycles for leg in cycle['legs'] if leg['side'] == 'buy'}
+    return {
+        'meta': {'bases': bases, 'venues': len(VENUES), 'quotes': book.quote_count(), 'edges': graph.stats['edges'],
+                 'assets': len(graph.assets), 'max_legs': max_legs, 'max_cycles': max_cycles, 'repeat': repeat},
+        'build_ms': 1000 * build,
+        'refresh_ms': 1000 * min(refresh),
+        'search_ms': 1000 * min(search),
+        'cycles': len(cycles),
+        'cross_exchange': sum(cycle['cross_exchange'] for cycle in cycles),
+        'planted_found': sum(leg in legs for leg in planted_legs),
+        'planted': planted
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bases', type=int, default=3000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--planted', type=int, default=5)
+    parser.add_argument('--max-legs', type=int, default=4)
+    parser.add_argument('--max-cycles', type=int, default=200, help='циклов в результате (в движке - TRIANGULAR_MAX_CYCLES)')
+    parser.add_argument('--json', action='store_true', help='вывод в JSON')
+    args = parser.parse_args(argv)
+
+    result = run(args.bases, args.repeat, args.planted, args.max_legs, args.max_cycles)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    meta = result['meta']
+    print(f"{meta['venues']} venues, {meta['quotes']} spot quotes, {meta['assets']} assets, {meta['edges']} edges, "
+          f"cycles up to {meta['max_legs']} legs")
+    print(f"build {result['build_ms']:.1f} ms  refresh {result['refresh_ms']:.1f} ms  "
+          f"search {result['search_ms']:.1f} ms")
+    print(f"{result['cycles']} cycles ({result['cross_exchange']} cross-exchange), "
+          f"planted legs found {result['planted_found']}/{result['planted']}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -8,13 +8,102 @@ class Config:
     MAX_CONCURRENT_REQUESTS = 10
     RETRY_COUNT = 3
     RETRY_DELAY = 1.0
+    # Автомат отключения биржи (utils/error_handler.CircuitBreaker)
+    BREAKER_WINDOW = 20  # последних вызовов в окне
+    BREAKER_MIN_CALLS = 5
+    BREAKER_FAILURE_RATE = 0.5  # доля ошибок и медленных ответов для размыкания
+    BREAKER_SLOW_CALL = 5.0  # секунд; более медленный ответ считается неудачным
+    BREAKER_OPEN_SECONDS = 30.0  # пауза до пробного запроса, удваивается после неудачной пробы
+    BREAKER_MAX_OPEN_SECONDS = 300.0
+    HEDGE_REQUESTS = True  # дубль запроса тикеров, если первый не ответил за p95 задержки биржи
+    HEDGE_MIN_SAMPLES = 20  # ответов до включения хеджирования
     MIN_PROFIT_PERCENT = 0.5
     MAX_PROFIT_PERCENT = 10.0
     DEFAULT_INVESTMENT = 1000.0
 
+    # Настройки сбора цен
+    FETCH_DEADLINE = 10.0  # секунд на одну биржу и тип рынка
+    FAST_PARSE = True  # колоночный разбор ответов адаптеров (TICKER_SPECS) вместо словаря на тикер
+    USE_CCXT = True  # False - только собственные адаптеры бирж, без загрузки ccxt
+    # Разбор крупных ответов в пуле процессов (exchanges/parse_pool), чтобы не останавливать цикл событий
+    PARSE_POOL = True
+    PARSE_POOL_MIN_BYTES = 256 * 1024  # ответы меньше разбираются на месте
+    PARSE_POOL_WORKERS = 2
+    # Замер простоев цикла событий во время сбора цен (utils/loop_monitor); вне сбора таймер не работает
+    LOOP_MONITOR = False
+    LOOP_MONITOR_INTERVAL = 0.05  # секунд между замерами задержки цикла событий
+    LOOP_STALL_THRESHOLD = 0.005  # опоздание больше считается простоем цикла
+
+    # Общий пул HTTP-соединений (utils/http_client)
+    HTTP_POOL_LIMIT = 100
+    HTTP_LIMIT_PER_HOST = 4  # спот и фьючерсы одной биржи обычно на разных хостах
+    HTTP_KEEPALIVE = 60.0  # секунд; больше периода скана, чтобы соединения переживали паузы
+    HTTP_DNS_TTL = 600
+    HTTP_PREWARM = True  # открыть соединения со всеми хостами до первого цикла
+
+    # Лимиты запросов адаптеров (rate_limits, weights, usage_headers в настройках биржи)
+    RATE_LIMIT_WAIT = False  # False - при исчерпанном бюджете биржа пропускает цикл, котировки остаются прежними
+    RATE_LIMIT_PENALTY = 60.0  # пауза после 429/418 без заголовка Retry-After, секунд
+
+    # Непрерывный скан
+    SCAN_PERIOD = 5.0  # целевой период цикла, секунд
+    SCAN_MAX_PERIOD = 60.0
+    SCAN_BACKOFF = 1.5  # множитель интервала при переборе времени цикла
+    # Сбор цен в фоне: цикл сканирует последние снимки и не ждет сеть (кроме первой загрузки)
+    STALE_WHILE_REVALIDATE = True
+    QUOTE_MAX_AGE = 30.0  # ноги старше, секунд, в скан не попадают; None - без ограничения
+    QUOTE_RANK_AGE = 10.0  # возможности с ногами старше ставятся после свежих
+
+    # Второй этап: проверка лучших кандидатов по стаканам L2 (core/depth)
+    DEPTH_CHECK = True  # выдавать только возможности, подтвержденные глубиной стаканов
+    DEPTH_CANDIDATES = 20  # сколько лучших кандидатов скана проверять
+    DEPTH_LEVELS = 20  # уровней стакана на сторону
+    DEPTH_DEADLINE = 5.0  # секунд на загрузку всех стаканов этапа
+
+    # Треугольный и кросс-котировочный арбитраж по графу цен спота (core/triangular)
+    TRIANGULAR_MAX_LEGS = 4  # сделок в цикле (от 3)
+    TRIANGULAR_MAX_CYCLES = 50  # лучших циклов за скан
+
+    # Базис спот - фьючерс с учетом ставок финансирования (core/basis)
+    BASIS_HORIZON_HOURS = 24.0  # горизонт удержания бессрочной позиции для расчета финансирования и годовой доходности
+    BASIS_MIN_APR = 10.0  # минимальная годовая доходность с учетом базиса, финансирования и комиссий, %
+    BASIS_MAX_RESULTS = 50  # лучших сделок за скан
+    FUNDING_INTERVAL_HOURS = 8.0  # интервал списаний, если биржа его не сообщает
+    FUNDING_MAX_AGE = 900.0  # ставки перезагружаются не реже, секунд, даже если до списания дольше
+    FUNDING_DEADLINE = 10.0  # секунд на загрузку ставок всех бирж
+
+    # Интерфейс
+    GUI_REFRESH_INTERVAL = 0.25  # таблица возможностей перерисовывается не чаще, секунд
+    ENGINE_CLOSE_TIMEOUT = 10.0  # ожидание остановки потока движка при закрытии окна, секунд
+
+    # Журнал (utils/debug_logger, utils/logger)
+    LOG_LEVEL = 'INFO'  # DEBUG - подробности загрузки по биржам
+    LOG_BUFFER_LINES = 5000  # последних строк в памяти и в окне журнала GUI
+    LOG_FLUSH_INTERVAL = 0.1  # окно журнала обновляется пачкой не чаще, секунд
+    LOG_QUEUE_LINES = 10000  # строк в очереди записи в консоль и файл; при переполнении новые теряются
+
+    # Потоковый режим (WebSocket)
+    STREAMING_ENABLED = False
+    STREAM_STALE_AFTER = 5.0  # без сообщений дольше - откат на REST
+    STREAM_PING_INTERVAL = 15.0
+    STREAM_MAX_SYMBOLS = 1000
+
+    # Запись ответов бирж для воспроизведения (python -m crypto_arbitrage.replay)
+    RECORD_DIR = None  # каталог сегментов; None - запись выключена
+    RECORD_SEGMENT_SECONDS = 300
+
+    # История котировок и возможностей (utils/history, python -m crypto_arbitrage.history)
+    HISTORY_DIR = None  # каталог хранилища; None - история не пишется
+    HISTORY_FLUSH_SECONDS = 300.0  # пачка записывается сегментом не реже, секунд
+    HISTORY_SEGMENT_ROWS = 2_000_000  # или по накоплении строк
+    HISTORY_QUEUE = 256  # пачек в очереди записи; при переполнении новые теряются
+
     # Настройки кэша
     CACHE_ENABLED = True
-    CACHE_TTL = 300  # 5 минут в секундах
+    CACHE_TTL = 2.0  # ответ считается свежим, секунд
+    CACHE_STALE_TTL = 0.0  # сколько еще отдавать устаревший ответ, обновляя его в фоне (stale-while-revalidate)
+    CACHE_MAX_ENTRIES = 256
+    CACHE_MAX_BYTES = 64 * 1024 * 1024  # по длине тел ответов
 
     # Настройки бирж
     ENABLED_EXCHANGES: List[str] = [
@@ -35,22 +124,41 @@ class Config:
         'binance': {
             'spot_url': 'https://api.binance.com/api/v3/ticker/bookTicker',
             'futures_url': 'https://fapi.binance.com/fapi/v1/ticker/bookTicker',
+            'funding_url': 'https://fapi.binance.com/fapi/v1/premiumIndex',
+            'spot_depth_url': 'https://api.binance.com/api/v3/depth?symbol={symbol}&limit={limit}',
+            'futures_depth_url': 'https://fapi.binance.com/fapi/v1/depth?symbol={symbol}&limit={limit}',
+            'spot_ws_url': 'wss://stream.binance.com:9443/ws',
+            'futures_ws_url': 'wss://fstream.binance.com/ws',
             'fee': {'spot': 0.075, 'futures': 0.04},
             'rate_limit': 10,
+            # Вес bookTicker без символа: 4 на споте (лимит 6000/мин), 5 на фьючерсах (2400/мин);
+            # стакан до 100 уровней: 5 на споте, до 50 уровней: 2 на фьючерсах; premiumIndex без символа: 10
+            'rate_limits': [(10, 1.0), (2400, 60.0)],
+            'weights': {'/api/v3/ticker/bookTicker': 4, '/fapi/v1/ticker/bookTicker': 5,
+                        '/api/v3/depth': 5, '/fapi/v1/depth': 2, '/fapi/v1/premiumIndex': 10},
+            'usage_headers': [('X-MBX-USED-WEIGHT-1M', 60.0)],
             'ccxt_name': 'binance',
             'enabled': True
         },
         'bybit': {
             'spot_url': 'https://api.bybit.com/v5/market/tickers?category=spot',
             'futures_url': 'https://api.bybit.com/v5/market/tickers?category=linear',
+            'funding_url': 'https://api.bybit.com/v5/market/tickers?category=linear',
+            'spot_depth_url': 'https://api.bybit.com/v5/market/orderbook?category=spot&symbol={symbol}&limit={limit}',
+            'futures_depth_url': 'https://api.bybit.com/v5/market/orderbook?category=linear&symbol={symbol}&limit={limit}',
+            'spot_ws_url': 'wss://stream.bybit.com/v5/public/spot',
+            'futures_ws_url': 'wss://stream.bybit.com/v5/public/linear',
             'fee': {'spot': 0.06, 'futures': 0.06},
             'rate_limit': 5,
+            'rate_limits': [(5, 1.0), (600, 5.0)],
             'ccxt_name': 'bybit',
             'enabled': True
         },
         'kucoin': {
             'spot_url': 'https://api.kucoin.com/api/v1/market/allTickers',
             'futures_url': 'https://api-futures.kucoin.com/api/v1/ticker',
+            'funding_url': 'https://api-futures.kucoin.com/api/v1/contracts/active',
+            'spot_depth_url': 'https://api.kucoin.com/api/v1/market/orderbook/level2_20?symbol={symbol}',
             'fee': {'spot': 0.08, 'futures': 0.06},
             'rate_limit': 5,
             'ccxt_name': 'kucoin',
@@ -59,6 +167,8 @@ class Config:
         'mexc': {
             'spot_url': 'https://api.mexc.com/api/v3/ticker/bookTicker',
             'futures_url': 'https://contract.mexc.com/api/v1/contract/ticker',
+            'funding_url': 'https://contract.mexc.com/api/v1/contract/funding_rate',
+            'spot_depth_url': 'https://api.mexc.com/api/v3/depth?symbol={symbol}&limit={limit}',
             'fee': {'spot': 0.2, 'futures': 0.06},
             'rate_limit': 5,
             'ccxt_name': 'mexc',
@@ -67,14 +177,21 @@ class Config:
         'okx': {
             'spot_url': 'https://www.okx.com/api/v5/market/tickers?instType=SPOT',
             'futures_url': 'https://www.okx.com/api/v5/market/tickers?instType=FUTURES',
+            'funding_url': 'https://www.okx.com/api/v5/public/funding-rate?instId=ANY',
+            'spot_depth_url': 'https://www.okx.com/api/v5/market/books?instId={symbol}&sz={limit}',
+            'spot_ws_url': 'wss://ws.okx.com:8443/ws/v5/public',
+            'futures_ws_url': 'wss://ws.okx.com:8443/ws/v5/public',
             'fee': {'spot': 0.08, 'futures': 0.05},
             'rate_limit': 5,
+            'rate_limits': [(20, 2.0, 5)],  # market/tickers: 20 запросов за 2 секунды
             'ccxt_name': 'okx',
             'enabled': True
         },
         'htx': {
             'spot_url': 'https://api.huobi.pro/market/tickers',
             'futures_url': 'https://api.htx.com/market/tickers',
+            'funding_url': 'https://api.hbdm.com/linear-swap-api/v1/swap_batch_funding_rate',
+            'spot_depth_url': 'https://api.huobi.pro/market/depth?symbol={symbol}&type=step0&depth={limit}',
             'fee': {'spot': 0.2, 'futures': 0.05},
             'rate_limit': 5,
             'ccxt_name': 'htx',
@@ -83,6 +200,7 @@ class Config:
         'bitget': {
             'spot_url': 'https://api.bitget.com/api/spot/v1/market/tickers',
             'futures_url': 'https://api.bitget.com/api/mix/v1/market/tickers?productType=UMCBL',
+            'funding_url': 'https://api.bitget.com/api/v2/mix/market/current-fund-rate?productType=USDT-FUTURES',
             'fee': {'spot': 0.1, 'futures': 0.06},
             'rate_limit': 5,
             'ccxt_name': 'bitget',
@@ -91,6 +209,7 @@ class Config:
         'bingx': {
             'spot_url': 'https://open-api.bingx.com/openApi/spot/v1/ticker/24hr',
             'futures_url': 'https://open-api.bingx.com/openApi/swap/v2/quote/ticker',
+            'funding_url': 'https://open-api.bingx.com/openApi/swap/v2/quote/premiumIndex',
             'fee': {'spot': 0.04, 'futures': 0.04},
             'rate_limit': 5,
             'ccxt_name': 'bingx',
@@ -99,6 +218,10 @@ class Config:
         'gate': {
             'spot_url': 'https://api.gateio.ws/api/v4/spot/tickers',
             'futures_url': 'https://api.gateio.ws/api/v4/futures/usdt/tickers',
+            'funding_url': 'https://api.gateio.ws/api/v4/futures/usdt/contracts',
+            'spot_depth_url': 'https://api.gateio.ws/api/v4/spot/order_book?currency_pair={symbol}&limit={limit}',
+            'spot_ws_url': 'wss://api.gateio.ws/ws/v4/',
+            'futures_ws_url': 'wss://fx-ws.gateio.ws/v4/ws/usdt',
             'fee': {'spot': 0.2, 'futures': 0.05},
             'rate_limit': 5,
             'ccxt_name': 'gateio',
@@ -1,7 +1,30 @@
 import asyncio
+import json
+import time
 import aiohttp
-import ccxt.async_support as ccxt
-from typing import List, Dict, Optional
+import numpy as np
+from functools import partial
+from typing import Callable, List, Dict, Optional, Set, Tuple
+from ..config import config
+from .basis import BasisScanner, FundingCache
+from .data_processor import MARKET_INDEX, PriceBook, PriceBookView
+from .depth import DepthChecker
+from .incremental import IncrementalOpportunityEngine, OpportunityEvent
+from .scanner import OpportunityScanner
+from .triangular import PriceGraph
+from .universe import UniverseIndex
+from ..exchanges import get_exchange
+from ..exchanges.base_exchange import FundingColumns, OrderBook
+from ..exchanges.parse_pool import parse_pool
+from ..exchanges.symbol_map import SymbolMap
+from ..models.fetch_report import FetchReport
+from ..utils.debug_logger import logger
+from ..utils.error_handler import CircuitOpen, breaker_states, get_breaker
+from ..utils.history import get_history
+from ..utils.http_client import http_client
+from ..utils.loop_monitor import LoopMonitor
+from ..utils.rate_limiter import RateLimitExceeded
+from ..utils.recorder import get_recorder
 
 
 class ArbitrageEngine:
@@ -11,8 +34,36 @@ class ArbitrageEngine:
         self.analysis_types = {
             'spot_spot': True,
             'spot_futures': False,
-            'futures_futures': False
+            'futures_futures': False,
+            'triangular': False,
+            'basis': False
         }
+        self.price_book = PriceBook()
+        self.last_fetch_report: Optional[FetchReport] = None
+        self.incremental: Optional[IncrementalOpportunityEngine] = None
+        self.opportunity_listeners: List[Callable[[List[OpportunityEvent]], None]] = []
+        # Потоковые котировки WebSocket; в инкрементальном режиме каждая пересчитывает свой символ
+        self.streaming = config.STREAMING_ENABLED
+        self._streaming_started = False
+        self.prewarm_connections = config.HTTP_PREWARM
+        self._prewarmed = False
+        self._symbol_maps: Dict[str, SymbolMap] = {}
+        self.universe = UniverseIndex()
+        # Фоновое обновление слотов (биржа, рынок): цикл не ждет сеть, а сканирует последние снимки
+        self.stale_while_revalidate = config.STALE_WHILE_REVALIDATE
+        self._refreshes: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._cancelled: List[asyncio.Task] = []  # отмененные обновления, которые еще нужно дождаться
+        self._loaded = set()
+        # Второй этап: лучшие кандидаты скана проверяются по стаканам L2
+        self.depth_check = config.DEPTH_CHECK
+        self.loop_monitor: Optional[LoopMonitor] = LoopMonitor() if config.LOOP_MONITOR else None
+        # Треугольный анализ: граф цен спота и циклы последнего скана
+        self.price_graph = PriceGraph()
+        self.last_cycles: List[Dict] = []
+        # Базис спот - фьючерс: ставки финансирования кэшируются до ближайшего списания
+        self.funding_cache = FundingCache()
+        self.basis_scanner: Optional[BasisScanner] = None
+        self.last_basis: List[Dict] = []
 
     def _load_exchanges_config(self):
         """Конфигурация поддерживаемых бирж"""
@@ -70,198 +121,507 @@ class ArbitrageEngine:
             for name, config in self.exchanges_config.items()
             if name in exchange_names
         }
-
-    def set_analysis_types(self, spot_spot: bool, spot_futures: bool, futures_futures: bool):
+        self.price_book = PriceBook(list(self.active_exchanges))
+        self.basis_scanner = None
+        self._loaded.clear()
+        self._configure_universe()
+        if self.incremental is not None:
+            self._emit(self.incremental.clear())
+
+    def set_analysis_types(self, spot_spot: bool, spot_futures: bool, futures_futures: bool,
+                           triangular: bool = False, basis: bool = False):
         """Установка типов анализа"""
         self.analysis_types = {
             'spot_spot': spot_spot,
             'spot_futures': spot_futures,
-            'futures_futures': futures_futures
+            'futures_futures': futures_futures,
+            'triangular': triangular,
+            'basis': basis
         }
-
-    async def _find_opportunities(self, all_prices: Dict, min_profit: float, max_profit: float, investment: float) -> \
-    List[Dict]:
-        """Поиск арбитражных возможностей с подробным логгированием"""
-        opportunities = []
-        total_checked = 0
-        profitable_pairs = 0
-
-        for symbol, prices in all_prices.items():
-            if len(prices) < 2:
+        self._configure_universe()
+        if self.incremental is not None:
+            self._emit(self.incremental.configure(self.analysis_types))
+
+    def _configure_universe(self):
+        slots = [(name, market_type) for name in self.active_exchanges for market_type in self._market_types()]
+        self.universe.configure(slots, self.analysis_types)
+        self._cancel_refreshes(set(slots))
+
+    def _cancel_refreshes(self, slots: Set[Tuple[str, str]]):
+        """Отмена фонового обновления слотов, которых больше нет среди заданий.
+
+        Ответ такого слота не должен попасть в новую книгу; задачи ожидаются перед следующей загрузкой.
+        """
+        for key in [key for key in self._refreshes if key not in slots]:
+            task = self._refreshes.pop(key)
+            task.cancel()
+            self._cancelled.append(task)
+            self._loaded.discard(key)
+
+    async def _await_cancelled(self):
+        cancelled, self._cancelled = self._cancelled, []
+        await asyncio.gather(*cancelled, return_exceptions=True)
+
+    def set_deadlines(self, deadlines: Dict[str, float]):
+        """Установка дедлайнов загрузки цен для отдельных бирж"""
+        for name, deadline in deadlines.items():
+            if name in self.exchanges_config:
+                self.exchanges_config[name]['deadline'] = deadline
+
+    def enable_incremental(self, min_profit: float, max_profit: float, investment: float, streaming: bool = False):
+        """Инкрементальное поддержание лучших возможностей по символам вместо полного пересканирования.
+
+        С streaming котировки WebSocket пересчитывают свой символ сразу, не дожидаясь цикла.
+        """
+        self.streaming = self.streaming or streaming
+        self.incremental = IncrementalOpportunityEngine(
+            {name: exchange_config['fee'] for name, exchange_config in self.exchanges_config.items()},
+            self.analysis_types, min_profit, max_profit, investment, config.QUOTE_MAX_AGE
+        )
+        self._emit(self.incremental.sync(self.price_book.view()))
+
+    def disable_incremental(self):
+        """Возврат к полному скану на каждом цикле"""
+        self.incremental = None
+
+    def _emit(self, events: List[OpportunityEvent]):
+        if not events:
+            return
+        for listener in self.opportunity_listeners:
+            listener(events)
+
+    def _on_stream_quote(self, exchange_name: str, market_type: str, symbol: str, quote: Dict):
+        """Точечный пересчет символа при обновлении котировки из потока"""
+        keep = self.universe.keep_for(market_type)
+        if keep is not None and symbol not in keep:
+            return
+        if self.incremental is not None:
+            self._emit(self.incremental.update(symbol, exchange_name, market_type, quote['bid'], quote['ask'],
+                                               quote.get('timestamp')))
+
+    def _init_exchanges(self):
+        """Создание клиентов ccxt; биржи без поддержки в ccxt работают через собственные адаптеры"""
+        ccxt = None
+        if config.USE_CCXT:
+            # Импорт ccxt занимает около секунды, поэтому выполняется только когда он нужен
+            import ccxt.async_support as ccxt
+
+        for name, exchange_config in self.active_exchanges.items():
+            if 'instance' in exchange_config or 'adapter' in exchange_config:
                 continue
-
-            for i in range(len(prices)):
-                for j in range(len(prices)):
-                    if i == j:
-                        continue
-
-                    buy = prices[i]
-                    sell = prices[j]
-                    total_checked += 1
-
-                    # Логируем проверяемую пару
-                    print(f"\nChecking pair: {symbol}")
-                    print(f"Buy: {buy['exchange']} {buy['market_type']} {buy['bid']}")
-                    print(f"Sell: {sell['exchange']} {sell['market_type']} {sell['ask']}")
-
-                    if not self._valid_arbitrage_pair(buy, sell):
-                        print("Skipped - invalid pair type")
-                        continue
-
-                    spread = sell['ask'] - buy['bid']
-                    if spread <= 0:
-                        print(f"Skipped - negative spread: {spread}")
-                        continue
-
-                    spread_percent = (spread / buy['bid']) * 100
-                    print(f"Raw spread: {spread_percent:.4f}%")
-
-                    if not (min_profit <= spread_percent <= max_profit):
-                        print(f"Skipped - spread {spread_percent:.2f}% not in range {min_profit}-{max_profit}%")
-                        continue
-
-                    buy_fee = self.active_exchanges[buy['exchange']]['fee'][buy['market_type']]
-                    sell_fee = self.active_exchanges[sell['exchange']]['fee'][sell['market_type']]
-
-                    coins = investment / buy['bid']
-                    revenue = coins * sell['ask']
-                    fee_amount = (investment * buy_fee / 100) + (revenue * sell_fee / 100)
-                    profit = revenue - investment - fee_amount
-
-                    print(f"After fees: {profit:.2f} profit ({profit / investment * 100:.2f}%)")
-
-                    if profit > 0:
-                        profitable_pairs += 1
-                        opportunities.append({
-                            'symbol': f"{symbol}/USDT",
-                            'buy_exchange': buy['exchange'],
-                            'sell_exchange': sell['exchange'],
-                            'buy_market_type': buy['market_type'],
-                            'sell_market_type': sell['market_type'],
-                            'buy_price': buy['bid'],
-                            'sell_price': sell['ask'],
-                            'spread_percent': spread_percent,
-                            'profit_amount': profit,
-                            'investment': investment
-                        })
-
-        print(f"\nTotal pairs checked: {total_checked}")
-        print(f"Profitable opportunities found: {profitable_pairs}")
-        return sorted(opportunities, key=lambda x: -x['spread_percent'])
-
-    async def _fetch_all_prices(self) -> Dict:
-        """Получение цен со всех бирж"""
-        all_prices = {}
-
-        for name, config in self.active_exchanges.items():
-            if 'instance' not in config:
+            exchange_class = getattr(ccxt, exchange_config['ccxt_name'], None) if ccxt else None
+            if exchange_class is not None:
+                # ccxt не закрывает переданную ему сессию (own_session=False)
+                exchange_config['instance'] = exchange_class({'enableRateLimit': True,
+                                                              'session': http_client.session()})
+            else:
+                exchange_config['adapter'] = get_exchange(name.lower())
+
+    async def find_arbitrage_opportunities(self, min_profit: float, max_profit: float,
+                                           investment: float) -> List[Dict]:
+        """Один цикл: сбор цен со всех бирж и поиск возможностей"""
+        self._init_exchanges()
+        if self.prewarm_connections and not self._prewarmed:
+            await self.prewarm()
+        if self.streaming and not self._streaming_started:
+            self._streaming_started = True
+            await self.start_streaming()
+
+        if self.loop_monitor is not None:
+            self.loop_monitor.start()
+        try:
+            report = await self._fetch_all_prices()
+        finally:
+            if self.loop_monitor is not None:
+                await self.loop_monitor.stop()
+        if self.incremental is not None:
+            # Движок уже синхронизирован с книгой в _fetch_all_prices: лучшие возможности по символам
+            opportunities = self.incremental.opportunities()
+        else:
+            opportunities = await self._find_opportunities(self.price_book.view(), min_profit, max_profit,
+                                                           investment)
+        if self.depth_check:
+            opportunities = await self._confirm_depth(opportunities, self.price_book.view(), min_profit, max_profit,
+                                                      investment, report)
+        if self.analysis_types.get('triangular'):
+            self.last_cycles = self._find_cycles(self.price_book.view(), min_profit, max_profit, investment)
+            report.cycles = len(self.last_cycles)
+        if self.analysis_types.get('basis'):
+            self.last_basis = await self._find_basis(self.price_book.view(), investment, report)
+            report.basis = len(self.last_basis)
+        history = get_history()
+        if history is not None:
+            history.append_quotes(self.price_book.view())
+            history.append_opportunities(opportunities)
+            if self.analysis_types.get('basis'):
+                history.append_opportunities(self.last_basis, 'basis')
+        return opportunities
+
+    async def prewarm(self):
+        """Открытие соединений со всеми хостами активных бирж до первого цикла"""
+        self._prewarmed = True
+        urls = [exchange_config.get(f'{market_type}_url') for exchange_config in self.active_exchanges.values()
+                for market_type in self._market_types()]
+        await asyncio.gather(http_client.prewarm(url for url in urls if url), parse_pool.start())
+
+    def _market_types(self) -> List[str]:
+        """Типы рынков, нужные для выбранных типов анализа"""
+        market_types = []
+        if self.analysis_types['spot_spot'] or self.analysis_types['spot_futures'] or \
+                self.analysis_types.get('triangular') or self.analysis_types.get('basis'):
+            market_types.append('spot')
+        if self.analysis_types['spot_futures'] or self.analysis_types['futures_futures'] or \
+                self.analysis_types.get('basis'):
+            market_types.append('futures')
+        return market_types
+
+    async def _fetch_all_prices(self) -> FetchReport:
+        """Параллельное получение цен со всех бирж с дедлайном на каждую"""
+        report = FetchReport()
+        started = time.monotonic()
+        recorder = get_recorder()
+        if recorder is not None:
+            recorder.begin_cycle()
+
+        jobs = {}
+        for name, exchange_config in self.active_exchanges.items():
+            if 'adapter' in exchange_config:
+                fetch = self._fetch_adapter_prices
+            elif 'instance' in exchange_config:
+                fetch = self._fetch_ccxt_prices
+            else:
                 continue
 
-            if self.analysis_types['spot_spot'] or self.analysis_types['spot_futures']:
-                spot_prices = await self._fetch_ccxt_prices(name, 'spot')
-                self._merge_prices(all_prices, spot_prices)
-
-            if self.analysis_types['spot_futures'] or self.analysis_types['futures_futures']:
-                futures_prices = await self._fetch_ccxt_prices(name, 'futures')
-                self._merge_prices(all_prices, futures_prices)
-
-        return all_prices
-
-    async def _fetch_ccxt_prices(self, exchange_name: str, market_type: str) -> Dict:
-        """Логируем процесс загрузки цен"""
-        logger.log(f"\nFetching {market_type} prices from {exchange_name}...")
+            deadline = exchange_config.get('deadline', config.FETCH_DEADLINE)
+            for market_type in self._market_types():
+                jobs[(name, market_type)] = (partial(fetch, name, market_type), deadline)
+
+        if self.stale_while_revalidate:
+            results = await self._revalidate(jobs, report)
+        else:
+            gathered = await asyncio.gather(*(asyncio.wait_for(job(), deadline) for job, deadline in jobs.values()),
+                                            return_exceptions=True)
+            results = dict(zip(jobs, gathered))
+
+        # Результаты разбираются в порядке заданий, чтобы слияние было детерминированным
+        for key, result in results.items():
+            if isinstance(result, asyncio.TimeoutError):
+                report.late.append(key)
+            elif isinstance(result, CircuitOpen):
+                report.circuit_open.append(key)
+            elif isinstance(result, RateLimitExceeded):
+                # Обновление пропущено ради лимита биржи: в книге остаются котировки прошлого цикла
+                report.throttled.append(key)
+            elif isinstance(result, Exception):
+                report.failed[key] = str(result)
+            else:
+                quotes, skipped = result
+                report.completed.append(key)
+                report.quotes += quotes
+                report.skipped += skipped
+
+        # Котировки опоздавших и упавших бирж не должны попасть в скан; в фоновом режиме
+        # они остаются, а от устаревших котировок скан защищает их возраст (QUOTE_MAX_AGE)
+        if not self.stale_while_revalidate:
+            for name, market_type in report.late + list(report.failed):
+                self.price_book.clear_slot(name, market_type)
+
+        # Листинги обновляются из уже полученных ответов; пересчет только после изменений
+        if self.universe.dirty:
+            self.universe.refresh()
+            logger.log(f"Universe refreshed: {len(self.universe)} arbitrageable symbols")
+
+        report.breakers = {venue: state['state'] for venue, state in breaker_states().items()
+                           if state['state'] != 'closed'}
+        report.elapsed = time.monotonic() - started
+        if self.loop_monitor is not None:
+            stalls = self.loop_monitor.take()
+            report.loop_stalls, report.loop_stalled, report.loop_max_stall = (
+                stalls['stalls'], stalls['stalled'], stalls['max_stall'])
+        logger.log(f"Prices collected: {report.summary()}; http: {http_client.summary()}")
+
+        if self.incremental is not None:
+            self._emit(self.incremental.sync(self.price_book.view()))
+
+        self.last_fetch_report = report
+        return report
+
+    @staticmethod
+    async def _run_with_deadline(job: Callable, deadline: float):
+        # Корутина создается внутри задачи: отмененная до старта задача не оставляет неожиданную корутину
+        return await asyncio.wait_for(job(), deadline)
+
+    async def _revalidate(self, jobs: Dict, report: FetchReport) -> Dict:
+        """Запуск фонового обновления слотов и сбор уже готовых результатов.
+
+        Ждем только слоты, по которым еще не было ни одного ответа; остальные обновятся к следующему циклу.
+        """
+        await self._await_cancelled()
+        for key, (job, deadline) in jobs.items():
+            if key not in self._refreshes:
+                self._refreshes[key] = asyncio.ensure_future(self._run_with_deadline(job, deadline))
+
+        first = [self._refreshes[key] for key in jobs if key not in self._loaded]
+        if first:
+            await asyncio.wait(first)
+
+        results = {}
+        for key in jobs:
+            task = self._refreshes[key]
+            if not task.done():
+                report.refreshing.append(key)
+                continue
+            del self._refreshes[key]
+            self._loaded.add(key)
+            results[key] = Exception('cancelled') if task.cancelled() else task.exception() or task.result()
+        return results
+
+    async def _fetch_ccxt_prices(self, exchange_name: str, market_type: str) -> Tuple[int, int]:
+        """Загрузка цен биржи прямо в книгу цен; возвращает число записанных и пропущенных котировок"""
+        logger.debug("Fetching %s prices from %s...", market_type, exchange_name)
         try:
-            tickers = await self.active_exchanges[exchange_name]['instance'].fetch_tickers()
-            logger.log(f"Received {len(tickers)} tickers")
-
-            prices = {}
-            for symbol, ticker in list(tickers.items())[:10]:  # Логируем первые 10
+            params = {'type': 'swap'} if market_type == 'futures' else {}
+            instance = self.active_exchanges[exchange_name]['instance']
+            breaker = get_breaker(exchange_name)
+            # Запросы ccxt не дублируются: у него собственный ограничитель частоты
+            async with breaker.guard():
+                tickers = await breaker.hedged(partial(instance.fetch_tickers, params=params), lambda: False)
+            logger.debug("Received %d %s tickers from %s", len(tickers), market_type, exchange_name)
+            recorder = get_recorder()
+            if recorder is not None:
+                recorder.record('ccxt', exchange_name.lower(), market_type, None,
+                                json.dumps(tickers, default=str).encode(), params)
+
+            symbol_map = self._symbol_maps.setdefault(exchange_name, SymbolMap())
+            canonicals = symbol_map.canonicalize(list(tickers), market_type)
+            if symbol_map.update_listing(tickers, market_type):
+                self.universe.update(exchange_name, market_type, filter(None, canonicals))
+            keep = self.universe.keep_for(market_type)
+
+            symbols, bids, asks = [], [], []
+            skipped = 0
+            for ticker, canonical in zip(tickers.values(), canonicals):
+                if canonical is None or (keep is not None and canonical not in keep):
+                    skipped += 1
+                    continue
                 bid = ticker.get('bid')
                 ask = ticker.get('ask')
-                logger.log(f"{symbol}: bid={bid}, ask={ask}")
 
                 if self._valid_prices(bid, ask):
-                    normalized = self._normalize_symbol(symbol, market_type)
-                    prices[normalized] = {
-                        'exchange': exchange_name,
-                        'bid': bid,
-                        'ask': ask,
-                        'market_type': market_type,
-                        'original': symbol
-                    }
-
-            logger.log(f"Valid prices found: {len(prices)}")
-            return prices
-        except Exception as e:
-            logger.log(f"Error fetching prices: {str(e)}")
-            return {}
-
-    def _merge_prices(self, all_prices: Dict, new_prices: Dict):
-        """Объединение цен в общий словарь"""
-        for symbol, data in new_prices.items():
-            if symbol not in all_prices:
-                all_prices[symbol] = []
-            all_prices[symbol].append(data)
-
-    async def _find_opportunities(self, all_prices: Dict, min_profit: float, max_profit: float, investment: float) -> \
-    List[Dict]:
-        """Упрощенный и более агрессивный поиск арбитража"""
-        opportunities = []
-
-        for symbol, prices in all_prices.items():
-            if len(prices) < 2:
-                continue
-
-            # Находим лучшую цену покупки (минимальную)
-            best_buy = min(prices, key=lambda x: x['bid'])
+                    symbols.append(canonical)
+                    bids.append(bid)
+                    asks.append(ask)
 
-            # Находим лучшую цену продажи (максимальную)
-            best_sell = max(prices, key=lambda x: x['ask'])
+            # Запись после await целиком, поэтому отмена по дедлайну не оставляет половину котировок
+            self.price_book.clear_slot(exchange_name, market_type)
+            self.price_book.upsert_many(exchange_name, market_type, symbols, bids, asks)
 
-            # Проверяем, что это разные биржи
-            if best_buy['exchange'] == best_sell['exchange']:
+            logger.debug("Valid %s prices from %s: %d", market_type, exchange_name, len(symbols))
+            return len(symbols), skipped
+        except Exception as e:
+            logger.error("Error fetching %s prices from %s: %s", market_type, exchange_name, e)
+            raise
+
+    async def _fetch_adapter_prices(self, exchange_name: str, market_type: str) -> Tuple[int, int]:
+        """Загрузка цен через адаптер биржи: из живого потока или через REST"""
+        adapter = self.active_exchanges[exchange_name]['adapter']
+        keep = self.universe.keep_for(market_type)
+        columns = await adapter.get_price_columns(market_type, keep) if config.FAST_PARSE else None
+        if columns is not None:
+            if columns.listing is not None:
+                self.universe.update(exchange_name, market_type, columns.listing)
+            self.price_book.clear_slot(exchange_name, market_type)
+            self.price_book.upsert_many(exchange_name, market_type, columns.symbols, columns.bid, columns.ask,
+                                        columns.bid_size, columns.ask_size, columns.timestamp)
+            return len(columns.symbols), columns.skipped
+
+        prices = await adapter.get_prices(market_type)
+        self.universe.update(exchange_name, market_type, prices)
+        skipped = 0
+        if keep is not None:
+            kept = {symbol: quote for symbol, quote in prices.items() if symbol in keep}
+            skipped = len(prices) - len(kept)
+            prices = kept
+
+        self.price_book.clear_slot(exchange_name, market_type)
+        self.price_book.update(exchange_name, market_type, prices,
+                               adapter.fetched_at.get(adapter.config.get(f'{market_type}_url')))
+        return len(prices), skipped
+
+    async def start_streaming(self):
+        """Подключение WebSocket-потоков лучших цен у бирж, которые их поддерживают"""
+        for name, exchange_config in self.active_exchanges.items():
+            adapter = exchange_config.get('adapter') or get_exchange(name.lower())
+            market_types = [market_type for market_type in self._market_types()
+                            if adapter.supports_streaming(market_type)]
+            if not market_types:
                 continue
-
-            spread = best_sell['ask'] - best_buy['bid']
-            spread_percent = (spread / best_buy['bid']) * 100
-
-            # Временно убираем проверку на min_profit для теста
-            if spread_percent <= 0:
+            try:
+                await adapter.start_streaming(market_types)
+            except Exception as e:
+                logger.log(f"Streaming unavailable for {name}: {str(e)}")
+                await adapter.close()
                 continue
-
-            # Расчет прибыли без учета комиссий для теста
-            profit = (investment / best_buy['bid']) * best_sell['ask'] - investment
-
-            opportunities.append({
-                'symbol': f"{symbol}/USDT",
-                'buy_exchange': best_buy['exchange'],
-                'sell_exchange': best_sell['exchange'],
-                'buy_market_type': best_buy['market_type'],
-                'sell_market_type': best_sell['market_type'],
-                'buy_price': best_buy['bid'],
-                'sell_price': best_sell['ask'],
-                'spread_percent': spread_percent,
-                'profit_amount': profit,
-                'investment': investment
-            })
-
-        return sorted(opportunities, key=lambda x: -x['spread_percent'])
-
-    def _valid_arbitrage_pair(self, buy: Dict, sell: Dict) -> bool:
-        """Упрощенная проверка валидности арбитражной пары"""
-        # Основное правило - покупаем дешевле, чем продаем
-        if buy['bid'] >= sell['ask']:
-            return False
-
-        # Проверяем разрешенные типы арбитража
-        if buy['market_type'] == 'spot' and sell['market_type'] == 'spot':
-            return self.analysis_types['spot_spot']
-        if buy['market_type'] == 'spot' and sell['market_type'] == 'futures':
-            return self.analysis_types['spot_futures']
-        if buy['market_type'] == 'futures' and sell['market_type'] == 'futures':
-            return self.analysis_types['futures_futures']
-
-        return False
+            exchange_config['adapter'] = adapter
+            adapter.quote_listeners.append(partial(self._on_stream_quote, name))
+            logger.log(f"Streaming {', '.join(market_types)} quotes from {name}")
+
+    async def _find_opportunities(self, prices: PriceBookView, min_profit: float, max_profit: float,
+                                  investment: float) -> List[Dict]:
+        """Векторизованный поиск арбитражных возможностей по всем разрешенным парам"""
+        scanner = OpportunityScanner(
+            prices.venues,
+            {name: self.exchanges_config[name]['fee'] for name in prices.venues},
+            self.analysis_types
+        )
+        return scanner.scan(prices.symbols, prices.bid, prices.ask, min_profit, max_profit, investment,
+                            prices.timestamp, config.QUOTE_MAX_AGE, config.QUOTE_RANK_AGE)
+
+    def _find_cycles(self, prices: PriceBookView, min_profit: float, max_profit: float,
+                     investment: float) -> List[Dict]:
+        """Прибыльные циклы обмена по графу цен спота: внутри бирж и через несколько бирж"""
+        started = time.perf_counter()
+        self.price_graph.refresh(prices, {name: self.exchanges_config[name]['fee']['spot'] for name in prices.venues},
+                                 config.QUOTE_MAX_AGE)
+        cycles = self.price_graph.find_cycles(min_profit, max_profit, investment)
+        logger.log(f"Triangular: {len(cycles)} cycles over {self.price_graph.stats['edges']} edges "
+                   f"in {1000 * (time.perf_counter() - started):.1f} ms")
+        return cycles
+
+    async def _find_basis(self, prices: PriceBookView, investment: float, report: FetchReport) -> List[Dict]:
+        """Cash-and-carry спот - фьючерс с учетом ставок финансирования; ставки обновляются только по истечении"""
+        venues = [name for name in prices.venues if name in self.active_exchanges]
+        due = self.funding_cache.due(venues)
+        if due:
+            results = await asyncio.gather(
+                *(self._run_with_deadline(partial(self._fetch_funding, name), config.FUNDING_DEADLINE) for name in due),
+                return_exceptions=True
+            )
+            for name, result in zip(due, results):
+                if isinstance(result, BaseException) or result is None:
+                    report.funding_unavailable += 1
+                else:
+                    self.funding_cache.put(name, result)
+                    report.funding_refreshed += 1
+
+        started = time.perf_counter()
+        if self.basis_scanner is None or self.basis_scanner.venues != list(prices.venues):
+            self.basis_scanner = BasisScanner(prices.venues,
+                                              {name: self.exchanges_config[name]['fee'] for name in prices.venues})
+        trades = self.basis_scanner.scan(prices, {name: self.funding_cache.get(name) for name in venues}, investment,
+                                         config.BASIS_MIN_APR, config.QUOTE_MAX_AGE)
+        logger.log(f"Basis: {len(trades)} trades, funding refreshed for {report.funding_refreshed}/{len(due)} "
+                   f"exchanges in {1000 * (time.perf_counter() - started):.1f} ms")
+        return trades
+
+    async def _fetch_funding(self, exchange_name: str) -> Optional[FundingColumns]:
+        """Ставки финансирования бессрочных контрактов биржи через адаптер или ccxt; None - недоступны"""
+        exchange_config = self.active_exchanges[exchange_name]
+        if 'adapter' in exchange_config:
+            return await exchange_config['adapter'].get_funding()
+
+        instance = exchange_config.get('instance')
+        if instance is None or not instance.has.get('fetchFundingRates'):
+            return None
+        async with get_breaker(exchange_name).guard():
+            rates = await instance.fetch_funding_rates()
+        symbol_map = self._symbol_maps.setdefault(exchange_name, SymbolMap())
+        symbols, rate, next_time, interval = [], [], [], []
+        for canonical, item in zip(symbol_map.canonicalize(list(rates), 'futures'), rates.values()):
+            if canonical is None or item.get('fundingRate') is None:
+                continue
+            symbols.append(canonical)
+            rate.append(float(item['fundingRate']))
+            # fundingTimestamp в ccxt - время ближайшего списания, interval - строка вида '8h'
+            next_time.append(item['fundingTimestamp'] / 1000 if item.get('fundingTimestamp') else np.nan)
+            hours = str(item.get('interval') or '').rstrip('h')
+            interval.append(float(hours) if hours.replace('.', '', 1).isdigit() and float(hours) > 0 else np.nan)
+        return FundingColumns(symbols, np.array(rate), np.array(next_time), np.array(interval), time.time())
+
+    @staticmethod
+    def _depth_candidates(opportunities: List[Dict], prices: PriceBookView, min_profit: float) -> List[Dict]:
+        """Кандидаты для стаканов: лучшие по исполнимому спреду (покупка по ask, продажа по bid).
+
+        Скан считает спред от bid покупки до ask продажи, а рыночные заявки исполняются наоборот.
+        Средняя цена по стакану не лучше верха книги, поэтому пары с исполнимым спредом ниже
+        min_profit стаканами не подтвердятся. Выбранные кандидаты сохраняют порядок скана.
+        """
+        rows = {symbol: row for row, symbol in enumerate(prices.symbols)}
+        venues = {venue: column for column, venue in enumerate(prices.venues)}
+        ranked = []
+        for position, opportunity in enumerate(opportunities):
+            row = rows.get(opportunity['symbol'])
+            buy, sell = venues.get(opportunity['buy_exchange']), venues.get(opportunity['sell_exchange'])
+            if row is None or buy is None or sell is None:
+                continue
+            ask = prices.ask[row, buy, MARKET_INDEX[opportunity['buy_market_type']]]
+            bid = prices.bid[row, sell, MARKET_INDEX[opportunity['sell_market_type']]]
+            spread = (bid - ask) / ask * 100
+            if spread >= min_profit:  # NaN (нет котировки) не проходит
+                ranked.append((-spread, position))
+        ranked.sort()
+        return [opportunities[position] for position in sorted(position for _, position in
+                                                               ranked[:config.DEPTH_CANDIDATES])]
+
+    async def _confirm_depth(self, opportunities: List[Dict], prices: PriceBookView, min_profit: float,
+                             max_profit: float, investment: float, report: FetchReport) -> List[Dict]:
+        """Проверка лучших кандидатов по стаканам: каждый стакан загружается один раз, все параллельно"""
+        candidates = self._depth_candidates(opportunities, prices, min_profit)
+        legs = {}
+        for opportunity in candidates:
+            for side in ('buy', 'sell'):
+                legs[(opportunity[f'{side}_exchange'], opportunity[f'{side}_market_type'], opportunity['symbol'])] = None
+
+        results = await asyncio.gather(
+            *(self._run_with_deadline(partial(self._fetch_order_book, *leg), config.DEPTH_DEADLINE) for leg in legs),
+            return_exceptions=True
+        )
+        books = {}
+        for leg, result in zip(legs, results):
+            if isinstance(result, RateLimitExceeded):
+                report.depth_throttled += 1
+            elif isinstance(result, BaseException) or result is None:
+                report.depth_unavailable += 1
+            else:
+                books[leg] = result
+
+        checker = DepthChecker({name: self.exchanges_config[name]['fee'] for name in self.active_exchanges})
+        confirmed = []
+        for opportunity in candidates:
+            buy_book = books.get((opportunity['buy_exchange'], opportunity['buy_market_type'], opportunity['symbol']))
+            sell_book = books.get((opportunity['sell_exchange'], opportunity['sell_market_type'], opportunity['symbol']))
+            if buy_book is None or sell_book is None:
+                continue
+            result = checker.evaluate(opportunity, buy_book, sell_book, investment, min_profit, max_profit)
+            if result is not None:
+                confirmed.append(result)
+
+        report.depth_checked = len(candidates)
+        report.depth_confirmed = len(confirmed)
+        logger.log(f"Depth check: {len(confirmed)}/{len(candidates)} confirmed, {len(books)}/{len(legs)} order books")
+        # Порядок скана сохраняется: свежие котировки раньше устаревших
+        return confirmed
+
+    async def _fetch_order_book(self, exchange_name: str, market_type: str, symbol: str) -> Optional[OrderBook]:
+        """Стакан по каноническому символу через адаптер или ccxt; None - стакан биржи недоступен"""
+        exchange_config = self.active_exchanges[exchange_name]
+        if 'adapter' in exchange_config:
+            return await exchange_config['adapter'].get_order_book(symbol, market_type, config.DEPTH_LEVELS)
+
+        instance = exchange_config.get('instance')
+        symbol_map = self._symbol_maps.get(exchange_name)
+        raw = symbol_map.raw(symbol, market_type) if symbol_map is not None else None
+        if instance is None or raw is None:
+            return None
+        async with get_breaker(exchange_name).guard():
+            book = await instance.fetch_order_book(raw, config.DEPTH_LEVELS)
+        result = OrderBook.from_rows(book['bids'], book['asks'], time.time())
+        # ccxt указывает количество деривативов в контрактах
+        contract_size = (instance.markets or {}).get(raw, {}).get('contractSize') or 1
+        if contract_size != 1:
+            result.bids[:, 1] *= contract_size
+            result.asks[:, 1] *= contract_size
+        return result
 
     def _valid_prices(self, bid: float, ask: float) -> bool:
         """Проверка валидности цен"""
@@ -271,18 +631,23 @@ class ArbitrageEngine:
         """Проверка фьючерсного символа"""
         return any(x in symbol for x in ['/USDT:USDT', '/USDT', 'PERP'])
 
-    def _normalize_symbol(self, symbol: str, market_type: str) -> str:
-        """Нормализация названия символа"""
-        symbol = symbol.upper()
-        if market_type == 'futures':
-            for suffix in ['PERP', 'USDT:USDT', 'USDT']:
-                if symbol.endswith(suffix):
-                    symbol = symbol[:-len(suffix)]
-                    break
-        return symbol.replace('/', '')
-
-    async def _close_exchanges(self):
-        """Закрытие соединений с биржами"""
+    async def close(self):
+        """Закрытие соединений с биржами, фоновых обновлений и пула разбора.
+
+        После закрытия движок можно использовать снова: соединения открываются заново при следующем сборе.
+        """
+        for task in self._refreshes.values():
+            task.cancel()
+        await asyncio.gather(*self._refreshes.values(), return_exceptions=True)
+        self._refreshes.clear()
+        await self._await_cancelled()
+        self._loaded.clear()
         for config in self.active_exchanges.values():
             if 'instance' in config:
-                await config['instance'].close()
\ No newline at end of file
+                await config.pop('instance').close()
+            if 'adapter' in config:
+                await config.pop('adapter').close()
+        parse_pool.shutdown()
+        self._streaming_started = False
+        self._prewarmed = False
+        await http_client.close()
\ No newline at end of file
@@ -0,0 +1,204 @@
+import re
+import time
+import numpy as np
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+from ..config import config
+from ..exchanges.base_exchange import FundingColumns
+from .data_processor import MARKET_INDEX, PriceBookView
+
+
+SPOT, FUTURES = MARKET_INDEX['spot'], MARKET_INDEX['futures']
+HOURS_PER_YEAR = 365 * 24
+
+# Срочный контракт: BASE/QUOTE-YYMMDD или BASE/QUOTE-YYYYMMDD (см. symbol_map.parse_symbol)
+_DATED = re.compile(r'^(.+)-(\d{6}|\d{8})$')
+
+
+def expiry_time(date: str) -> Optional[float]:
+    """Время экспирации срочного контракта (08:00 UTC дня экспирации), unix-секунды"""
+    try:
+        day = datetime.strptime(date, '%y%m%d' if len(date) == 6 else '%Y%m%d')
+    except ValueError:
+        return None
+    return day.replace(hour=8, tzinfo=timezone.utc).timestamp()
+
+
+class FundingCache:
+    """Ставки финансирования по биржам.
+
+    Ответ биржи действует до ближайшего списания по любому ее контракту, но не дольше FUNDING_MAX_AGE:
+    объявленная ставка следующего периода меняется и между списаниями.
+    """
+
+    def __init__(self, max_age: Optional[float] = None):
+        self.max_age = config.FUNDING_MAX_AGE if max_age is None else max_age
+        self._entries: Dict[str, Tuple[FundingColumns, float]] = {}
+
+    def get(self, venue: str) -> Optional[FundingColumns]:
+        entry = self._entries.get(venue)
+        return entry[0] if entry else None
+
+    def due(self, venues: Sequence[str], now: Optional[float] = None) -> List[str]:
+        """Биржи, ставки которых нужно загрузить: их нет или они устарели"""
+        now = time.time() if now is None else now
+        return [venue for venue in venues if venue not in self._entries or self._entries[venue][1] <= now]
+
+    def put(self, venue: str, columns: FundingColumns, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        expires = now + self.max_age
+        with np.errstate(invalid='ignore'):
+            upcoming = columns.next_time[columns.next_time > now]
+        if len(upcoming):
+            expires = min(expires, float(upcoming.min()))
+        self._entries[venue] = (columns, expires)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class BasisScanner:
+    """Векторизованная оценка cash-and-carry: покупка спота по ask и продажа контракта по bid.
+
+    Для каждой тройки (символ, биржа спота, биржа контракта) считаются базис входа, ожидаемое
+    финансирование за горизонт удержания по ставке и расписанию списаний биржи контракта и комиссии
+    входа и выхода; результат ранжируется по годовой доходности с учетом carry. Базис бессрочного
+    контракта считается закрытым к концу горизонта BASIS_HORIZON_HOURS, срочного - к экспирации.
+    """
+
+    def __init__(self, venues: Sequence[str], fees: Dict[str, Dict[str, float]], horizon: Optional[float] = None):
+        self.venues = list(venues)
+        self.spot_fee = np.array([fees[venue]['spot'] for venue in self.venues], dtype=float) / 100
+        self.futures_fee = np.array([fees[venue]['futures'] for venue in self.venues], dtype=float) / 100
+        self.horizon = horizon or config.BASIS_HORIZON_HOURS
+        self._symbols: Tuple[str, ...] = ()
+        self._rows: Dict[str, int] = {}
+        self._pairs = (np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty(0))
+        # Строки книги для символов ответа со ставками; ответ в кэше не меняется до перезагрузки
+        self._funding_rows: Dict[str, Tuple[FundingColumns, np.ndarray]] = {}
+
+    def _pairs_for(self, symbols: Tuple[str, ...]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(строка спота, строка контракта, экспирация или NaN) для всех символов книги; пересчет при их изменении"""
+        if symbols != self._symbols:
+            self._rows = {symbol: row for row, symbol in enumerate(symbols)}
+            spot_rows, futures_rows, expiries = [], [], []
+            for row, symbol in enumerate(symbols):
+                dated = _DATED.match(symbol)
+                if dated is None:
+                    spot_rows.append(row)
+                    expiries.append(np.nan)
+                else:
+                    underlying, expiry = self._rows.get(dated.group(1)), expiry_time(dated.group(2))
+                    if underlying is None or expiry is None:
+                        continue
+                    spot_rows.append(underlying)
+                    expiries.append(expiry)
+                futures_rows.append(row)
+            self._symbols = symbols
+            self._funding_rows.clear()
+            self._pairs = (np.array(spot_rows, dtype=np.intp), np.array(futures_rows, dtype=np.intp),
+                           np.array(expiries, dtype=float))
+        return self._pairs
+
+    def _funding_columns(self, shape: Tuple[int, int], funding: Dict[str, Optional[FundingColumns]]):
+        """Ставки, время списания и интервал в форме (символ, биржа) книги"""
+        rate, next_time, interval = (np.full(shape, np.nan) for _ in range(3))
+        for venue_id, venue in enumerate(self.venues):
+            columns = funding.get(venue)
+            if columns is None or not len(columns.symbols):
+                continue
+            cached = self._funding_rows.get(venue)
+            if cached is not None and cached[0] is columns:
+                rows = cached[1]
+            else:
+                rows = np.fromiter((self._rows.get(symbol, -1) for symbol in columns.symbols), dtype=np.intp,
+                                   count=len(columns.symbols))
+                self._funding_rows[venue] = (columns, rows)
+            known = rows >= 0
+            rate[rows[known], venue_id] = columns.rate[known]
+            next_time[rows[known], venue_id] = columns.next_time[known]
+            interval[rows[known], venue_id] = columns.interval[known]
+        return rate, next_time, interval
+
+    def scan(self, prices: PriceBookView, funding: Dict[str, Optional[FundingColumns]], investment: float,
+             min_apr: float, max_age: Optional[float] = None, now: Optional[float] = None) -> List[Dict]:
+        """Сделки с годовой доходностью с учетом carry не ниже min_apr (%), от лучшей"""
+        now = time.time() if now is None else now
+        spot_rows, futures_rows, expiries = self._pairs_for(prices.symbols)
+        if not len(futures_rows):
+            return []
+
+        ask = prices.ask[:, :, SPOT]
+        bid = prices.bid[:, :, FUTURES]
+        if max_age is not None:
+            with np.errstate(invalid='ignore'):
+                ask = np.where(now - prices.timestamp[:, :, SPOT] > max_age, np.nan, ask)
+                bid = np.where(now - prices.timestamp[:, :, FUTURES] > max_age, np.nan, bid)
+
+        # Только символы, у которых есть и спот, и контракт хотя бы на одной бирже
+        ask, bid = ask[spot_rows], bid[futures_rows]
+        listed = np.flatnonzero(~np.isnan(ask).all(axis=1) & ~np.isnan(bid).all(axis=1))
+        if not len(listed):
+            return []
+        spot_rows, futures_rows, expiries = spot_rows[listed], futures_rows[listed], expiries[listed]
+        ask, bid = ask[listed], bid[listed]
+
+        rate, next_time, interval = self._funding_columns(prices.bid.shape[:2], funding)
+        rate, next_time, interval = rate[futures_rows], next_time[futures_rows], interval[futures_rows]
+        interval = np.where(np.isnan(interval), config.FUNDING_INTERVAL_HOURS, interval)
+
+        dated = ~np.isnan(expiries)
+        horizon = np.where(dated, (expiries - now) / 3600, self.horizon)  # (пара,)
+        with np.errstate(invalid='ignore'):
+            # До ближайшего списания; без времени в ответе - по сетке интервала от полуночи UTC
+            until = np.where(np.isnan(next_time) | (next_time <= now),
+                             interval - (now / 3600) % interval, (next_time - now) / 3600)
+            payments = np.where(until <= horizon[:, None], np.floor((horizon[:, None] - until) / interval) + 1, 0)
+            # Короткая позиция получает ставку; у срочных контрактов финансирования нет
+            carry = np.where(dated[:, None], 0.0, rate * payments)
+
+            basis = bid[:, None, :] / ask[:, :, None] - 1  # (пара, биржа спота, биржа контракта)
+            fees = 2 * (self.spot_fee[:, None] + self.futures_fee[None, :])
+            result = basis + carry[:, None, :] - fees
+            apr = result * (HOURS_PER_YEAR / horizon)[:, None, None]
+            # Бессрочный контракт без известной ставки не оценивается; истекающие контракты отбрасываются
+            usable = dated[:, None] | ~np.isnan(rate)
+            mask = (apr * 100 >= min_apr) & usable[:, None, :] & (horizon >= 1)[:, None, None]
+
+        pairs, spot_venues, futures_venues = np.nonzero(mask)
+        if not len(pairs):
+            return []
+        ranks = -apr[pairs, spot_venues, futures_venues]
+        limit = config.BASIS_MAX_RESULTS
+        if len(ranks) > limit:
+            top = np.argpartition(ranks, limit - 1)[:limit]
+            order = top[np.argsort(ranks[top], kind='stable')]
+        else:
+            order = np.argsort(ranks, kind='stable')
+
+        opportunities = []
+        for k in order.tolist():
+            p, i, j = pairs[k], spot_venues[k], futures_venues[k]
+            is_dated = bool(dated[p])
+            hours = float(horizon[p])
+            opportunities.append({
+                'symbol': self._symbols[futures_rows[p]],
+                'buy_exchange': self.venues[i],
+                'sell_exchange': self.venues[j],
+                'buy_market_type': 'spot',
+                'sell_market_type': 'futures',
+                'buy_price': float(ask[p, i]),
+                'sell_price': float(bid[p, j]),
+                'spread_percent': float(basis[p, i, j]) * 100,
+                'profit_amount': investment * float(result[p, i, j]),
+                'investment': investment,
+                'funding_rate': None if is_dated else float(rate[p, j]) * 100,
+                'funding_interval': None if is_dated else float(interval[p, j]),
+                'next_funding': None if is_dated else now + float(until[p, j]) * 3600,
+                'expiry': float(expiries[p]) if is_dated else None,
+                'horizon_hours': hours,
+                'basis_apr': float(basis[p, i, j]) * HOURS_PER_YEAR / hours * 100,
+                'funding_apr': 0.0 if is_dated else float(rate[p, j]) * HOURS_PER_YEAR / float(interval[p, j]) * 100,
+                'carry_apr': float(apr[p, i, j]) * 100
+            })
+        return opportunities
\ No newline at end of file
@@ -0,0 +1,164 @@
+import time
+import numpy as np
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+
+MARKET_TYPES = ('spot', 'futures')
+MARKET_INDEX = {market_type: i for i, market_type in enumerate(MARKET_TYPES)}
+
+
+class PriceBookView(NamedTuple):
+    """Снимок книги цен только для чтения; массивы имеют форму (символ, биржа, тип рынка)"""
+    symbols: Sequence[str]
+    venues: Sequence[str]
+    bid: np.ndarray
+    ask: np.ndarray
+    bid_size: np.ndarray
+    ask_size: np.ndarray
+    timestamp: np.ndarray
+
+
+class PriceBook:
+    """Колоночное хранилище котировок: символ x биржа x тип рынка"""
+
+    COLUMNS = ('bid', 'ask', 'bid_size', 'ask_size', 'timestamp')
+
+    def __init__(self, venues: Sequence[str] = (), capacity: int = 1024):
+        self.symbols: List[str] = []
+        self.venues: List[str] = []
+        self._symbol_ids: Dict[str, int] = {}
+        self._venue_ids: Dict[str, int] = {}
+
+        self._symbol_capacity = max(capacity, 1)
+        self._venue_capacity = max(len(venues), 1)
+        for name in self.COLUMNS:
+            setattr(self, name, self._empty(self._symbol_capacity, self._venue_capacity))
+
+        for venue in venues:
+            self.venue_id(venue)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @staticmethod
+    def _empty(symbols: int, venues: int) -> np.ndarray:
+        return np.full((symbols, venues, len(MARKET_TYPES)), np.nan)
+
+    def _resize(self, symbols: int, venues: int):
+        """Перенос колонок в массивы большего размера"""
+        for name in self.COLUMNS:
+            old = getattr(self, name)
+            new = self._empty(symbols, venues)
+            new[:old.shape[0], :old.shape[1]] = old
+            setattr(self, name, new)
+        self._symbol_capacity, self._venue_capacity = symbols, venues
+
+    def symbol_id(self, symbol: str) -> int:
+        """Индекс символа; новый символ получает следующую строку"""
+        symbol_id = self._symbol_ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = len(self.symbols)
+            if symbol_id == self._symbol_capacity:
+                self._resize(self._symbol_capacity * 2, self._venue_capacity)
+            self._symbol_ids[symbol] = symbol_id
+            self.symbols.append(symbol)
+        return symbol_id
+
+    def venue_id(self, venue: str) -> int:
+        """Индекс биржи; новая биржа получает следующий столбец"""
+        venue_id = self._venue_ids.get(venue)
+        if venue_id is None:
+            venue_id = len(self.venues)
+            if venue_id == self._venue_capacity:
+                self._resize(self._symbol_capacity, self._venue_capacity * 2)
+            self._venue_ids[venue] = venue_id
+            self.venues.append(venue)
+        return venue_id
+
+    def upsert(self, symbol: str, venue: str, market_type: str, bid: float, ask: float,
+               bid_size: float = np.nan, ask_size: float = np.nan, timestamp: Optional[float] = None):
+        """Запись одной котировки по ключу (символ, биржа, тип рынка)"""
+        key = (self.symbol_id(symbol), self.venue_id(venue), MARKET_INDEX[market_type])
+        self.bid[key] = bid
+        self.ask[key] = ask
+        self.bid_size[key] = bid_size
+        self.ask_size[key] = ask_size
+        self.timestamp[key] = time.time() if timestamp is None else timestamp
+
+    def upsert_many(self, venue: str, market_type: str, symbols: Sequence[str],
+                    bids: Sequence[float], asks: Sequence[float],
+                    bid_sizes: Optional[Sequence[float]] = None, ask_sizes: Optional[Sequence[float]] = None,
+                    timestamp=None):
+        """Пакетная запись котировок одной биржи и типа рынка из колонок; timestamp - число или колонка"""
+        if not len(symbols):
+            return
+        venue_id = self.venue_id(venue)
+        market = MARKET_INDEX[market_type]
+        # symbol_id может расширить массивы, поэтому индексы собираются до записи
+        rows = np.fromiter((self.symbol_id(symbol) for symbol in symbols), dtype=np.intp, count=len(symbols))
+
+        self.bid[rows, venue_id, market] = bids
+        self.ask[rows, venue_id, market] = asks
+        self.bid_size[rows, venue_id, market] = np.nan if bid_sizes is None else bid_sizes
+        self.ask_size[rows, venue_id, market] = np.nan if ask_sizes is None else ask_sizes
+        self.timestamp[rows, venue_id, market] = time.time() if timestamp is None else timestamp
+
+    def update(self, venue: str, market_type: str, prices: Dict[str, Dict], timestamp: Optional[float] = None):
+        """Запись результата парсера биржи (словарь символ -> котировка); timestamp - время получения ответа"""
+        quotes = prices.values()
+        now = time.time() if timestamp is None else timestamp
+        self.upsert_many(
+            venue, market_type, list(prices),
+            [quote['bid'] for quote in quotes],
+            [quote['ask'] for quote in quotes],
+            [quote.get('bid_volume', np.nan) for quote in quotes],
+            [quote.get('ask_volume', np.nan) for quote in quotes],
+            # Котировки из потока несут собственное время получения
+            [quote.get('timestamp', now) for quote in quotes]
+        )
+
+    def clear_slot(self, venue: str, market_type: str):
+        """Удаление всех котировок биржи по типу рынка"""
+        venue_id = self._venue_ids.get(venue)
+        if venue_id is None:
+            return
+        market = MARKET_INDEX[market_type]
+        for name in self.COLUMNS:
+            getattr(self, name)[:, venue_id, market] = np.nan
+
+    def view(self) -> PriceBookView:
+        """Снимок без копирования: срезы колонок, закрытые для записи"""
+        symbols, venues = len(self.symbols), len(self.venues)
+        columns = []
+        for name in self.COLUMNS:
+            column = getattr(self, name)[:symbols, :venues]
+            column.flags.writeable = False
+            columns.append(column)
+        return PriceBookView(tuple(self.symbols), tuple(self.venues), *columns)
+
+    def quotes(self, symbol: str) -> List[Dict]:
+        """Котировки символа в виде словарей (для отладки и UI)"""
+        symbol_id = self._symbol_ids.get(symbol)
+        if symbol_id is None:
+            return []
+
+        result = []
+        for venue_id, venue in enumerate(self.venues):
+            for market, market_type in enumerate(MARKET_TYPES):
+                key = (symbol_id, venue_id, market)
+                if np.isnan(self.bid[key]):
+                    continue
+                result.append({
+                    'exchange': venue,
+                    'market_type': market_type,
+                    'bid': float(self.bid[key]),
+                    'ask': float(self.ask[key]),
+                    'bid_volume': float(self.bid_size[key]),
+                    'ask_volume': float(self.ask_size[key]),
+                    'timestamp': float(self.timestamp[key])
+                })
+        return result
+
+    def quote_count(self) -> int:
+        """Количество заполненных котировок"""
+        return int(np.count_nonzero(~np.isnan(self.bid[:len(self.symbols), :len(self.venues)])))
\ No newline at end of file
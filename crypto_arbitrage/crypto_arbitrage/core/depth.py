@@ -0,0 +1,66 @@
+import numpy as np
+from typing import Dict, Optional, Tuple
+from ..exchanges.base_exchange import OrderBook
+
+
+def fill(levels: np.ndarray, amount: float, notional: bool = False) -> Tuple[float, float]:
+    """Исполнение рыночной заявки по уровням стакана: (количество, сумма в котируемой валюте).
+
+    amount - количество базовой валюты, а при notional=True - сумма в котируемой валюте.
+    Если глубины не хватает, исполняется все, что есть на полученных уровнях.
+    """
+    if not len(levels) or amount <= 0:
+        return 0.0, 0.0
+    price, quantity = levels[:, 0], levels[:, 1]
+    size = price * quantity if notional else quantity
+    before = np.cumsum(size) - size
+    take = np.clip(amount - before, 0.0, size)
+    if notional:
+        return float((take / price).sum()), float(take.sum())
+    return float(take.sum()), float((take * price).sum())
+
+
+class DepthChecker:
+    """Второй этап скана: пересчет кандидата по стаканам обеих бирж.
+
+    Покупка идет по предложениям (asks) биржи покупки, продажа - по спросу (bids) биржи продажи,
+    как у рыночных заявок. Исполнимый объем - меньшее из купленного на investment и того,
+    что готов принять стакан продажи; цены возможности заменяются средневзвешенными (VWAP).
+    """
+
+    def __init__(self, fees: Dict[str, Dict[str, float]]):
+        self.fees = fees
+
+    def evaluate(self, opportunity: Dict, buy_book: OrderBook, sell_book: OrderBook, investment: float,
+                 min_profit: float, max_profit: float) -> Optional[Dict]:
+        """Подтвержденная глубиной возможность или None"""
+        buy_volume, _ = fill(buy_book.asks, investment, notional=True)
+        sell_volume = float(sell_book.bids[:, 1].sum()) if len(sell_book.bids) else 0.0
+        volume = min(buy_volume, sell_volume)
+        if volume <= 0:
+            return None
+
+        _, cost = fill(buy_book.asks, volume)
+        _, revenue = fill(sell_book.bids, volume)
+        buy_price, sell_price = cost / volume, revenue / volume
+        spread_percent = (sell_price - buy_price) / buy_price * 100
+        buy_fee = cost * self.fees[opportunity['buy_exchange']][opportunity['buy_market_type']] / 100
+        sell_fee = revenue * self.fees[opportunity['sell_exchange']][opportunity['sell_market_type']] / 100
+        profit = revenue - cost - buy_fee - sell_fee
+        if profit <= 0 or not min_profit <= spread_percent <= max_profit:
+            return None
+
+        return {
+            **opportunity,
+            'buy_price': buy_price,
+            'sell_price': sell_price,
+            'spread_percent': spread_percent,
+            'profit_amount': profit,
+            'investment': cost,
+            'buy_volume': buy_volume,
+            'sell_volume': sell_volume,
+            'buy_fee': buy_fee,
+            'sell_fee': sell_fee,
+            'top_buy_price': float(buy_book.asks[0, 0]),
+            'top_sell_price': float(sell_book.bids[0, 0])
+        }
\ No newline at end of file
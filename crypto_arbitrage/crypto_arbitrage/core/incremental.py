@@ -0,0 +1,296 @@
+import heapq
+import time
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from .data_processor import MARKET_TYPES, PriceBookView
+from .scanner import PAIR_TYPES
+
+
+Slot = Tuple[str, str]  # (биржа, тип рынка)
+OpportunityKey = Tuple[str, str, str, str, str]  # (символ, биржа/рынок покупки, биржа/рынок продажи)
+
+
+def opportunity_key(opportunity: Dict) -> OpportunityKey:
+    return (opportunity['symbol'], opportunity['buy_exchange'], opportunity['buy_market_type'],
+            opportunity['sell_exchange'], opportunity['sell_market_type'])
+
+
+@dataclass
+class OpportunityEvent:
+    kind: str  # 'added', 'changed' или 'removed'
+    key: OpportunityKey
+    opportunity: Dict
+
+
+class _SymbolState:
+    """Котировки одного символа и кучи лучших цен по типам рынка с ленивым удалением"""
+
+    __slots__ = ('quotes', 'versions', 'buy_heaps', 'sell_heaps', 'best')
+
+    def __init__(self):
+        self.quotes: Dict[Slot, Tuple[float, float, Optional[float]]] = {}  # bid, ask, время котировки
+        self.versions: Dict[Slot, int] = {}
+        # Покупка по bid (минимум эффективной цены), продажа по ask (максимум)
+        self.buy_heaps: Dict[str, list] = {market_type: [] for market_type in MARKET_TYPES}
+        self.sell_heaps: Dict[str, list] = {market_type: [] for market_type in MARKET_TYPES}
+        self.best: Dict[Tuple[str, str], Dict] = {}
+
+
+class IncrementalOpportunityEngine:
+    """Лучшая возможность по каждому символу и типу анализа, пересчитываемая только для измененного символа.
+
+    Обычно лучшая пара - вершины куч покупки и продажи. Если она не проходит окно спреда или
+    использует один слот, пары перебираются по убыванию эффективного отношения цен до первой
+    подходящей. Ноги старше max_age не участвуют, как и в полном скане.
+    """
+
+    def __init__(self, fees: Dict[str, Dict[str, float]], analysis_types: Dict[str, bool],
+                 min_profit: float, max_profit: float, investment: float, max_age: Optional[float] = None):
+        self.fees = fees
+        self.combinations: List[Tuple[str, str]] = []
+        self.min_profit = min_profit
+        self.max_profit = max_profit
+        self.investment = investment
+        self.max_age = max_age
+        # Наибольшие комиссии по типам рынка: граница сырого спреда по эффективному отношению цен
+        self._max_fee = {market_type: max((venue_fees[market_type] for venue_fees in fees.values()), default=0) / 100
+                         for market_type in MARKET_TYPES}
+        self._symbols: Dict[str, _SymbolState] = {}
+        self._last_bid: Optional[np.ndarray] = None
+        self._last_ask: Optional[np.ndarray] = None
+        self.configure(analysis_types)
+
+    def configure(self, analysis_types: Dict[str, bool]) -> List[OpportunityEvent]:
+        """Смена типов анализа: пересчет всех символов по новым направлениям"""
+        self.combinations = [combo for combo, analysis_type in PAIR_TYPES.items() if analysis_types.get(analysis_type)]
+        events = []
+        for symbol, state in list(self._symbols.items()):
+            events.extend(self._recompute(symbol, state))
+        return events
+
+    def clear(self) -> List[OpportunityEvent]:
+        """Сброс всех котировок (смена бирж): текущие возможности удаляются"""
+        events = [OpportunityEvent('removed', opportunity_key(opportunity), opportunity)
+                  for symbol, state in self._symbols.items() for opportunity in state.best.values()]
+        self._symbols.clear()
+        self._last_bid = self._last_ask = None
+        return events
+
+    def opportunities(self) -> List[Dict]:
+        """Текущие возможности, отсортированные по спреду"""
+        result = [opportunity for state in self._symbols.values() for opportunity in state.best.values()]
+        return sorted(result, key=lambda x: -x['spread_percent'])
+
+    def update(self, symbol: str, venue: str, market_type: str, bid: float, ask: float,
+               timestamp: Optional[float] = None) -> List[OpportunityEvent]:
+        """Применение одной котировки: O(log бирж) на обновление"""
+        state = self._symbols.get(symbol)
+        if state is None:
+            state = self._symbols[symbol] = _SymbolState()
+
+        self._set(state, (venue, market_type), bid, ask, timestamp)
+        return self._recompute(symbol, state)
+
+    def remove(self, symbol: str, venue: str, market_type: str) -> List[OpportunityEvent]:
+        """Удаление котировки (биржа перестала котировать символ)"""
+        state = self._symbols.get(symbol)
+        slot = (venue, market_type)
+        if state is None or slot not in state.quotes:
+            return []
+        self._drop(state, slot)
+        return self._recompute(symbol, state)
+
+    def sync(self, prices: PriceBookView) -> List[OpportunityEvent]:
+        """Применение к движку только тех котировок книги, что изменились с прошлого вызова"""
+        bid, ask = prices.bid, prices.ask
+        last_bid, last_ask = self._padded(self._last_bid, bid.shape), self._padded(self._last_ask, ask.shape)
+
+        timestamp = prices.timestamp
+        same_bid = (bid == last_bid) | (np.isnan(bid) & np.isnan(last_bid))
+        same_ask = (ask == last_ask) | (np.isnan(ask) & np.isnan(last_ask))
+
+        # Все изменения символа применяются до его пересчета: один пересчет на символ за вызов
+        touched: Dict[str, _SymbolState] = {}
+        for row, venue, market in zip(*np.nonzero(~(same_bid & same_ask))):
+            symbol, slot = prices.symbols[row], (prices.venues[venue], MARKET_TYPES[market])
+            state = self._symbols.get(symbol)
+            if np.isnan(bid[row, venue, market]):
+                if state is None or slot not in state.quotes:
+                    continue
+                self._drop(state, slot)
+            else:
+                if state is None:
+                    state = self._symbols[symbol] = _SymbolState()
+                quote_time = float(timestamp[row, venue, market])
+                self._set(state, slot, float(bid[row, venue, market]), float(ask[row, venue, market]),
+                          None if np.isnan(quote_time) else quote_time)
+            touched[symbol] = state
+
+        now = time.time()
+        events = []
+        for symbol, state in touched.items():
+            events.extend(self._recompute(symbol, state, now))
+        self._last_bid, self._last_ask = bid.copy(), ask.copy()
+        events.extend(self.expire(now))
+        return events
+
+    def expire(self, now: Optional[float] = None) -> List[OpportunityEvent]:
+        """Пересчет символов, у лучших возможностей которых нога устарела без новых котировок"""
+        if self.max_age is None:
+            return []
+        now = time.time() if now is None else now
+        events = []
+        for symbol, state in list(self._symbols.items()):
+            legs = [slot for opportunity in state.best.values()
+                    for slot in ((opportunity['buy_exchange'], opportunity['buy_market_type']),
+                                 (opportunity['sell_exchange'], opportunity['sell_market_type']))]
+            if any(self._stale(state, slot, now) for slot in legs):
+                events.extend(self._recompute(symbol, state, now))
+        return events
+
+    def _stale(self, state: _SymbolState, slot: Slot, now: float) -> bool:
+        timestamp = state.quotes[slot][2] if slot in state.quotes else None
+        return self.max_age is not None and timestamp is not None and now - timestamp > self.max_age
+
+    @staticmethod
+    def _padded(last: Optional[np.ndarray], shape: Tuple[int, ...]) -> np.ndarray:
+        padded = np.full(shape, np.nan)
+        if last is not None:
+            rows, venues = min(last.shape[0], shape[0]), min(last.shape[1], shape[1])
+            padded[:rows, :venues] = last[:rows, :venues]
+        return padded
+
+    def _set(self, state: _SymbolState, slot: Slot, bid: float, ask: float, timestamp: Optional[float]):
+        state.versions[slot] = state.versions.get(slot, 0) + 1
+        state.quotes[slot] = (bid, ask, timestamp)
+        self._push(state, slot)
+        self._compact(state, slot[1])
+
+    @staticmethod
+    def _drop(state: _SymbolState, slot: Slot):
+        del state.quotes[slot]
+        state.versions[slot] += 1  # все записи этого слота в кучах становятся устаревшими
+
+    def _push(self, state: _SymbolState, slot: Slot):
+        """Добавление котировки слота в кучи по эффективным ценам с учетом комиссии"""
+        venue, market_type = slot
+        bid, ask, _ = state.quotes[slot]
+        version = state.versions[slot]
+        fee = self.fees[venue][market_type] / 100
+        heapq.heappush(state.buy_heaps[market_type], (bid * (1 + fee), version, slot))
+        heapq.heappush(state.sell_heaps[market_type], (-ask * (1 - fee), version, slot))
+
+    def _compact(self, state: _SymbolState, market_type: str):
+        """Перестройка куч, когда устаревших записей стало слишком много"""
+        slots = [slot for slot in state.quotes if slot[1] == market_type]
+        if len(state.buy_heaps[market_type]) <= 4 * len(slots) + 8:
+            return
+        state.buy_heaps[market_type] = []
+        state.sell_heaps[market_type] = []
+        for slot in slots:
+            self._push(state, slot)
+
+    def _top(self, heap: list, state: _SymbolState, now: float):
+        """Лучшая актуальная запись кучи; устаревшие по версии и по возрасту снимаются"""
+        # Удаление котировки тоже увеличивает версию, поэтому проверки версии достаточно.
+        # Слишком старая котировка вернется в кучу только новой записью при следующем обновлении
+        while heap and (state.versions[heap[0][2]] != heap[0][1] or self._stale(state, heap[0][2], now)):
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def _best(self, symbol: str, state: _SymbolState, buy_market: str, sell_market: str,
+              now: float) -> Optional[Dict]:
+        """Лучшая по эффективным ценам возможность направления, проходящая окно спреда"""
+        buy_heap, sell_heap = state.buy_heaps[buy_market], state.sell_heaps[sell_market]
+        buy, sell = self._top(buy_heap, state, now), self._top(sell_heap, state, now)
+        # Пары с меньшим эффективным отношением не окупают комиссии или не дотягивают до min_profit
+        # даже при наибольших комиссиях (запас на округление, чтобы не отбросить граничную пару)
+        floor = max(1.0, (1 + self.min_profit / 100) * (1 - self._max_fee[sell_market])
+                    / (1 + self._max_fee[buy_market]) * (1 - 1e-9))
+        if buy is None or sell is None or -sell[0] <= buy[0] * floor:
+            return None
+        if buy[2] != sell[2]:
+            opportunity = self._evaluate(symbol, state, buy[2], sell[2])
+            if opportunity is not None:
+                return opportunity
+
+        # Вершины не подошли: перебор пар по убыванию отношения цен (обе последовательности монотонны)
+        buys = sorted(entry for entry in buy_heap if self._current(state, entry, now))
+        sells = sorted(entry for entry in sell_heap if self._current(state, entry, now))
+        frontier, seen = [(sell[0] / buy[0], 0, 0)], {(0, 0)}
+        while frontier:
+            _, i, j = heapq.heappop(frontier)
+            if -sells[j][0] <= buys[i][0] * floor:
+                return None
+            if buys[i][2] != sells[j][2]:
+                opportunity = self._evaluate(symbol, state, buys[i][2], sells[j][2])
+                if opportunity is not None:
+                    return opportunity
+            for next_i, next_j in ((i + 1, j), (i, j + 1)):
+                if next_i < len(buys) and next_j < len(sells) and (next_i, next_j) not in seen:
+                    seen.add((next_i, next_j))
+                    heapq.heappush(frontier, (sells[next_j][0] / buys[next_i][0], next_i, next_j))
+        return None
+
+    def _current(self, state: _SymbolState, entry: Tuple, now: float) -> bool:
+        return state.versions[entry[2]] == entry[1] and not self._stale(state, entry[2], now)
+
+    def _evaluate(self, symbol: str, state: _SymbolState, buy_slot: Slot, sell_slot: Slot) -> Optional[Dict]:
+        """Расчет возможности по той же формуле, что и полный скан"""
+        buy_price = state.quotes[buy_slot][0]
+        sell_price = state.quotes[sell_slot][1]
+        spread = sell_price - buy_price
+        if spread <= 0:
+            return None
+        spread_percent = (spread / buy_price) * 100
+        if not (self.min_profit <= spread_percent <= self.max_profit):
+            return None
+
+        buy_fee = self.fees[buy_slot[0]][buy_slot[1]]
+        sell_fee = self.fees[sell_slot[0]][sell_slot[1]]
+        coins = self.investment / buy_price
+        revenue = coins * sell_price
+        fee_amount = (self.investment * buy_fee / 100) + (revenue * sell_fee / 100)
+        profit = revenue - self.investment - fee_amount
+        if profit <= 0:
+            return None
+
+        return {
+            'symbol': symbol,
+            'buy_exchange': buy_slot[0],
+            'sell_exchange': sell_slot[0],
+            'buy_market_type': buy_slot[1],
+            'sell_market_type': sell_slot[1],
+            'buy_price': buy_price,
+            'sell_price': sell_price,
+            'spread_percent': spread_percent,
+            'profit_amount': profit,
+            'investment': self.investment
+        }
+
+    def _recompute(self, symbol: str, state: _SymbolState, now: Optional[float] = None) -> List[OpportunityEvent]:
+        """Пересчет возможностей одного символа и генерация событий по разнице"""
+        now = time.time() if now is None else now
+        events = []
+        # Направления, выключенные после прошлого пересчета, только удаляются
+        for combo in self.combinations + [combo for combo in state.best if combo not in self.combinations]:
+            current = self._best(symbol, state, *combo, now) if combo in self.combinations else None
+            previous = state.best.get(combo)
+
+            if previous is not None and (current is None or opportunity_key(previous) != opportunity_key(current)):
+                del state.best[combo]
+                events.append(OpportunityEvent('removed', opportunity_key(previous), previous))
+                previous = None
+
+            if current is None:
+                continue
+            state.best[combo] = current
+            if previous is None:
+                events.append(OpportunityEvent('added', opportunity_key(current), current))
+            elif previous != current:
+                events.append(OpportunityEvent('changed', opportunity_key(current), current))
+
+        if not state.quotes and not state.best:
+            del self._symbols[symbol]
+        return events
\ No newline at end of file
@@ -0,0 +1,130 @@
+import time
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+from .data_processor import MARKET_TYPES
+
+
+# Разрешенные направления сделки: (рынок покупки, рынок продажи) -> тип анализа
+PAIR_TYPES = {
+    ('spot', 'spot'): 'spot_spot',
+    ('spot', 'futures'): 'spot_futures',
+    ('futures', 'futures'): 'futures_futures'
+}
+
+
+class OpportunityScanner:
+    """Векторизованный перебор всех пар (биржа, рынок) для каждого символа"""
+
+    def __init__(self, venues: Sequence[str], fees: Dict[str, Dict[str, float]], analysis_types: Dict[str, bool]):
+        self.venues = list(venues)
+
+        # Слот - пара (биржа, тип рынка), развернутая в один индекс
+        self.slots = [(venue, market_type) for venue in self.venues for market_type in MARKET_TYPES]
+        self.fees = np.array([fees[venue][market_type] for venue, market_type in self.slots], dtype=float)
+
+        buy_idx, sell_idx = [], []
+        for i, (buy_venue, buy_market) in enumerate(self.slots):
+            for j, (sell_venue, sell_market) in enumerate(self.slots):
+                if i == j:
+                    continue
+                analysis_type = PAIR_TYPES.get((buy_market, sell_market))
+                if analysis_type and analysis_types.get(analysis_type):
+                    buy_idx.append(i)
+                    sell_idx.append(j)
+
+        self.buy_idx = np.array(buy_idx, dtype=np.intp)
+        self.sell_idx = np.array(sell_idx, dtype=np.intp)
+
+    def scan(self, symbols: Sequence[str], bid: np.ndarray, ask: np.ndarray,
+             min_profit: float, max_profit: float, investment: float,
+             timestamp: Optional[np.ndarray] = None, max_age: Optional[float] = None,
+             rank_age: Optional[float] = None) -> List[Dict]:
+        """Поиск возможностей по снимку; объекты создаются только для прошедших фильтр строк.
+
+        timestamp - время котировок: ноги старше max_age отбрасываются, а возможности
+        с ногами старше rank_age ставятся после свежих.
+        """
+        if not len(symbols) or not len(self.buy_idx):
+            return []
+
+        bid = bid.reshape(len(symbols), len(self.slots))
+        ask = ask.reshape(len(symbols), len(self.slots))
+        age = None
+        if timestamp is not None:
+            age = time.time() - timestamp.reshape(len(symbols), len(self.slots))
+            if max_age is not None:
+                with np.errstate(invalid='ignore'):
+                    stale = age > max_age
+                if stale.any():
+                    bid = np.where(stale, np.nan, bid)
+                    ask = np.where(stale, np.nan, ask)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # Грубый отсев: спред любой пары символа не больше max(ask) / min(bid) - 1,
+            # поэтому полную матрицу пар считаем только для строк-кандидатов
+            best_spread = (np.fmax.reduce(ask, axis=1) / np.fmin.reduce(bid, axis=1) - 1) * 100
+            candidates = np.flatnonzero(best_spread >= min_profit - 1e-9)
+            if not len(candidates):
+                return []
+            bid = bid[candidates]
+            ask = ask[candidates]
+
+            buy_price = bid[:, self.buy_idx]
+            sell_price = ask[:, self.sell_idx]
+
+            spread = sell_price - buy_price
+            spread_percent = (spread / buy_price) * 100
+            # NaN (нет котировки) не проходит ни одно сравнение
+            mask = (spread > 0) & (spread_percent >= min_profit) & (spread_percent <= max_profit)
+
+        rows, pairs = np.nonzero(mask)
+        if not len(rows):
+            return []
+        symbol_rows = candidates[rows]
+
+        buy = buy_price[rows, pairs]
+        sell = sell_price[rows, pairs]
+        buy_slot = self.buy_idx[pairs]
+        sell_slot = self.sell_idx[pairs]
+
+        # Тот же порядок операций, что и в попарной проверке, чтобы результаты совпадали
+        coins = investment / buy
+        revenue = coins * sell
+        fee_amount = (investment * self.fees[buy_slot] / 100) + (revenue * self.fees[sell_slot] / 100)
+        profit = revenue - investment - fee_amount
+
+        profitable = profit > 0
+        symbol_rows = symbol_rows[profitable]
+        buy_slot, sell_slot = buy_slot[profitable], sell_slot[profitable]
+        buy, sell, profit = buy[profitable], sell[profitable], profit[profitable]
+        percent = spread_percent[mask][profitable]
+
+        leg_age = None
+        if age is not None:
+            leg_age = np.fmax(age[symbol_rows, buy_slot], age[symbol_rows, sell_slot])
+        if leg_age is not None and rank_age is not None:
+            # Первичный ключ lexsort - последний: сначала свежие, внутри - по спреду
+            order = np.lexsort((-percent, leg_age > rank_age))
+        else:
+            order = np.argsort(-percent, kind='stable')
+
+        opportunities = []
+        for k in order.tolist():
+            buy_venue, buy_market = self.slots[buy_slot[k]]
+            sell_venue, sell_market = self.slots[sell_slot[k]]
+            opportunities.append({
+                'symbol': symbols[symbol_rows[k]],
+                'buy_exchange': buy_venue,
+                'sell_exchange': sell_venue,
+                'buy_market_type': buy_market,
+                'sell_market_type': sell_market,
+                'buy_price': float(buy[k]),
+                'sell_price': float(sell[k]),
+                'spread_percent': float(percent[k]),
+                'profit_amount': float(profit[k]),
+                'investment': investment
+            })
+            if leg_age is not None:
+                opportunities[-1]['quote_age'] = float(leg_age[k])
+
+        return opportunities
\ No newline at end of file
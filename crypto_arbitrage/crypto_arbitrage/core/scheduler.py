@@ -0,0 +1,90 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from ..config import config
+
+
+class ScanScheduler:
+    """Непрерывный запуск циклов скана: не больше одного цикла одновременно,
+    повторные запросы сливаются, при перегрузке интервал увеличивается"""
+
+    def __init__(self, cycle: Callable[[], Awaitable[Any]],
+                 period: Optional[float] = None, max_period: Optional[float] = None,
+                 on_result: Optional[Callable[[Any], None]] = None,
+                 on_error: Optional[Callable[[Exception], None]] = None):
+        self.cycle = cycle
+        self.period = period or config.SCAN_PERIOD
+        self.max_period = max(max_period or config.SCAN_MAX_PERIOD, self.period)
+        self.interval = self.period
+        self.on_result = on_result
+        self.on_error = on_error
+
+        self.stats: Dict[str, float] = {'cycles': 0, 'overruns': 0, 'coalesced': 0, 'last_elapsed': 0.0}
+        self._trigger = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._in_cycle = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        if not self.running:
+            self._task = (loop or asyncio.get_event_loop()).create_task(self._run())
+
+    def trigger(self):
+        """Внеочередной цикл; запросы во время цикла сливаются в один следующий"""
+        if self._in_cycle or self._trigger.is_set():
+            self.stats['coalesced'] += 1
+        self._trigger.set()
+
+    def set_period(self, period: float):
+        self.period = period
+        self.max_period = max(self.max_period, period)
+        self.interval = period
+
+    async def stop(self):
+        """Отмена текущего цикла и ожидание его завершения"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            self._trigger.clear()
+            started = time.monotonic()
+            self._in_cycle = True
+            try:
+                result = await self.cycle()
+                if self.on_result:
+                    self.on_result(result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(e)
+            finally:
+                self._in_cycle = False
+
+            elapsed = time.monotonic() - started
+            self.stats['cycles'] += 1
+            self.stats['last_elapsed'] = elapsed
+            self._adapt(elapsed)
+
+            try:
+                await asyncio.wait_for(self._trigger.wait(), max(0.0, self.interval - elapsed))
+            except asyncio.TimeoutError:
+                pass
+
+    def _adapt(self, elapsed: float):
+        """Увеличение интервала при переборе времени цикла и плавный возврат к целевому периоду"""
+        if elapsed > self.interval:
+            self.stats['overruns'] += 1
+            self.interval = min(self.max_period, max(elapsed, self.interval) * config.SCAN_BACKOFF)
+        else:
+            self.interval = max(self.period, self.interval / config.SCAN_BACKOFF)
\ No newline at end of file
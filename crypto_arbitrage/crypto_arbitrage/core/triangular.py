@@ -0,0 +1,267 @@
+import heapq
+import math
+import time
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from ..config import config
+from ..exchanges.symbol_map import QUOTES, parse_symbol
+from .data_processor import MARKET_INDEX, PriceBookView
+
+
+SPOT = MARKET_INDEX['spot']
+
+
+class _Layer:
+    """Ребра одного слоя графа: биржи (venue - ее столбец в книге) или общего (venue None).
+
+    У каждого символа два ребра: покупка базовой валюты за котируемую по ask (buy) и продажа по bid.
+    Ребра упорядочены по конечному узлу, чтобы минимум по входящим ребрам считался np.minimum.reduceat.
+    """
+
+    __slots__ = ('venue', 'row', 'buy', 'src', 'dst', 'rev', 'starts', 'targets', 'group',
+                 'anchors', 'close_rows', 'close_edges', 'weight', 'edge_venue')
+
+    def __init__(self, venue: Optional[int], rows: np.ndarray, base: np.ndarray, quote: np.ndarray,
+                 priority: Dict[int, Tuple]):
+        n = len(rows)
+        src = np.concatenate([quote, base])
+        dst = np.concatenate([base, quote])
+        order = np.argsort(dst, kind='stable')
+        position = np.empty(2 * n, dtype=np.intp)
+        position[order] = np.arange(2 * n)
+
+        self.venue = venue
+        self.row = np.concatenate([rows, rows])[order]
+        self.buy = (order < n)
+        self.src = src[order]
+        self.dst = dst[order]
+        # Обратное ребро - тот же символ в другую сторону
+        self.rev = position[(order + n) % (2 * n)]
+        self.starts = np.flatnonzero(np.r_[True, self.dst[1:] != self.dst[:-1]])
+        self.targets = self.dst[self.starts]
+        self.group = np.repeat(np.arange(len(self.starts)), np.diff(np.r_[self.starts, 2 * n]))
+        # Любое ребро касается котируемой валюты, поэтому циклы достаточно искать от них
+        self.anchors = np.array(sorted(set(quote.tolist()), key=priority.__getitem__), dtype=np.intp)
+        close_rows, close_edges = [], []
+        for i, anchor in enumerate(self.anchors.tolist()):
+            edges = np.flatnonzero(self.dst == anchor)
+            close_rows.append(np.full(len(edges), i, dtype=np.intp))
+            close_edges.append(edges)
+        self.close_rows = np.concatenate(close_rows) if close_rows else np.empty(0, dtype=np.intp)
+        self.close_edges = np.concatenate(close_edges) if close_edges else np.empty(0, dtype=np.intp)
+        self.weight = np.full(2 * n, np.inf)
+        self.edge_venue = np.full(2 * n, -1 if venue is None else venue, dtype=np.intp)
+
+
+class PriceGraph:
+    """Граф обмена активов на споте для поиска треугольного и кросс-котировочного арбитража.
+
+    Узлы - активы, ребра - покупка или продажа по лучшей цене стакана; вес ребра - минус логарифм
+    курса обмена с комиссией, поэтому прибыльный цикл имеет отрицательный вес. У каждой биржи свой слой
+    (циклы внутри биржи); в общем слое для каждой пары активов берется лучшая биржа (циклы через
+    несколько бирж при остатках на каждой, как и в межбиржевом скане).
+
+    Структура графа пересобирается только при появлении новых котировок, веса обновляются на месте
+    из снимка книги. Поиск - Bellman-Ford с ограниченной длиной цикла, векторизованный по всем
+    стартовым валютам слоя сразу.
+    """
+
+    def __init__(self, max_legs: Optional[int] = None, max_cycles: Optional[int] = None):
+        self.max_legs = max_legs or config.TRIANGULAR_MAX_LEGS
+        self.max_cycles = max_cycles or config.TRIANGULAR_MAX_CYCLES
+        self.assets: List[str] = []
+        self._asset_ids: Dict[str, int] = {}
+        self._pairs: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._symbols: Tuple[str, ...] = ()
+        self._venues: Tuple[str, ...] = ()
+        self._known: Optional[np.ndarray] = None
+        self._layers: List[_Layer] = []
+        self._bid: Optional[np.ndarray] = None
+        self._ask: Optional[np.ndarray] = None
+        self.stats = {'rebuilds': 0, 'edges': 0, 'searches': 0}
+
+    def _asset_id(self, asset: str) -> int:
+        asset_id = self._asset_ids.get(asset)
+        if asset_id is None:
+            asset_id = self._asset_ids[asset] = len(self.assets)
+            self.assets.append(asset)
+        return asset_id
+
+    def _pair(self, symbol: str) -> Optional[Tuple[int, int]]:
+        """(базовая, котируемая) символа книги; None - символ не разбирается на две валюты"""
+        if symbol not in self._pairs:
+            info = parse_symbol(symbol)
+            valid = info is not None and info.canonical == symbol and info.base != info.quote
+            self._pairs[symbol] = (self._asset_id(info.base), self._asset_id(info.quote)) if valid else None
+        return self._pairs[symbol]
+
+    def _priority(self, asset_id: int) -> Tuple:
+        # Цикл выдается от самой ликвидной из его котируемых валют
+        asset = self.assets[asset_id]
+        return (QUOTES.index(asset) if asset in QUOTES else len(QUOTES), asset)
+
+    def _build(self, symbols: Sequence[str], venues: Sequence[str], known: np.ndarray):
+        """Пересборка слоев по символам, котировавшимся хотя бы раз"""
+        pairs = [self._pair(symbol) for symbol in symbols]
+        parsed = np.array([pair is not None for pair in pairs], dtype=bool)
+        base = np.array([pair[0] if pair else -1 for pair in pairs], dtype=np.intp)
+        quote = np.array([pair[1] if pair else -1 for pair in pairs], dtype=np.intp)
+        priority = {asset_id: self._priority(asset_id) for asset_id in range(len(self.assets))}
+
+        layers = []
+        for venue in list(range(len(venues))) + [None]:
+            listed = known.any(axis=1) if venue is None else known[:, venue]
+            rows = np.flatnonzero(listed & parsed)
+            if len(rows):
+                layers.append(_Layer(venue, rows, base[rows], quote[rows], priority))
+
+        self._layers = layers
+        self._symbols, self._venues, self._known = tuple(symbols), tuple(venues), known
+        self.stats['rebuilds'] += 1
+        self.stats['edges'] = sum(len(layer.src) for layer in layers)
+
+    def refresh(self, prices: PriceBookView, fees: Dict[str, float], max_age: Optional[float] = None):
+        """Обновление весов по снимку книги; fees - комиссия спота биржи в процентах"""
+        bid = prices.bid[:, :, SPOT]
+        ask = prices.ask[:, :, SPOT]
+        quoted = ~np.isnan(bid) & ~np.isnan(ask)
+
+        known = self._known
+        same = (prices.venues == self._venues and known is not None and len(prices.symbols) >= known.shape[0]
+                and prices.symbols[:known.shape[0]] == self._symbols)
+        if not (same and len(prices.symbols) == known.shape[0] and not (quoted & ~known).any()):
+            if same:
+                grown = np.zeros(quoted.shape, dtype=bool)
+                grown[:known.shape[0]] = known
+                quoted = quoted | grown
+            self._build(prices.symbols, prices.venues, quoted)
+
+        if max_age is not None:
+            with np.errstate(invalid='ignore'):
+                stale = time.time() - prices.timestamp[:, :, SPOT] > max_age
+            bid = np.where(stale, np.nan, bid)
+            ask = np.where(stale, np.nan, ask)
+        self._bid, self._ask = bid, ask
+
+        keep = np.log1p(-np.array([fees[venue] for venue in prices.venues], dtype=float) / 100)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # Нет котировки - ребро с бесконечным весом; при пересборке структуры оно остается
+            buy_cost = np.where(np.isnan(ask), np.inf, np.log(ask) - keep)
+            sell_cost = np.where(np.isnan(bid), np.inf, -np.log(bid) - keep)
+
+        for layer in self._layers:
+            if layer.venue is not None:
+                layer.weight[:] = np.where(layer.buy, buy_cost[layer.row, layer.venue],
+                                           sell_cost[layer.row, layer.venue])
+                continue
+            # Общий слой: лучшая биржа для каждого ребра
+            costs = np.where(layer.buy[:, None], buy_cost[layer.row], sell_cost[layer.row])
+            layer.edge_venue[:] = costs.argmin(axis=1)
+            layer.weight[:] = costs[np.arange(len(costs)), layer.edge_venue]
+
+    def _search(self, layer: _Layer, low: float, high: float) -> Iterator[Tuple[float, List[int]]]:
+        """Циклы слоя с весом в (low, high) от лучшего: (вес, ребра по порядку от стартовой валюты).
+
+        dist[0, i, v] - лучший вес пути ровно из k ребер от стартовой валюты i до v, dist[1, i, v] - лучший
+        из путей с другой предпоследней валютой: запрет идти сразу обратно по тому же символу отсекает
+        только один из них. Путь не возвращается в стартовую валюту до замыкания, поэтому при длине до 4
+        найденный цикл простой и лучший для своей стартовой валюты и замыкающего ребра; для большей
+        длины непростые циклы отбрасываются.
+        """
+        anchors, weight = layer.anchors, layer.weight
+        rows = np.arange(len(anchors))
+        ids = np.arange(len(weight))
+        dist = np.full((2, len(anchors), len(self.assets)), np.inf)
+        dist[0, rows, anchors] = 0.0
+        pred = np.full(dist.shape, -1, dtype=np.intp)
+        history = []
+        found = []
+
+        for legs in range(1, self.max_legs + 1):
+            cand = dist[:, :, layer.src] + weight
+            if legs > 1:
+                cand[pred[:, :, layer.src] == layer.rev] = np.inf
+            # Для каждого ребра - лучший из двух путей до его начала
+            via = (cand[1] < cand[0]).astype(np.intp)
+            cand = np.minimum(cand[0], cand[1])
+            if legs >= 3 and len(layer.close_edges):
+                total = cand[layer.close_rows, layer.close_edges]
+                hits = np.flatnonzero((total < high) & (total > low))
+                found.append((np.full(len(hits), legs), layer.close_rows[hits], layer.close_edges[hits],
+                              via[layer.close_rows, layer.close_edges][hits], total[hits]))
+            if legs == self.max_legs:
+                break
+
+            dist = np.full(dist.shape, np.inf)
+            pred = np.full(dist.shape, -1, dtype=np.intp)
+            came = np.zeros(dist.shape, dtype=np.intp)
+            for rank in range(2):
+                best = np.minimum.reduceat(cand, layer.starts, axis=1)
+                # Ребро, давшее минимум: наибольший номер среди равных
+                argbest = np.maximum.reduceat(np.where(cand == best[:, layer.group], ids, -1),
+                                              layer.starts, axis=1)
+                dist[rank][:, layer.targets] = best
+                pred[rank][:, layer.targets] = argbest
+                came[rank][:, layer.targets] = np.take_along_axis(via, argbest, axis=1)
+                # Второй путь - через другую предпоследнюю валюту
+                cand = np.where(layer.src == layer.src[argbest][:, layer.group], np.inf, cand)
+            dist[:, rows, anchors] = np.inf
+            history.append((pred, came))
+
+        if not found:
+            return
+        lengths, close_rows, close_edges, close_via, totals = (np.concatenate(column) for column in zip(*found))
+        # Пути восстанавливаются лениво, от лучшего: обычно нужны только первые
+        for k in np.argsort(totals, kind='stable').tolist():
+            row, edge, rank = int(close_rows[k]), int(close_edges[k]), int(close_via[k])
+            edges = [edge]
+            node = layer.src[edge]
+            for step in range(int(lengths[k]) - 2, -1, -1):
+                pred, came = history[step]
+                edge, rank = int(pred[rank, row, node]), int(came[rank, row, node])
+                edges.append(edge)
+                node = layer.src[edge]
+            edges.reverse()
+            nodes = [int(layer.src[edge]) for edge in edges]
+            if node == anchors[row] and len(set(nodes)) == len(nodes):
+                yield float(totals[k]), edges
+
+    def _tagged(self, i: int, low: float, high: float) -> Iterator[Tuple[float, int, List[int]]]:
+        for total, edges in self._search(self._layers[i], low, high):
+            yield total, i, edges
+
+    def find_cycles(self, min_profit: float, max_profit: float, investment: float) -> List[Dict]:
+        """Прибыльные циклы всех слоев по убыванию доходности; min/max_profit - в процентах за цикл"""
+        self.stats['searches'] += 1
+        low, high = -math.log1p(max_profit / 100), -math.log1p(min_profit / 100)
+        searches = [self._tagged(i, low, high) for i in range(len(self._layers))]
+        seen = set()
+        result = []
+        # Слияние слоев по весу: поиск останавливается на max_cycles различных циклах
+        for total, i, edges in heapq.merge(*searches):
+            layer = self._layers[i]
+            steps = [(int(layer.row[edge]), int(layer.edge_venue[edge]), bool(layer.buy[edge])) for edge in edges]
+            key = frozenset(steps)
+            if key in seen:
+                continue
+            seen.add(key)
+            legs = [{
+                'symbol': self._symbols[row],
+                'exchange': self._venues[venue],
+                'side': 'buy' if buy else 'sell',
+                'price': float((self._ask if buy else self._bid)[row, venue])
+            } for row, venue, buy in steps]
+            rate = math.exp(-total)
+            venues = sorted({leg['exchange'] for leg in legs})
+            result.append({
+                'path': [self.assets[layer.src[edge]] for edge in edges] + [self.assets[layer.dst[edges[-1]]]],
+                'legs': legs,
+                'exchanges': venues,
+                'cross_exchange': len(venues) > 1,
+                'profit_percent': (rate - 1) * 100,
+                'profit_amount': investment * (rate - 1),
+                'investment': investment
+            })
+            if len(result) == self.max_cycles:
+                break
+        return result
\ No newline at end of file
@@ -0,0 +1,88 @@
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, Optional, Set, Tuple
+from .data_processor import MARKET_TYPES
+from .scanner import PAIR_TYPES
+
+
+Slot = Tuple[str, str]  # (биржа, тип рынка)
+
+
+class UniverseIndex:
+    """Индекс вселенной: какие слоты (биржа, рынок) листят каждый канонический символ.
+
+    Символ, которому не с чем составить пару ни в одном включенном типе анализа,
+    не может дать возможность, поэтому его тикеры отбрасываются еще при разборе ответа.
+    Листинги приходят из уже полученных ответов, а пересчет выполняется только после их изменения.
+    Треугольному анализу нужен весь спот биржи, поэтому при нем спот не фильтруется.
+    Базису нужны и срочные контракты, символ которых не совпадает со спотом, поэтому при нем
+    не фильтруются фьючерсы.
+    """
+
+    def __init__(self):
+        self.slots: Set[Slot] = set()
+        self.listings: Dict[Slot, FrozenSet[str]] = {}
+        self.partners: Dict[str, Set[str]] = {market_type: set() for market_type in MARKET_TYPES}
+        self.allowed: Dict[str, FrozenSet[str]] = {}
+        self.unfiltered: Set[str] = set()
+        self.dirty = False
+        self.stats = {'refreshes': 0}
+
+    def configure(self, slots: Iterable[Slot], analysis_types: Dict[str, bool]):
+        """Смена бирж или типов анализа; известные листинги сохраняются"""
+        self.slots = set(slots)
+        # Рынки, с которыми рынок образует пару в любом направлении сделки
+        self.partners = {market_type: set() for market_type in MARKET_TYPES}
+        for (buy_market, sell_market), analysis_type in PAIR_TYPES.items():
+            if analysis_types.get(analysis_type):
+                self.partners[buy_market].add(sell_market)
+                self.partners[sell_market].add(buy_market)
+        if analysis_types.get('basis'):
+            self.partners['spot'].add('futures')
+            self.partners['futures'].add('spot')
+        self.unfiltered = set()
+        if analysis_types.get('triangular'):
+            self.unfiltered.add('spot')
+        if analysis_types.get('basis'):
+            self.unfiltered.add('futures')
+        self.allowed = {}
+        self.dirty = True
+
+    @property
+    def ready(self) -> bool:
+        """Листинги известны для всех слотов; до этого фильтр не применяется"""
+        return bool(self.allowed) and self.slots.issubset(self.listings)
+
+    def update(self, venue: str, market_type: str, symbols: Iterable[str]):
+        listing = frozenset(symbols)
+        if self.listings.get((venue, market_type)) != listing:
+            self.listings[(venue, market_type)] = listing
+            self.dirty = True
+
+    def refresh(self):
+        """Пересчет допустимых символов по рынкам: у символа должен быть хотя бы один слот-партнер"""
+        counts = {market_type: Counter() for market_type in MARKET_TYPES}
+        for (venue, market_type), listing in self.listings.items():
+            if (venue, market_type) in self.slots:
+                counts[market_type].update(listing)
+
+        allowed = {}
+        for market_type in MARKET_TYPES:
+            symbols = set()
+            for partner in self.partners[market_type]:
+                # Слот не является партнером сам себе
+                own = 1 if partner == market_type else 0
+                symbols.update(symbol for symbol, count in counts[partner].items() if count > own)
+            if market_type in self.unfiltered:
+                symbols = counts[market_type].keys()
+            allowed[market_type] = frozenset(symbols & counts[market_type].keys())
+
+        self.allowed = allowed
+        self.dirty = False
+        self.stats['refreshes'] += 1
+
+    def keep_for(self, market_type: str) -> Optional[FrozenSet[str]]:
+        """Символы, которые стоит разбирать на рынке; None - индекс еще не готов"""
+        return self.allowed.get(market_type) if self.ready else None
+
+    def __len__(self) -> int:
+        return sum(len(symbols) for symbols in self.allowed.values())
\ No newline at end of file
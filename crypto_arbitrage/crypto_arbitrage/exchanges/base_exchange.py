@@ -1,52 +1,236 @@
 import abc
+import asyncio
+import json
+import time
 import aiohttp
-from typing import Dict, Optional, List
+import numpy as np
+from functools import partial
+from operator import itemgetter
+from typing import Any, Callable, Container, Dict, Iterable, NamedTuple, Optional, List, Sequence, Tuple, Union
 from datetime import datetime
+from urllib.parse import urlsplit
 from ..config import config
 from ..utils.logger import logger
-from ..utils.rate_limiter import RateLimiter
+from ..utils.rate_limiter import RateLimiter, RateLimitExceeded
 from ..utils.cache import cache
-from ..utils.error_handler import async_retry
+from ..utils.error_handler import async_retry, get_breaker
+from ..utils.http_client import http_client
+from ..utils.recorder import get_recorder
+from .parse_pool import parse_pool
+from .symbol_map import SymbolMap
+
+try:
+    # Необязательная зависимость: разбор JSON в несколько раз быстрее стандартного модуля
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+
+Field = Union[str, Tuple]  # ключ поля или путь к нему (ключи и индексы)
+
+
+class TickerSpec(NamedTuple):
+    """Где в ответе REST лежат тикеры и какие поля из них нужны"""
+    symbol: Optional[Field]
+    bid: Field
+    ask: Field
+    bid_size: Optional[Field] = None
+    ask_size: Optional[Field] = None
+    path: Tuple = ()  # путь от корня ответа к списку тикеров
+    keyed: bool = False  # тикеры - словарь {символ: тикер}
+    symbol_strip: str = ''  # удаляется из символа перед нормализацией
+
+
+class TickerColumns(NamedTuple):
+    """Котировки одного ответа в виде колонок; строки уже прошли проверку цен"""
+    symbols: List[str]
+    originals: List[str]
+    bid: np.ndarray
+    ask: np.ndarray
+    bid_size: np.ndarray
+    ask_size: np.ndarray
+    skipped: int = 0  # тикеры, отброшенные по индексу вселенной до разбора цен
+    listing: Optional[frozenset] = None  # канонические символы ответа, если листинг изменился
+    timestamp: Optional[float] = None  # время получения ответа биржи
+
+
+class DepthSpec(NamedTuple):
+    """Где в ответе REST лежат уровни стакана; уровень - [цена, количество, ...]"""
+    bids: Tuple
+    asks: Tuple
+
+
+class OrderBook(NamedTuple):
+    """Стакан L2: массивы (уровней, 2) с ценой и количеством в базовой валюте, от лучшей цены"""
+    bids: np.ndarray
+    asks: np.ndarray
+    timestamp: Optional[float] = None
+
+    @classmethod
+    def from_rows(cls, bids: Any, asks: Any, timestamp: Optional[float] = None) -> 'OrderBook':
+        return cls(_levels(bids), _levels(asks), timestamp)
+
+
+class FundingSpec(NamedTuple):
+    """Где в ответе REST лежат ставки финансирования бессрочных контрактов (все символы одним запросом)"""
+    symbol: Field
+    rate: Field  # ставка за интервал, доля
+    next_time: Optional[Field] = None  # время ближайшего списания
+    interval: Optional[Field] = None  # интервал между списаниями
+    following_time: Optional[Field] = None  # время списания после ближайшего, если интервала в ответе нет
+    time_unit: float = 1e-3  # секунд в единице времени ответа (по умолчанию - миллисекунды)
+    interval_unit: float = 1.0  # часов в единице interval
+    path: Tuple = ()
+    symbol_strip: str = ''
+
+
+class FundingColumns(NamedTuple):
+    """Ставки финансирования одного ответа по каноническим символам; неизвестные значения - NaN"""
+    symbols: List[str]
+    rate: np.ndarray  # доля за интервал; положительная - платят длинные позиции
+    next_time: np.ndarray  # время ближайшего списания, unix-секунды
+    interval: np.ndarray  # часов между списаниями
+    timestamp: Optional[float] = None
+
+
+def _levels(rows: Any) -> np.ndarray:
+    try:
+        values = [value for row in rows for value in (row[0], row[1])]
+    except (IndexError, KeyError, TypeError):
+        return np.empty((0, 2))
+    levels = _to_float(values).reshape(-1, 2)
+    # Уровни с нечисловой или нулевой ценой или количеством не исполнимы
+    with np.errstate(invalid='ignore'):
+        return levels[(levels[:, 0] > 0) & (levels[:, 1] > 0)]
+
+
+def _getter(field: Field) -> Callable[[Any], Any]:
+    if isinstance(field, str):
+        return itemgetter(field)
+
+    def get(ticker):
+        for key in field:
+            ticker = ticker[key]
+        return ticker
+    return get
+
+
+def _to_float(values: Sequence) -> np.ndarray:
+    """Преобразование строк и чисел биржи в float64; нечисловые значения становятся NaN"""
+    try:
+        return np.array(values, dtype=float)
+    except (ValueError, TypeError):
+        result = np.full(len(values), np.nan)
+        for i, value in enumerate(values):
+            try:
+                result[i] = float(value)
+            except (ValueError, TypeError):
+                pass
+        return result
 
 
 class BaseExchange(abc.ABC):
+    # Описание полей тикеров по типам рынка для колоночного разбора (get_price_columns)
+    TICKER_SPECS: Dict[str, TickerSpec] = {}
+    # Поля стакана по типам рынка (get_order_book); адрес - {market_type}_depth_url в настройках биржи.
+    # Только рынки, где количество в стакане указано в базовой валюте, а не в контрактах
+    DEPTH_SPECS: Dict[str, DepthSpec] = {}
+    # Ставки финансирования бессрочных контрактов (get_funding); адрес - funding_url в настройках биржи
+    FUNDING_SPEC: Optional[FundingSpec] = None
+
     def __init__(self, exchange_name: str):
         self.name = exchange_name
         self.config = config.get_exchange_config(exchange_name)
-        self.rate_limiter = RateLimiter(self.config.get('rate_limit', 5))
-        self._session: Optional[aiohttp.ClientSession] = None
+        # Лимиты у бирж считаются по хостам: спот и фьючерсы Binance имеют отдельные бюджеты
+        self.rate_limiters: Dict[str, RateLimiter] = {}
+        # False - при исчерпанном бюджете запрос пропускается (RateLimitExceeded), а не ждет в очереди
+        self.wait_for_budget = config.RATE_LIMIT_WAIT
+        self.symbols = SymbolMap()
         self.last_update: Dict[str, datetime] = {}
+        self.fetched_at: Dict[str, float] = {}  # url -> время получения последнего ответа (time.time())
+        # Отпечатки листингов, проверенных в пуле разбора (parse_pool), по типам рынка
+        self._listing_digests: Dict[str, bytes] = {}
+
+        # Потоковый режим: живая таблица лучших цен по типам рынка
+        self.live_quotes: Dict[str, Dict[str, Dict]] = {'spot': {}, 'futures': {}}
+        self.stream_stats: Dict[str, Dict[str, int]] = {}
+        self._stream_tasks: Dict[str, asyncio.Task] = {}
+        self._last_message: Dict[str, float] = {}
+        self._sequences: Dict[str, Dict[str, int]] = {}
+        # Подписчики на обновления котировок: listener(market_type, symbol, quote)
+        self.quote_listeners: List[Callable[[str, str, Dict], None]] = []
 
     async def get_session(self) -> aiohttp.ClientSession:
-        if self._session is None or self._session.closed:
-            timeout = aiohttp.ClientTimeout(total=config.REQUEST_TIMEOUT)
-            self._session = aiohttp.ClientSession(timeout=timeout)
-        return self._session
+        # Общий пул соединений процесса; закрывается вместе с движком, а не адаптером
+        return http_client.session()
 
     async def close(self):
-        if self._session and not self._session.closed:
-            await self._session.close()
-            self._session = None
+        await self.stop_streaming()
+
+    def rate_limiter_for(self, url: str) -> RateLimiter:
+        host = urlsplit(url).netloc
+        limiter = self.rate_limiters.get(host)
+        if limiter is None:
+            limiter = self.rate_limiters[host] = RateLimiter(
+                self.config.get('rate_limit', 5), self.config.get('rate_limits'),
+                self.config.get('weights'), self.config.get('usage_headers', ())
+            )
+        return limiter
 
-    @async_retry()
     async def fetch_data(self, url: str, params: Optional[Dict] = None) -> Dict:
-        cache_key = f"{self.name}_{url}_{str(params)}"
-        cached_data = await cache.get(cache_key)
-        if cached_data:
-            logger.debug(f"Using cached data for {self.name}")
-            return cached_data
+        return self.decode(await self.fetch_body(url, params))
+
+    async def fetch_body(self, url: str, params: Optional[Dict] = None) -> bytes:
+        """Тело ответа без разбора: разбор может уйти в пул процессов"""
+        # Одновременные запросы одного адреса (колонки и снимок потока, несколько подписчиков) делят
+        # один HTTP-запрос: в кэше хранится тело, а разбирает его каждый вызывающий сам
+        cache_key = (self.name, url, tuple(sorted(params.items())) if params else None)
+        entry = await cache.get_or_fetch(cache_key, partial(self._request, url, params), config.CACHE_STALE_TTL)
+        # Время снимка, а не выдачи: из кэша может прийти ответ, полученный раньше
+        self.fetched_at[url] = time.time() - (time.monotonic() - entry.stored)
+        return entry.value
 
+    async def _acquire_budget(self, url: str, *args, **kwargs):
+        """Бюджет запроса у ограничителя; выполняется вне автомата, чтобы очередь к лимиту не считалась задержкой"""
+        limiter = self.rate_limiter_for(url)
+        weight = limiter.weight(url)
+        if self.wait_for_budget:
+            await limiter.acquire(weight)
+        elif not limiter.try_acquire(weight):
+            raise RateLimitExceeded(f"Request budget exhausted for {self.name}")
+
+    @async_retry(venue=lambda self, *args, **kwargs: self.name,
+                 prepare=lambda self, *args, **kwargs: self._acquire_budget(*args, **kwargs))
+    async def _request(self, url: str, params: Optional[Dict]) -> Tuple[bytes, int]:
+        limiter = self.rate_limiter_for(url)
+        weight = limiter.weight(url)
+        # Запрос тикеров идемпотентен: дубль после p95 задержки срезает хвост, если на него есть бюджет
+        body = await get_breaker(self.name).hedged(partial(self._send, url, params),
+                                                   partial(limiter.try_acquire, weight))
+        recorder = get_recorder()
+        if recorder is not None:
+            recorder.record('adapter', self.name, None, url, body, params)
+        return body, len(body)
+
+    async def _send(self, url: str, params: Optional[Dict]) -> bytes:
         session = await self.get_session()
-        async with self.rate_limiter:
-            async with session.get(url, params=params) as response:
-                if response.status != 200:
-                    error_msg = f"Bad status {response.status} for {self.name}"
-                    logger.error(error_msg)
-                    raise Exception(error_msg)
+        limiter = self.rate_limiter_for(url)
+        async with session.get(url, params=params) as response:
+            limiter.update_from_headers(response.headers)
+            if response.status in (418, 429):
+                retry_after = response.headers.get('Retry-After', '')
+                limiter.penalize(float(retry_after) if retry_after.isdigit() else config.RATE_LIMIT_PENALTY)
+                raise RateLimitExceeded(f"Rate limited by {self.name} (status {response.status})")
+            if response.status != 200:
+                error_msg = f"Bad status {response.status} for {self.name}"
+                logger.error(error_msg)
+                raise Exception(error_msg)
+            return await response.read()
 
-                data = await response.json()
-                await cache.set(cache_key, data)
-                return data
+    @staticmethod
+    def decode(body: bytes) -> Any:
+        """Разбор тела ответа; используется и при воспроизведении записей"""
+        return _json_loads(body)
 
     @abc.abstractmethod
     async def get_spot_prices(self) -> Dict[str, Dict]:
@@ -56,20 +240,348 @@ class BaseExchange(abc.ABC):
     async def get_futures_prices(self) -> Dict[str, Dict]:
         pass
 
+    async def get_prices(self, market_type: str) -> Dict[str, Dict]:
+        """Котировки из живого потока, если он активен, иначе через REST"""
+        if self.stream_is_live(market_type):
+            return self.live_quotes[market_type]
+        if market_type == 'futures':
+            return await self.get_futures_prices()
+        return await self.get_spot_prices()
+
+    async def get_price_columns(self, market_type: str,
+                                keep: Optional[Container[str]] = None) -> Optional[TickerColumns]:
+        """Колоночный разбор REST-ответа; None - у адаптера нет описания полей или активен поток"""
+        spec = self.TICKER_SPECS.get(market_type)
+        url = self.config.get(f'{market_type}_url')
+        if spec is None or not url or self.stream_is_live(market_type):
+            return None
+        body = await self.fetch_body(url)
+        if parse_pool.offloads(len(body)):
+            columns, self._listing_digests[market_type] = await parse_pool.parse(
+                self.name, market_type, body, keep, self._listing_digests.get(market_type))
+            # Листинг проверен в пуле; таблица символов процесса нужна для обратного поиска (стаканы)
+            self.symbols.reset_listing(market_type)
+            self.symbols.canonicalize(columns.originals, market_type, spec.symbol_strip)
+        else:
+            parse_pool.stats['inline'] += 1
+            self._listing_digests.pop(market_type, None)
+            columns = self.parse_columns(self.decode(body), market_type, keep)
+        return columns._replace(timestamp=self.fetched_at.get(url))
+
+    def parse_columns(self, data: Any, market_type: str, keep: Optional[Container[str]] = None) -> TickerColumns:
+        """Извлечение только нужных полей тикеров без промежуточного словаря на каждый тикер.
+
+        keep - канонические символы, которые стоит разбирать (индекс вселенной);
+        остальные тикеры отбрасываются до преобразования цен и объемов.
+        """
+        spec = self.TICKER_SPECS[market_type]
+        rows = data
+        try:
+            for key in spec.path:
+                rows = rows[key]
+        except (KeyError, IndexError, TypeError):
+            rows = []
+
+        if spec.keyed:
+            keys, tickers = list(rows), list(rows.values())
+        else:
+            keys, tickers = None, rows
+
+        get_symbol = _getter(spec.symbol) if spec.symbol is not None else None
+        get_bid, get_ask = _getter(spec.bid), _getter(spec.ask)
+        symbols, bids, asks, kept = [], [], [], []
+        for i, ticker in enumerate(tickers):
+            try:
+                symbol = keys[i] if keys is not None else get_symbol(ticker)
+                bid, ask = get_bid(ticker), get_ask(ticker)
+            except (KeyError, IndexError, TypeError):
+                continue
+            symbols.append(symbol)
+            bids.append(bid)
+            asks.append(ask)
+            kept.append(ticker)
+
+        canonical = self.symbols.canonicalize(symbols, market_type, spec.symbol_strip)
+        listing = None
+        if self.symbols.update_listing(symbols, market_type):
+            listing = frozenset(symbol for symbol in canonical if symbol is not None)
+
+        # Символы без распознанной котируемой валюты и не попавшие в keep не разбираются дальше
+        if keep is not None:
+            selected = [i for i, symbol in enumerate(canonical) if symbol in keep]
+        elif None in canonical:
+            selected = [i for i, symbol in enumerate(canonical) if symbol is not None]
+        else:
+            selected = None
+        skipped = 0
+        if selected is not None:
+            skipped = len(canonical) - len(selected)
+            canonical = [canonical[i] for i in selected]
+            symbols = [symbols[i] for i in selected]
+            bids = [bids[i] for i in selected]
+            asks = [asks[i] for i in selected]
+            kept = [kept[i] for i in selected]
+
+        bid, ask = _to_float(bids), _to_float(asks)
+        # NaN не проходит сравнения, поэтому нечисловые цены отсеиваются здесь же
+        with np.errstate(invalid='ignore'):
+            valid = np.flatnonzero((bid > 0) & (ask > 0) & (bid < ask)).tolist()
+        kept = [kept[i] for i in valid]
+        return TickerColumns(
+            [canonical[i] for i in valid], [symbols[i] for i in valid], bid[valid], ask[valid],
+            self._optional_column(spec.bid_size, kept), self._optional_column(spec.ask_size, kept),
+            skipped, listing
+        )
+
+    async def get_order_book(self, symbol: str, market_type: str, limit: int) -> Optional[OrderBook]:
+        """Стакан по каноническому символу; None - у биржи нет описания стакана для рынка или символ неизвестен"""
+        spec = self.DEPTH_SPECS.get(market_type)
+        url = self.config.get(f'{market_type}_depth_url')
+        raw = self.symbols.raw(symbol, market_type)
+        if spec is None or not url or raw is None:
+            return None
+        url = url.format(symbol=raw, limit=limit)
+        data = await self.fetch_data(url)
+        return self.parse_order_book(data, market_type)._replace(timestamp=self.fetched_at.get(url))
+
+    def parse_order_book(self, data: Any, market_type: str) -> OrderBook:
+        spec = self.DEPTH_SPECS[market_type]
+        sides = []
+        for path in (spec.bids, spec.asks):
+            rows = data
+            try:
+                for key in path:
+                    rows = rows[key]
+            except (KeyError, IndexError, TypeError):
+                rows = []
+            sides.append(rows or [])
+        return OrderBook.from_rows(*sides)
+
+    async def get_funding(self) -> Optional[FundingColumns]:
+        """Ставки финансирования всех бессрочных контрактов; None - у биржи нет их описания"""
+        url = self.config.get('funding_url')
+        if self.FUNDING_SPEC is None or not url:
+            return None
+        data = await self.fetch_data(url)
+        return self.parse_funding(data)._replace(timestamp=self.fetched_at.get(url))
+
+    def parse_funding(self, data: Any) -> FundingColumns:
+        spec = self.FUNDING_SPEC
+        rows = data
+        try:
+            for key in spec.path:
+                rows = rows[key]
+        except (KeyError, IndexError, TypeError):
+            rows = []
+
+        get_symbol, get_rate = _getter(spec.symbol), _getter(spec.rate)
+        symbols, rates, kept = [], [], []
+        for row in rows:
+            try:
+                symbol, rate = get_symbol(row), get_rate(row)
+            except (KeyError, IndexError, TypeError):
+                continue
+            symbols.append(symbol)
+            rates.append(rate)
+            kept.append(row)
+
+        canonical = self.symbols.canonicalize(symbols, 'futures', spec.symbol_strip)
+        selected = [i for i, symbol in enumerate(canonical) if symbol is not None]
+        kept = [kept[i] for i in selected]
+        next_time = self._optional_column(spec.next_time, kept) * spec.time_unit
+        if spec.interval is not None:
+            interval = self._optional_column(spec.interval, kept) * spec.interval_unit
+        elif spec.following_time is not None:
+            interval = (self._optional_column(spec.following_time, kept) * spec.time_unit - next_time) / 3600
+        else:
+            interval = np.full(len(kept), np.nan)
+        with np.errstate(invalid='ignore'):
+            interval[~(interval > 0)] = np.nan
+        return FundingColumns([canonical[i] for i in selected], _to_float([rates[i] for i in selected]),
+                              next_time, interval)
+
     @staticmethod
-    def normalize_pair(pair: str, market_type: str = 'spot') -> str:
-        pair = pair.upper()
-        pair = ''.join(c for c in pair if c.isalpha())
+    def _optional_column(field: Optional[Field], tickers: List) -> np.ndarray:
+        """Необязательная колонка (объемы): отсутствующее поле дает NaN, а не пропуск тикера"""
+        if field is None:
+            return np.full(len(tickers), np.nan)
+        get = _getter(field)
+        values = []
+        for ticker in tickers:
+            try:
+                values.append(get(ticker))
+            except (KeyError, IndexError, TypeError):
+                values.append(None)
+        return _to_float(values)
 
-        if market_type == 'futures':
-            for suffix in ['PERP', 'PERPETUAL', 'USD', 'USDT', 'SWAP']:
-                if pair.endswith(suffix):
-                    pair = pair[:-len(suffix)]
-                    break
+    # --- Потоковый режим (WebSocket) ---
+
+    def ws_url(self, market_type: str) -> Optional[str]:
+        return self.config.get(f'{market_type}_ws_url')
+
+    def supports_streaming(self, market_type: str) -> bool:
+        return bool(self.ws_url(market_type))
+
+    def stream_is_live(self, market_type: str) -> bool:
+        """Поток запущен и присылал данные не позже STREAM_STALE_AFTER секунд назад"""
+        task = self._stream_tasks.get(market_type)
+        if task is None or task.done():
+            return False
+        last_message = self._last_message.get(market_type)
+        return last_message is not None and time.monotonic() - last_message < config.STREAM_STALE_AFTER
+
+    async def start_streaming(self, market_types: Iterable[str] = ('spot', 'futures')):
+        """Запуск подписок на лучшие цены; начальный снимок и список символов берутся из REST"""
+        for market_type in market_types:
+            if not self.supports_streaming(market_type) or market_type in self._stream_tasks:
+                continue
+            if market_type == 'futures':
+                snapshot = await self.get_futures_prices()
+            else:
+                snapshot = await self.get_spot_prices()
+            for quote in snapshot.values():
+                quote.setdefault('exchange', self.name)
+                quote['timestamp'] = time.time()
+            self.live_quotes[market_type] = snapshot
+            self.stream_stats[market_type] = {'connects': 0, 'messages': 0, 'updates': 0, 'gaps': 0, 'stale': 0}
+            self._stream_tasks[market_type] = asyncio.create_task(self._stream(market_type))
+
+    async def stop_streaming(self):
+        tasks = list(self._stream_tasks.values())
+        self._stream_tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _stream(self, market_type: str):
+        """Чтение потока с переподключением и повторной подпиской"""
+        backoff = 1.0
+        while True:
+            ping_task = None
+            try:
+                session = await self.get_session()
+                async with session.ws_connect(self.ws_url(market_type), receive_timeout=config.STREAM_STALE_AFTER * 2) as ws:
+                    # Номера последовательностей имеют смысл только внутри одного соединения
+                    self._sequences[market_type] = {}
+                    symbols = [quote['original'] for quote in self.live_quotes[market_type].values()]
+                    for message in self._ws_subscribe_messages(market_type, symbols[:config.STREAM_MAX_SYMBOLS]):
+                        await self._ws_send(ws, message)
+                    self.stream_stats[market_type]['connects'] += 1
+                    logger.info(f"{self.name} {market_type} stream connected ({len(symbols)} symbols)")
+                    backoff = 1.0
 
-        for suffix in ['USDT', 'USDC', 'BUSD', 'BTC']:
-            if pair.endswith(suffix):
-                pair = pair[:-len(suffix)]
-                break
+                    ping_task = asyncio.create_task(self._ws_keepalive(ws, market_type))
+                    async for msg in ws:
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            self._on_ws_message(market_type, msg.data)
+                        elif msg.type == aiohttp.WSMsgType.BINARY:
+                            self._on_ws_message(market_type, self._ws_decode_binary(msg.data))
+                        elif msg.type == aiohttp.WSMsgType.ERROR:
+                            break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"{self.name} {market_type} stream error: {str(e)}")
+            finally:
+                if ping_task:
+                    ping_task.cancel()
+
+            logger.info(f"{self.name} {market_type} stream reconnecting in {backoff:.0f}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    async def _ws_keepalive(self, ws, market_type: str):
+        while not ws.closed:
+            await asyncio.sleep(config.STREAM_PING_INTERVAL)
+            message = self._ws_ping_message(market_type)
+            if message is not None:
+                await self._ws_send(ws, message)
+
+    @staticmethod
+    async def _ws_send(ws, message: Any):
+        if isinstance(message, str):
+            await ws.send_str(message)
+        else:
+            await ws.send_str(json.dumps(message))
+
+    def _on_ws_message(self, market_type: str, raw: str):
+        """Применение сообщения потока к живой таблице"""
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return  # pong и прочие служебные ответы
+
+        now = time.monotonic()
+        self._last_message[market_type] = now
+        stats = self.stream_stats[market_type]
+        stats['messages'] += 1
+
+        try:
+            updates = list(self._ws_parse(market_type, data))
+        except (KeyError, ValueError, IndexError, TypeError, AttributeError):
+            return
+
+        table = self.live_quotes[market_type]
+        for symbol, bid, ask, bid_size, ask_size, seq, prev_seq in updates:
+            if not self._ws_check_sequence(market_type, symbol, seq, prev_seq):
+                continue
+
+            normalized = self.normalize_pair(symbol, market_type)
+            quote = table.get(normalized)
+            if quote is None:
+                quote = table[normalized] = {'exchange': self.name, 'original': symbol, 'market_type': market_type,
+                                             'bid': 0.0, 'ask': 0.0, 'bid_volume': 0.0, 'ask_volume': 0.0}
+
+            # None означает, что сторона книги в сообщении не менялась
+            bid = quote['bid'] if bid is None else bid
+            ask = quote['ask'] if ask is None else ask
+            if bid <= 0 or ask <= 0 or bid >= ask:
+                continue
+
+            quote['bid'] = bid
+            quote['ask'] = ask
+            if bid_size is not None:
+                quote['bid_volume'] = bid_size
+            if ask_size is not None:
+                quote['ask_volume'] = ask_size
+            quote['timestamp'] = time.time()
+            stats['updates'] += 1
+            for listener in self.quote_listeners:
+                listener(market_type, normalized, quote)
+
+    def _ws_check_sequence(self, market_type: str, symbol: str, seq: Optional[int], prev_seq: Optional[int]) -> bool:
+        """Контроль номеров обновлений: устаревшие отбрасываются, разрывы учитываются"""
+        if seq is None:
+            return True
+        sequences = self._sequences[market_type]
+        last = sequences.get(symbol)
+        if last is not None:
+            if seq <= last:
+                self.stream_stats[market_type]['stale'] += 1
+                return False
+            if prev_seq is not None and prev_seq != last:
+                # Лучшая цена самодостаточна, поэтому сообщение применяется, а разрыв только учитывается
+                self.stream_stats[market_type]['gaps'] += 1
+                logger.debug("%s %s sequence gap on %s: %s -> %s", self.name, market_type, symbol, last, prev_seq)
+        sequences[symbol] = seq
+        return True
+
+    def _ws_subscribe_messages(self, market_type: str, symbols: List[str]) -> List[Any]:
+        """Сообщения подписки на канал лучших цен"""
+        return []
+
+    def _ws_parse(self, market_type: str, data: Any) -> Iterable[Tuple]:
+        """Разбор сообщения в кортежи (symbol, bid, ask, bid_size, ask_size, seq, prev_seq)"""
+        return ()
+
+    def _ws_ping_message(self, market_type: str) -> Optional[Any]:
+        return None
+
+    @staticmethod
+    def _ws_decode_binary(data: bytes) -> str:
+        return data.decode('utf-8')
 
-        return pair
\ No newline at end of file
+    def normalize_pair(self, pair: str, market_type: str = 'spot') -> str:
+        """Канонический символ BASE/QUOTE из таблицы биржи; нераспознанный символ возвращается как есть"""
+        info = self.symbols.get(pair, market_type)
+        return info.canonical if info else pair.upper()
\ No newline at end of file
@@ -1,9 +1,19 @@
-from typing import Dict
-from .base_exchange import BaseExchange
+from typing import Any, Dict, Iterable, List, Tuple
+from .base_exchange import BaseExchange, DepthSpec, FundingSpec, TickerSpec
 from ..config import config
 
 
 class BinanceExchange(BaseExchange):
+    TICKER_SPECS = {
+        'spot': TickerSpec('symbol', 'bidPrice', 'askPrice', 'bidQty', 'askQty'),
+        'futures': TickerSpec('symbol', 'bidPrice', 'askPrice', 'bidQty', 'askQty')
+    }
+    DEPTH_SPECS = {
+        'spot': DepthSpec(('bids',), ('asks',)),
+        'futures': DepthSpec(('bids',), ('asks',))
+    }
+    FUNDING_SPEC = FundingSpec('symbol', 'lastFundingRate', 'nextFundingTime')
+
     def __init__(self):
         super().__init__('binance')
 
@@ -61,4 +71,18 @@ class BinanceExchange(BaseExchange):
             except (KeyError, ValueError) as e:
                 continue
 
-        return prices
\ No newline at end of file
+        return prices
+
+    def _ws_subscribe_messages(self, market_type: str, symbols: List[str]) -> List[Any]:
+        return [{
+            'method': 'SUBSCRIBE',
+            'params': [f"{symbol.lower()}@bookTicker" for symbol in symbols],
+            'id': 1
+        }]
+
+    def _ws_parse(self, market_type: str, data: Any) -> Iterable[Tuple]:
+        # Ответы на подписку ({"result": null, "id": 1}) не содержат котировок
+        if 'u' not in data or 's' not in data:
+            return ()
+        return ((data['s'], float(data['b']), float(data['a']),
+                 float(data['B']), float(data['A']), data['u'], None),)
\ No newline at end of file
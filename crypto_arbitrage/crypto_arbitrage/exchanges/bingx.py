@@ -1,8 +1,14 @@
-from .base_exchange import BaseExchange
+from .base_exchange import BaseExchange, FundingSpec, TickerSpec
 from typing import Dict
 
 
 class BingXExchange(BaseExchange):
+    TICKER_SPECS = {
+        'spot': TickerSpec('symbol', 'bidPrice', 'askPrice', path=('data',)),
+        'futures': TickerSpec('symbol', 'bidPrice', 'askPrice', path=('data',))
+    }
+    FUNDING_SPEC = FundingSpec('symbol', 'lastFundingRate', 'nextFundingTime', path=('data',))
+
     def __init__(self):
         super().__init__('bingx')
 
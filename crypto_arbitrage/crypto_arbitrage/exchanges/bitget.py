@@ -1,8 +1,14 @@
-from .base_exchange import BaseExchange
+from .base_exchange import BaseExchange, FundingSpec, TickerSpec
 from typing import Dict
 
 
 class BitgetExchange(BaseExchange):
+    TICKER_SPECS = {
+        'spot': TickerSpec('symbol', 'buyOne', 'sellOne', 'bidSz', 'askSz', path=('data',)),
+        'futures': TickerSpec('symbol', 'bestBid', 'bestAsk', 'bidSz', 'askSz', path=('data',))
+    }
+    FUNDING_SPEC = FundingSpec('symbol', 'fundingRate', 'nextUpdate', 'fundingRateInterval', path=('data',))
+
     def __init__(self):
         super().__init__('bitget')
 
@@ -1,8 +1,19 @@
-from .base_exchange import BaseExchange
-from typing import Dict
+from .base_exchange import BaseExchange, DepthSpec, FundingSpec, TickerSpec
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 
 class BybitExchange(BaseExchange):
+    TICKER_SPECS = {
+        'spot': TickerSpec('symbol', 'bid1Price', 'ask1Price', 'bid1Size', 'ask1Size', path=('result', 'list')),
+        'futures': TickerSpec('symbol', 'bid1Price', 'ask1Price', 'bid1Size', 'ask1Size', path=('result', 'list'))
+    }
+    DEPTH_SPECS = {
+        'spot': DepthSpec(('result', 'b'), ('result', 'a')),
+        'futures': DepthSpec(('result', 'b'), ('result', 'a'))
+    }
+    FUNDING_SPEC = FundingSpec('symbol', 'fundingRate', 'nextFundingTime', 'fundingIntervalHour',
+                               path=('result', 'list'))
+
     def __init__(self):
         super().__init__('bybit')
 
@@ -62,4 +73,27 @@ class BybitExchange(BaseExchange):
                     }
                 except (KeyError, ValueError) as e:
                     continue
-        return prices
\ No newline at end of file
+        return prices
+
+    def _ws_subscribe_messages(self, market_type: str, symbols: List[str]) -> List[Any]:
+        # Bybit принимает не более 10 топиков в одном запросе подписки
+        topics = [f"orderbook.1.{symbol}" for symbol in symbols]
+        return [{'op': 'subscribe', 'args': topics[i:i + 10]} for i in range(0, len(topics), 10)]
+
+    def _ws_parse(self, market_type: str, data: Any) -> Iterable[Tuple]:
+        if not str(data.get('topic', '')).startswith('orderbook.1.'):
+            return ()
+        book = data['data']
+        bid, bid_size = self._ws_level(book.get('b'))
+        ask, ask_size = self._ws_level(book.get('a'))
+        return ((book['s'], bid, ask, bid_size, ask_size, book.get('u'), None),)
+
+    @staticmethod
+    def _ws_level(levels) -> Tuple[Optional[float], Optional[float]]:
+        # Пустой список или нулевой объем в delta - сторона не изменилась
+        if not levels or float(levels[0][1]) == 0:
+            return None, None
+        return float(levels[0][0]), float(levels[0][1])
+
+    def _ws_ping_message(self, market_type: str) -> Optional[Any]:
+        return {'op': 'ping'}
\ No newline at end of file
@@ -1,8 +1,12 @@
-from .base_exchange import BaseExchange
+from .base_exchange import BaseExchange, TickerSpec
 from typing import Dict
 
 
 class CoinWExchange(BaseExchange):
+    TICKER_SPECS = {
+        'spot': TickerSpec(None, 'highestBid', 'lowestAsk', path=('data',), keyed=True)
+    }
+
     def __init__(self):
         super().__init__('coinw')
 
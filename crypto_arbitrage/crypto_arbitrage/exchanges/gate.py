@@ -1,8 +1,19 @@
-from .base_exchange import BaseExchange
-from typing import Dict
+import time
+from .base_exchange import BaseExchange, DepthSpec, FundingSpec, TickerSpec
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 
 class GateExchange(BaseExchange):
+    TICKER_SPECS = {
+        'spot': TickerSpec('currency_pair', 'highest_bid', 'lowest_ask'),
+        'futures': TickerSpec('contract', 'bid1_price', 'ask1_price', 'bid1_size', 'ask1_size')
+    }
+    DEPTH_SPECS = {
+        'spot': DepthSpec(('bids',), ('asks',))
+    }
+    FUNDING_SPEC = FundingSpec('name', 'funding_rate', 'funding_next_apply', 'funding_interval', time_unit=1.0,
+                               interval_unit=1 / 3600)
+
     def __init__(self):
         super().__init__('gate')
 
@@ -60,4 +71,24 @@ class GateExchange(BaseExchange):
                 }
             except (KeyError, ValueError) as e:
                 continue
-        return prices
\ No newline at end of file
+        return prices
+
+    def _ws_channel(self, market_type: str, name: str) -> str:
+        return f"{'spot' if market_type == 'spot' else 'futures'}.{name}"
+
+    def _ws_subscribe_messages(self, market_type: str, symbols: List[str]) -> List[Any]:
+        channel = self._ws_channel(market_type, 'book_ticker')
+        return [
+            {'time': int(time.time()), 'channel': channel, 'event': 'subscribe', 'payload': symbols[i:i + 100]}
+            for i in range(0, len(symbols), 100)
+        ]
+
+    def _ws_parse(self, market_type: str, data: Any) -> Iterable[Tuple]:
+        if data.get('event') != 'update' or data.get('channel') != self._ws_channel(market_type, 'book_ticker'):
+            return ()
+        ticker = data['result']
+        return ((ticker['s'], float(ticker['b']), float(ticker['a']),
+                 float(ticker['B']), float(ticker['A']), ticker.get('u'), None),)
+
+    def _ws_ping_message(self, market_type: str) -> Optional[Any]:
+        return {'time': int(time.time()), 'channel': self._ws_channel(market_type, 'ping')}
\ No newline at end of file
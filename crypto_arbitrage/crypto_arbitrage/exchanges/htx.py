@@ -1,8 +1,17 @@
-from .base_exchange import BaseExchange
+from .base_exchange import BaseExchange, DepthSpec, FundingSpec, TickerSpec
 from typing import Dict
 
 
 class HTXExchange(BaseExchange):
+    TICKER_SPECS = {
+        'spot': TickerSpec('symbol', 'bid', 'ask', 'bidSize', 'askSize', path=('data',)),
+        'futures': TickerSpec('symbol', ('bid', 0), ('ask', 0), ('bidVol', 0), ('askVol', 0), path=('tick',))
+    }
+    DEPTH_SPECS = {
+        'spot': DepthSpec(('tick', 'bids'), ('tick', 'asks'))
+    }
+    FUNDING_SPEC = FundingSpec('contract_code', 'funding_rate', 'funding_time', path=('data',))
+
     def __init__(self):
         super().__init__('htx')
 
@@ -1,8 +1,19 @@
-from .base_exchange import BaseExchange
+from .base_exchange import BaseExchange, DepthSpec, FundingSpec, TickerSpec
 from typing import Dict
 
 
 class KuCoinExchange(BaseExchange):
+    TICKER_SPECS = {
+        'spot': TickerSpec('symbol', 'buy', 'sell', 'volValue', 'volValue', path=('data', 'ticker')),
+        'futures': TickerSpec('symbol', 'bestBidPrice', 'bestAskPrice', 'size', 'size', path=('data',),
+                              symbol_strip='PF_')
+    }
+    DEPTH_SPECS = {
+        'spot': DepthSpec(('data', 'bids'), ('data', 'asks'))
+    }
+    FUNDING_SPEC = FundingSpec('symbol', 'fundingFeeRate', 'nextFundingRateDateTime', 'fundingRateGranularity',
+                               interval_unit=1 / 3_600_000, path=('data',))
+
     def __init__(self):
         super().__init__('kucoin')
 
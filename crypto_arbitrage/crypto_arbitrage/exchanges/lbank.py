@@ -1,8 +1,12 @@
-from .base_exchange import BaseExchange
+from .base_exchange import BaseExchange, TickerSpec
 from typing import Dict
 
 
 class LBankExchange(BaseExchange):
+    TICKER_SPECS = {
+        'spot': TickerSpec('symbol', ('ticker', 'bid'), ('ticker', 'ask'), ('ticker', 'bidVol'), ('ticker', 'askVol'))
+    }
+
     def __init__(self):
         super().__init__('lbank')
 
@@ -1,8 +1,17 @@
-from .base_exchange import BaseExchange
+from .base_exchange import BaseExchange, DepthSpec, FundingSpec, TickerSpec
 from typing import Dict
 
 
 class MEXCExchange(BaseExchange):
+    TICKER_SPECS = {
+        'spot': TickerSpec('symbol', 'bidPrice', 'askPrice', 'bidQty', 'askQty'),
+        'futures': TickerSpec('symbol', 'bid1', 'ask1', 'bid1Vol', 'ask1Vol', path=('data',))
+    }
+    DEPTH_SPECS = {
+        'spot': DepthSpec(('bids',), ('asks',))
+    }
+    FUNDING_SPEC = FundingSpec('symbol', 'fundingRate', 'nextSettleTime', 'collectCycle', path=('data',))
+
     def __init__(self):
         super().__init__('mexc')
 
@@ -1,8 +1,19 @@
-from .base_exchange import BaseExchange
-from typing import Dict
+from .base_exchange import BaseExchange, DepthSpec, FundingSpec, TickerSpec
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 
 class OKXExchange(BaseExchange):
+    TICKER_SPECS = {
+        'spot': TickerSpec('instId', 'bidPx', 'askPx', 'bidSz', 'askSz', path=('data',)),
+        'futures': TickerSpec('instId', 'bidPx', 'askPx', 'bidSz', 'askSz', path=('data',))
+    }
+    DEPTH_SPECS = {
+        'spot': DepthSpec(('data', 0, 'bids'), ('data', 0, 'asks'))
+    }
+    # Интервала в ответе нет: он равен разнице времени двух ближайших списаний
+    FUNDING_SPEC = FundingSpec('instId', 'fundingRate', 'fundingTime', following_time='nextFundingTime',
+                               path=('data',))
+
     def __init__(self):
         super().__init__('okx')
 
@@ -62,4 +73,31 @@ class OKXExchange(BaseExchange):
                     }
                 except (KeyError, ValueError) as e:
                     continue
-        return prices
\ No newline at end of file
+        return prices
+
+    def _ws_subscribe_messages(self, market_type: str, symbols: List[str]) -> List[Any]:
+        args = [{'channel': 'bbo-tbt', 'instId': symbol} for symbol in symbols]
+        return [{'op': 'subscribe', 'args': args[i:i + 100]} for i in range(0, len(args), 100)]
+
+    def _ws_parse(self, market_type: str, data: Any) -> Iterable[Tuple]:
+        arg = data.get('arg', {})
+        if arg.get('channel') != 'bbo-tbt' or 'data' not in data:
+            return ()
+
+        updates = []
+        for book in data['data']:
+            bids, asks = book.get('bids') or [], book.get('asks') or []
+            prev_seq = book.get('prevSeqId')
+            updates.append((
+                arg['instId'],
+                float(bids[0][0]) if bids else None,
+                float(asks[0][0]) if asks else None,
+                float(bids[0][1]) if bids else None,
+                float(asks[0][1]) if asks else None,
+                book.get('seqId'),
+                None if prev_seq in (None, -1) else prev_seq
+            ))
+        return updates
+
+    def _ws_ping_message(self, market_type: str) -> Optional[Any]:
+        return 'ping'
\ No newline at end of file
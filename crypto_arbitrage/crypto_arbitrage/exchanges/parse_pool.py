@@ -0,0 +1,93 @@
+import asyncio
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Container, Dict, Optional, Tuple
+from ..config import config
+from ..utils.logger import logger
+
+
+# Адаптеры процесса-обработчика: таблица символов каждого запоминает разбор между заданиями
+_adapters: Dict = {}
+
+
+def listing_digest(listing) -> bytes:
+    """Отпечаток листинга, не зависящий от порядка символов и процесса"""
+    return hashlib.blake2b('\n'.join(sorted(listing)).encode(), digest_size=16).digest()
+
+
+def parse_payload(venue: str, market_type: str, body: bytes, keep: Optional[Container[str]],
+                  digest: Optional[bytes]) -> Tuple:
+    """Разбор ответа в процессе-обработчике: (TickerColumns, отпечаток листинга).
+
+    Листинг возвращается, только если его отпечаток отличается от известного основному процессу:
+    у каждого обработчика своя таблица символов, и его собственная проверка листинга ненадежна.
+    """
+    from . import get_exchange
+    adapter = _adapters.get(venue)
+    if adapter is None:
+        adapter = _adapters[venue] = get_exchange(venue)
+    adapter.symbols.reset_listing(market_type)
+    columns = adapter.parse_columns(adapter.decode(body), market_type, keep)
+    current = listing_digest(columns.listing)
+    if current == digest:
+        columns = columns._replace(listing=None)
+    return columns, current
+
+
+def _ready() -> bool:
+    return True
+
+
+class ParsePool:
+    """Пул процессов для разбора крупных ответов (все тикеры биржи) вне цикла событий.
+
+    Обработчик получает сырое тело и возвращает колонки (TickerColumns), а не словарь на тикер,
+    чтобы передача результата обратно стоила мало. Мелкие ответы разбираются на месте:
+    передача в процесс обошлась бы дороже самого разбора.
+    """
+
+    def __init__(self, workers: Optional[int] = None, min_bytes: Optional[int] = None):
+        self.workers = workers or config.PARSE_POOL_WORKERS
+        self.min_bytes = config.PARSE_POOL_MIN_BYTES if min_bytes is None else min_bytes
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.stats = {'inline': 0, 'offloaded': 0, 'failed': 0}
+
+    def offloads(self, size: int) -> bool:
+        """Разбирать ли ответ такого размера в пуле"""
+        return config.PARSE_POOL and size >= self.min_bytes
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: fork процесса с потоками (Qt, запись ответов) и запущенным циклом событий небезопасен
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    async def start(self):
+        """Запуск процессов заранее, чтобы импорт в обработчиках не пришелся на первый цикл"""
+        if not config.PARSE_POOL:
+            return
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        await asyncio.gather(*(loop.run_in_executor(executor, _ready) for _ in range(self.workers)))
+
+    async def parse(self, venue: str, market_type: str, body: bytes, keep: Optional[Container[str]],
+                    digest: Optional[bytes]) -> Tuple:
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), parse_payload, venue, market_type, body, keep, digest
+            )
+        except Exception:
+            self.stats['failed'] += 1
+            raise
+        self.stats['offloaded'] += 1
+        return result
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            logger.debug(f"Parse pool stopped: {self.stats}")
+
+
+parse_pool = ParsePool()
\ No newline at end of file
@@ -0,0 +1,145 @@
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+
+# Котируемые валюты; для слитных символов (BTCUSDT) проверяются от длинных к коротким
+QUOTES = ('FDUSD', 'USDT', 'USDC', 'BUSD', 'TUSD', 'USDE', 'DAI', 'USD', 'EUR', 'TRY', 'BTC', 'ETH', 'BNB')
+QUOTES_BY_LENGTH = sorted(QUOTES, key=len, reverse=True)
+
+# Разные названия одного актива у бирж
+BASE_ALIASES = {'XBT': 'BTC'}
+
+# Служебные хвосты контрактов: BTCUSDT_UMCBL (Bitget), BTC-USDT-SWAP (OKX)
+_CONTRACT_SUFFIX = re.compile(r'([_-](UMCBL|DMCBL|CMCBL|SPBL|SWAP|PERP|PERPETUAL))+$')
+# Дата экспирации срочного контракта: BTC-USDT-250328, BTCUSDT_250328
+_EXPIRY = re.compile(r'[_-](\d{6,8})$')
+_SEPARATOR = re.compile(r'[-_/]')
+
+
+class SymbolInfo(NamedTuple):
+    base: str
+    quote: str
+    market_type: str
+    canonical: str  # BASE/QUOTE (BASE/QUOTE-YYMMDD для срочных) - общий ключ символа для всех бирж
+
+
+def parse_symbol(raw: str, market_type: str = 'spot') -> Optional[SymbolInfo]:
+    """Разбор символа биржи на базовую и котируемую валюты; None, если котируемую валюту не найти"""
+    symbol = raw.upper()
+    # ccxt: BTC/USDT:USDT или BTC/USDT:USDT-250328 - после двоеточия валюта расчетов и экспирация
+    symbol, _, settle = symbol.partition(':')
+    settle_expiry = _EXPIRY.search(settle)
+    if settle_expiry:
+        symbol += settle_expiry.group(0)
+    symbol = _CONTRACT_SUFFIX.sub('', symbol)
+    # Срочный контракт не сравнивается с бессрочным и спотом: экспирация остается в ключе
+    expiry = _EXPIRY.search(symbol)
+    if expiry:
+        symbol = symbol[:expiry.start()]
+
+    parts = _SEPARATOR.split(symbol)
+    if len(parts) >= 2 and parts[0] and parts[1]:
+        base, quote = parts[0], parts[1]
+    else:
+        # KuCoin Futures: XBTUSDTM, Bybit: BTCPERP (бессрочный USDC)
+        if market_type == 'futures' and symbol.endswith('USDTM'):
+            symbol = symbol[:-1]
+        elif market_type == 'futures' and symbol.endswith('PERP'):
+            symbol = symbol[:-4] + 'USDC'
+
+        for quote in QUOTES_BY_LENGTH:
+            if symbol.endswith(quote) and len(symbol) > len(quote):
+                base = symbol[:-len(quote)]
+                break
+        else:
+            return None
+
+    base = BASE_ALIASES.get(base, base)
+    canonical = f"{base}/{quote}-{expiry.group(1)}" if expiry else f"{base}/{quote}"
+    return SymbolInfo(base, quote, market_type, canonical)
+
+
+class SymbolMap:
+    """Запомненный разбор символов одной биржи: сырой символ -> SymbolInfo.
+
+    Новые символы разбираются при первой встрече, а при смене листинга
+    записи исчезнувших символов удаляются, чтобы повторно разобрать их, если они вернутся.
+    """
+
+    def __init__(self):
+        self._tables: Dict[str, Dict[str, Optional[SymbolInfo]]] = {}
+        self._listings: Dict[str, frozenset] = {}
+        # Обратные таблицы (канонический -> сырой символ) строятся по запросу и сбрасываются при изменении прямых
+        self._raw: Dict[str, Dict[str, str]] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    def _table(self, market_type: str) -> Dict[str, Optional[SymbolInfo]]:
+        table = self._tables.get(market_type)
+        if table is None:
+            table = self._tables[market_type] = {}
+        return table
+
+    def get(self, raw: str, market_type: str = 'spot') -> Optional[SymbolInfo]:
+        table = self._table(market_type)
+        try:
+            info = table[raw]
+            self.stats['hits'] += 1
+        except KeyError:
+            info = table[raw] = parse_symbol(raw, market_type)
+            self.stats['misses'] += 1
+            self._raw.pop(market_type, None)
+        return info
+
+    def canonical(self, raw: str, market_type: str = 'spot') -> Optional[str]:
+        info = self.get(raw, market_type)
+        return info.canonical if info else None
+
+    def canonicalize(self, raws: List[str], market_type: str, strip: str = '') -> List[Optional[str]]:
+        """Канонические имена для списка символов: один поиск в словаре на символ"""
+        table = self._table(market_type)
+        result = []
+        misses = 0
+        for raw in raws:
+            info = table.get(raw, False)
+            if info is False:
+                info = table[raw] = parse_symbol(raw.replace(strip, '') if strip else raw, market_type)
+                misses += 1
+            result.append(info.canonical if info else None)
+        self.stats['misses'] += misses
+        self.stats['hits'] += len(raws) - misses
+        if misses:
+            self._raw.pop(market_type, None)
+        return result
+
+    def raw(self, canonical: str, market_type: str = 'spot') -> Optional[str]:
+        """Символ биржи по каноническому имени - для запросов по одному инструменту (стакан)"""
+        reverse = self._raw.get(market_type)
+        if reverse is None:
+            reverse = self._raw[market_type] = {
+                info.canonical: raw for raw, info in self._table(market_type).items() if info is not None
+            }
+        return reverse.get(canonical)
+
+    def update_listing(self, raws: Iterable[str], market_type: str) -> bool:
+        """Проверка листинга после полного ответа биржи; True, если листинг новый или состав символов изменился"""
+        listing = frozenset(raws)
+        previous = self._listings.get(market_type)
+        self._listings[market_type] = listing
+        if previous is None:
+            return True
+        if previous == listing:
+            return False
+
+        table = self._table(market_type)
+        for raw in previous - listing:
+            table.pop(raw, None)
+        self._raw.pop(market_type, None)
+        self.stats['invalidations'] += 1
+        return True
+
+    def reset_listing(self, market_type: str):
+        """Забыть листинг рынка: следующая проверка сочтет его новым (листинг проверялся в другом месте)"""
+        self._listings.pop(market_type, None)
+
+    def __len__(self) -> int:
+        return sum(len(table) for table in self._tables.values())
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""Выборка из хранилища истории котировок и возможностей.
+
+Запись: python -m crypto_arbitrage.scan --history history/
+Выборка: python -m crypto_arbitrage.history history/ opportunities --symbol BTC/USDT --since 2026-10-17 [--runs]
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict
+import numpy as np
+from .utils.history import HistoryReader, opportunity_runs
+
+
+def parse_time(value: str) -> float:
+    """Unix-секунды или дата/время ISO 8601 (без часового пояса - UTC)"""
+    try:
+        return float(value)
+    except ValueError:
+        moment = datetime.fromisoformat(value)
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return moment.timestamp()
+
+
+def rows(columns: Dict[str, np.ndarray]):
+    names = list(columns)
+    for values in zip(*(columns[name].tolist() for name in names)):
+        yield dict(zip(names, values))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory', help='каталог хранилища (config.HISTORY_DIR)')
+    parser.add_argument('table', choices=('quotes', 'opportunities'))
+    parser.add_argument('--since', type=parse_time, help='начало интервала; по умолчанию сутки назад')
+    parser.add_argument('--until', type=parse_time, help='конец интервала; по умолчанию сейчас')
+    parser.add_argument('--symbol')
+    parser.add_argument('--exchange', help='биржа котировки; для возможностей - покупки или продажи')
+    parser.add_argument('--market', choices=('spot', 'futures'), help='тип рынка котировки')
+    parser.add_argument('--runs', action='store_true', help='периоды существования возможностей вместо строк')
+    parser.add_argument('--max-gap', type=float, help='разрыв, прерывающий период, секунд')
+    args = parser.parse_args(argv)
+
+    until = args.until if args.until is not None else time.time()
+    since = args.since if args.since is not None else until - 86400
+    reader = HistoryReader(args.directory)
+    started = time.perf_counter()
+    if args.table == 'quotes':
+        columns = reader.quotes(since, until, args.symbol, args.exchange, args.market)
+    else:
+        columns = reader.opportunities(since, until, args.symbol, args.exchange)
+    elapsed = time.perf_counter() - started
+
+    if args.runs and args.table == 'opportunities':
+        columns = opportunity_runs(columns, args.max_gap)
+    for item in rows(columns):
+        sys.stdout.write(json.dumps(item, separators=(',', ':')) + '\n')
+    print(f"{len(next(iter(columns.values())))} rows, queried in {1000 * elapsed:.1f} ms", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
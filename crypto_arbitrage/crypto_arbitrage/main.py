@@ -1,15 +1,16 @@
 import sys
 
-from PyQt6.QtGui import QColor
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLabel, QLineEdit, QTableWidget, QTableWidgetItem,
-    QHeaderView, QGroupBox, QCheckBox, QTextEdit, QMessageBox
+    QPushButton, QLabel, QLineEdit, QTableView, QAbstractItemView,
+    QHeaderView, QGroupBox, QCheckBox, QPlainTextEdit, QMessageBox
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import QTimer
+from crypto_arbitrage.config import config
 from crypto_arbitrage.core.arbitrage_engine import ArbitrageEngine
 from crypto_arbitrage.utils.async_qt import AsyncQtBridge
 from crypto_arbitrage.utils.debug_logger import logger
+from crypto_arbitrage.utils.opportunity_model import OpportunityTableModel
 
 
 class CryptoArbitrageGUI(QMainWindow):
@@ -39,6 +40,7 @@ class CryptoArbitrageGUI(QMainWindow):
         self.investment_input = QLineEdit('10000')
         self.min_profit_input = QLineEdit('0.1')
         self.max_profit_input = QLineEdit('10')
+        self.period_input = QLineEdit(str(config.SCAN_PERIOD))
 
         # Analysis Types Group
         analysis_group = QGroupBox("Analysis Types")
@@ -46,19 +48,22 @@ class CryptoArbitrageGUI(QMainWindow):
         self.spot_spot_cb = QCheckBox("Spot-Spot", checked=True)
         self.spot_futures_cb = QCheckBox("Spot-Futures")
         self.futures_futures_cb = QCheckBox("Futures-Futures")
+        self.incremental_cb = QCheckBox("Incremental (live quotes)")
+        self.incremental_cb.setToolTip("Best opportunity per symbol, recomputed on every streamed quote")
         analysis_layout.addWidget(self.spot_spot_cb)
         analysis_layout.addWidget(self.spot_futures_cb)
         analysis_layout.addWidget(self.futures_futures_cb)
+        analysis_layout.addWidget(self.incremental_cb)
         analysis_group.setLayout(analysis_layout)
 
         # Exchanges Group
         exchanges_group = QGroupBox("Exchanges")
         exchanges_layout = QVBoxLayout()
         self.exchange_checkboxes = {}
-        exchanges = ['Binance', 'KuCoin', 'Bybit', 'OKX', 'Huobi']
+        default_exchanges = ['Binance', 'KuCoin', 'Bybit', 'Okx', 'Htx']
 
-        for exchange in exchanges:
-            cb = QCheckBox(exchange, checked=True)
+        for exchange in self.arbitrage.exchanges_config:
+            cb = QCheckBox(exchange, checked=exchange in default_exchanges)
             self.exchange_checkboxes[exchange] = cb
             exchanges_layout.addWidget(cb)
         exchanges_group.setLayout(exchanges_layout)
@@ -67,6 +72,9 @@ class CryptoArbitrageGUI(QMainWindow):
         self.start_btn = QPushButton('Start/Refresh')
         self.start_btn.clicked.connect(self.start_arbitrage)
 
+        self.stop_btn = QPushButton('Stop')
+        self.stop_btn.clicked.connect(self.stop_arbitrage)
+
         self.debug_btn = QPushButton('Debug Info')
         self.debug_btn.clicked.connect(self.show_debug_info)
         self.debug_btn.setStyleSheet("background-color: #f39c12;")
@@ -77,29 +85,39 @@ class CryptoArbitrageGUI(QMainWindow):
         control_layout.addWidget(self.min_profit_input)
         control_layout.addWidget(QLabel('Max Spread (%):'))
         control_layout.addWidget(self.max_profit_input)
+        control_layout.addWidget(QLabel('Period (s):'))
+        control_layout.addWidget(self.period_input)
         control_layout.addWidget(analysis_group)
         control_layout.addWidget(exchanges_group)
         control_layout.addStretch()
         control_layout.addWidget(self.start_btn)
+        control_layout.addWidget(self.stop_btn)
         control_layout.addWidget(self.debug_btn)
 
         # Results Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(10)
-        self.table.setHorizontalHeaderLabels([
-            'Pair', 'Buy Exchange', 'Buy Market',
-            'Sell Exchange', 'Sell Market', 'Buy Price',
-            'Sell Price', 'Spread %', 'Profit $', 'Investment'
-        ])
+        self.results_model = OpportunityTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.results_model)
+        self.table.setSortingEnabled(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        # Фиксированная высота строк: представлению не нужно измерять содержимое тысяч строк
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(24)
+        self.table.verticalHeader().hide()
 
         # Log Output
-        self.log_output = QTextEdit()
+        self.log_output = QPlainTextEdit()
         self.log_output.setReadOnly(True)
         self.log_output.setMaximumHeight(200)
+        # Окно хранит не больше строк, чем буфер журнала: память не растет за дни работы
+        self.log_output.setMaximumBlockCount(config.LOG_BUFFER_LINES)
 
-        # Initialize logger
+        # Initialize logger: строки выводятся пачкой по таймеру, а не по одной на сообщение
         logger.output_widget = self.log_output
+        self.log_timer = QTimer(self)
+        self.log_timer.timeout.connect(logger.flush_widget)
+        self.log_timer.start(int(config.LOG_FLUSH_INTERVAL * 1000))
 
         layout.addWidget(control_panel)
         layout.addWidget(self.table)
@@ -113,7 +131,7 @@ class CryptoArbitrageGUI(QMainWindow):
         self.setStyleSheet("""
             QMainWindow { background-color: #2D2D2D; }
             QLabel { color: #FFFFFF; }
-            QTableWidget { 
+            QTableView { 
                 background-color: #252525; 
                 color: #FFFFFF;
                 gridline-color: #444;
@@ -152,7 +170,7 @@ class CryptoArbitrageGUI(QMainWindow):
                 left: 10px;
                 padding: 0 3px;
             }
-            QTextEdit {
+            QPlainTextEdit {
                 background-color: #252525;
                 color: #FFFFFF;
                 border: 1px solid #444;
@@ -163,12 +181,15 @@ class CryptoArbitrageGUI(QMainWindow):
     def _connect_signals(self):
         self.async_bridge.update_signal.connect(self.update_status)
         self.async_bridge.finished.connect(self.display_results)
+        self.async_bridge.live.connect(self.display_live_results)
+        self.async_bridge.health.connect(self.update_exchange_health)
 
     def start_arbitrage(self):
         try:
             investment = float(self.investment_input.text())
             min_profit = float(self.min_profit_input.text())
             max_profit = float(self.max_profit_input.text())
+            period = float(self.period_input.text())
 
             selected_exchanges = [
                 name for name, cb in self.exchange_checkboxes.items()
@@ -179,12 +200,18 @@ class CryptoArbitrageGUI(QMainWindow):
                 QMessageBox.warning(self, "Warning", "Please select at least one exchange")
                 return
 
-            self.arbitrage.set_exchanges(selected_exchanges)
-            self.arbitrage.set_analysis_types(
+            # Движок работает в своем потоке: настройка выполняется там, между шагами текущего цикла
+            self.async_bridge.call(self.arbitrage.set_exchanges, selected_exchanges)
+            self.async_bridge.call(
+                self.arbitrage.set_analysis_types,
                 self.spot_spot_cb.isChecked(),
                 self.spot_futures_cb.isChecked(),
                 self.futures_futures_cb.isChecked()
             )
+            if self.incremental_cb.isChecked():
+                self.async_bridge.call(self.arbitrage.enable_incremental, min_profit, max_profit, investment, True)
+            else:
+                self.async_bridge.call(self.arbitrage.disable_incremental)
 
             logger.log("\n=== STARTING ARBITRAGE SEARCH ===")
             logger.log(f"Exchanges: {selected_exchanges}")
@@ -193,6 +220,7 @@ class CryptoArbitrageGUI(QMainWindow):
 
             self.async_bridge.start_arbitrage(
                 self.arbitrage,
+                period=period,
                 min_profit=min_profit,
                 max_profit=max_profit,
                 investment=investment
@@ -202,18 +230,29 @@ class CryptoArbitrageGUI(QMainWindow):
             logger.log(f"Error: Invalid input values - {str(e)}")
             QMessageBox.critical(self, "Error", "Please enter valid numbers")
 
+    def stop_arbitrage(self):
+        self.async_bridge.stop()
+        self.update_status("Arbitrage search stopped")
+
     def show_debug_info(self):
-        """Принудительный вывод отладочной информации"""
+        """Принудительный вывод отладочной информации.
+
+        Книгу цен меняет поток движка, поэтому снимок собирается и выводится в журнал там же.
+        """
+        self.async_bridge.call(self._log_debug_info)
+
+    def _log_debug_info(self):
         debug_info = []
         debug_info.append("\n=== DEBUG INFORMATION ===")
         debug_info.append(f"Active exchanges: {list(self.arbitrage.active_exchanges.keys())}")
         debug_info.append(f"Analysis types: {self.arbitrage.analysis_types}")
 
-        if hasattr(self.arbitrage, 'last_prices'):
+        price_book = self.arbitrage.price_book
+        if len(price_book):
             debug_info.append("\nLast prices sample:")
-            for symbol, prices in list(self.arbitrage.last_prices.items())[:5]:
+            for symbol in price_book.symbols[:5]:
                 debug_info.append(f"\n{symbol}:")
-                for price in prices[:2]:  # Первые 2 записи
+                for price in price_book.quotes(symbol)[:2]:  # Первые 2 записи
                     debug_info.append(
                         f"  {price['exchange']} {price['market_type']}: "
                         f"bid={price['bid']}, ask={price['ask']}"
@@ -225,42 +264,33 @@ class CryptoArbitrageGUI(QMainWindow):
         self.statusBar().showMessage(message)
         logger.log(message)
 
+    def update_exchange_health(self, states):
+        """Состояние автоматов бирж: цвет и подсказка у флажков"""
+        colors = {'open': '#FF5555', 'half-open': '#FFAA00'}
+        for name, cb in self.exchange_checkboxes.items():
+            state = states.get(name.lower())
+            if state is None:
+                continue
+            cb.setStyleSheet(f"color: {colors[state['state']]};" if state['state'] in colors else "")
+            p95 = f"{state['p95'] * 1000:.0f} ms" if state['p95'] is not None else "n/a"
+            cb.setToolTip(f"Circuit {state['state']}, errors {state['failure_rate']:.0%}, p95 {p95}, "
+                          f"hedged {state['hedges']}")
+
     def display_results(self, opportunities):
         self.opportunities = opportunities
-        self.table.setRowCount(len(opportunities))
-
-        for row, opp in enumerate(opportunities):
-            for col, text in enumerate([
-                opp['symbol'],
-                opp['buy_exchange'],
-                opp['buy_market_type'].capitalize(),
-                opp['sell_exchange'],
-                opp['sell_market_type'].capitalize(),
-                f"{opp['buy_price']:.8f}".rstrip('0').rstrip('.'),
-                f"{opp['sell_price']:.8f}".rstrip('0').rstrip('.'),
-                f"{opp['spread_percent']:.2f}%",
-                f"${opp['profit_amount']:.2f}",
-                f"${opp['investment']:.2f}"
-            ]):
-                item = QTableWidgetItem(text)
-                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-
-                # Цветовая маркировка по проценту спреда
-                spread = opp['spread_percent']
-                if spread > 5:
-                    item.setBackground(QColor(0, 100, 0))  # Темно-зеленый
-                elif spread > 2:
-                    item.setBackground(QColor(0, 70, 0))  # Зеленый
-                elif spread > 1:
-                    item.setBackground(QColor(100, 100, 0))  # Желтый
-
-                self.table.setItem(row, col, item)
-
-        status = f"Found {len(opportunities)} opportunities"
-        self.update_status(status)
-        logger.log(status)
+        # Модель применяет разницу со строками на экране и сама ограничивает частоту перерисовки
+        self.results_model.set_opportunities(opportunities)
+
+        self.update_status(f"Found {len(opportunities)} opportunities")
+
+    def display_live_results(self, opportunities):
+        """Обновление таблицы между циклами в инкрементальном режиме, без записи в журнал"""
+        self.opportunities = opportunities
+        self.results_model.set_opportunities(opportunities)
 
     def closeEvent(self, event):
+        self.log_timer.stop()
+        logger.output_widget = None
         self.async_bridge.close()
         event.accept()
 
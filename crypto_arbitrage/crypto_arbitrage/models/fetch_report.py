@@ -0,0 +1,80 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+
+@dataclass
+class FetchReport:
+    """Результат одного цикла сбора цен"""
+    completed: List[Tuple[str, str]] = field(default_factory=list)
+    late: List[Tuple[str, str]] = field(default_factory=list)
+    failed: Dict[Tuple[str, str], str] = field(default_factory=dict)
+    throttled: List[Tuple[str, str]] = field(default_factory=list)
+    refreshing: List[Tuple[str, str]] = field(default_factory=list)  # фоновое обновление еще не завершено
+    circuit_open: List[Tuple[str, str]] = field(default_factory=list)  # пропущены без запроса
+    breakers: Dict[str, str] = field(default_factory=dict)  # биржа -> состояние незамкнутого автомата
+    quotes: int = 0
+    skipped: int = 0  # тикеры символов без пары, отброшенные индексом вселенной до разбора цен
+    elapsed: float = 0.0
+    # Проверка кандидатов по стаканам (второй этап)
+    depth_checked: int = 0
+    depth_confirmed: int = 0
+    depth_unavailable: int = 0  # стаканы, которые не удалось получить или у биржи нет их описания
+    depth_throttled: int = 0  # стаканы, пропущенные ради лимита запросов
+    cycles: int = 0  # прибыльные циклы графа цен (треугольный анализ)
+    basis: int = 0  # сделки спот - фьючерс с учетом финансирования
+    funding_refreshed: int = 0  # биржи, ставки финансирования которых загружены в этом цикле
+    funding_unavailable: int = 0  # биржи без ставок: ошибка, дедлайн или нет их описания
+    # Простои цикла событий с прошлого отчета (utils/loop_monitor)
+    loop_stalls: int = 0
+    loop_stalled: float = 0.0
+    loop_max_stall: float = 0.0
+
+    def summary(self) -> str:
+        """Краткая сводка для лога и статусной строки"""
+        parts = [f"{len(self.completed)} ok, {self.quotes} quotes in {self.elapsed:.2f}s"]
+        if self.skipped:
+            parts.append(f"skipped {self.skipped} tickers")
+        if self.late:
+            parts.append("late: " + ", ".join(f"{name} {market}" for name, market in self.late))
+        if self.circuit_open:
+            parts.append("circuit open: " + ", ".join(f"{name} {market}" for name, market in self.circuit_open))
+        if self.refreshing:
+            parts.append("refreshing: " + ", ".join(f"{name} {market}" for name, market in self.refreshing))
+        if self.throttled:
+            parts.append("throttled: " + ", ".join(f"{name} {market}" for name, market in self.throttled))
+        if self.failed:
+            parts.append("failed: " + ", ".join(f"{name} {market}" for name, market in self.failed))
+        if self.loop_stalls:
+            parts.append(f"loop stalled {1000 * self.loop_stalled:.0f} ms (max {1000 * self.loop_max_stall:.0f} ms)")
+        if self.depth_checked:
+            parts.append(f"depth confirmed {self.depth_confirmed}/{self.depth_checked}")
+        if self.cycles:
+            parts.append(f"{self.cycles} cycles")
+        if self.basis:
+            parts.append(f"{self.basis} basis trades")
+        return "; ".join(parts)
+
+    def to_dict(self) -> dict:
+        return {
+            'completed': [list(key) for key in self.completed],
+            'late': [list(key) for key in self.late],
+            'throttled': [list(key) for key in self.throttled],
+            'refreshing': [list(key) for key in self.refreshing],
+            'circuit_open': [list(key) for key in self.circuit_open],
+            'breakers': dict(self.breakers),
+            'failed': {f"{name}:{market}": error for (name, market), error in self.failed.items()},
+            'quotes': self.quotes,
+            'skipped': self.skipped,
+            'elapsed': self.elapsed,
+            'depth_checked': self.depth_checked,
+            'depth_confirmed': self.depth_confirmed,
+            'depth_unavailable': self.depth_unavailable,
+            'depth_throttled': self.depth_throttled,
+            'cycles': self.cycles,
+            'basis': self.basis,
+            'funding_refreshed': self.funding_refreshed,
+            'funding_unavailable': self.funding_unavailable,
+            'loop_stalls': self.loop_stalls,
+            'loop_stalled': self.loop_stalled,
+            'loop_max_stall': self.loop_max_stall
+        }
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""Воспроизведение записанных ответов бирж через те же парсеры и скан.
+
+Запись: python -m crypto_arbitrage.scan --record recordings/
+Воспроизведение: python -m crypto_arbitrage.replay recordings/ [--realtime] [--json]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List, Optional, Tuple
+from .config import config
+from .core.arbitrage_engine import ArbitrageEngine
+from .exchanges import get_exchange
+from .utils.debug_logger import logger
+from .utils.recorder import Record, read_cycles
+
+
+class ReplaySource:
+    """Последние записанные ответы по ключу; ответ, не обновленный в цикле, повторяется (как из кэша)"""
+
+    def __init__(self):
+        self.bodies: Dict[Tuple, bytes] = {}
+
+    def load(self, records: List[Record]):
+        for header, body in records:
+            if header['source'] == 'ccxt':
+                self.bodies[('ccxt', header['venue'], header['market_type'])] = body
+            else:
+                self.bodies[('adapter', header['venue'], header['url'])] = body
+
+    def body_fetcher(self, adapter):
+        """Замена fetch_body адаптера: тело из записи"""
+        async def fetch_body(url: str, params: Optional[Dict] = None) -> bytes:
+            body = self.bodies.get(('adapter', adapter.name, url))
+            if body is None:
+                raise Exception(f"No recorded response for {adapter.name} {url}")
+            return body
+        return fetch_body
+
+    def fetcher(self, adapter):
+        """Замена fetch_data адаптера: тело из записи разбирается штатным decode"""
+        fetch_body = self.body_fetcher(adapter)
+
+        async def fetch_data(url: str, params: Optional[Dict] = None):
+            return adapter.decode(await fetch_body(url, params))
+        return fetch_data
+
+
+class ReplayTickers:
+    """Замена клиента ccxt: fetch_tickers отдает записанные тикеры"""
+
+    def __init__(self, source: ReplaySource, venue: str):
+        self.source = source
+        self.venue = venue
+
+    async def fetch_tickers(self, symbols=None, params: Optional[Dict] = None) -> Dict:
+        market_type = 'futures' if (params or {}).get('type') == 'swap' else 'spot'
+        body = self.source.bodies.get(('ccxt', self.venue, market_type))
+        if body is None:
+            raise Exception(f"No recorded tickers for {self.venue} {market_type}")
+        return json.loads(body)
+
+    async def close(self):
+        pass
+
+
+def _prepare_engine(engine: ArbitrageEngine, source: ReplaySource, venues: Dict[str, str]):
+    """Подмена источников данных выбранных бирж на записанные"""
+    names = {name.lower(): name for name in engine.exchanges_config}
+    engine.set_exchanges([names[venue] for venue in venues if venue in names])
+    for venue, kind in venues.items():
+        if venue not in names:
+            continue
+        exchange_config = engine.exchanges_config[names[venue]]
+        if 'instance' in exchange_config or 'adapter' in exchange_config:
+            continue
+        if kind == 'ccxt':
+            exchange_config['instance'] = ReplayTickers(source, venue)
+        else:
+            adapter = get_exchange(venue)
+            adapter.fetch_data = source.fetcher(adapter)
+            adapter.fetch_body = source.body_fetcher(adapter)
+            exchange_config['adapter'] = adapter
+
+
+async def replay(directory: str, realtime: bool = False, min_profit: float = config.MIN_PROFIT_PERCENT,
+                 max_profit: float = config.MAX_PROFIT_PERCENT, investment: float = config.DEFAULT_INVESTMENT,
+                 analysis: Tuple[bool, bool, bool] = (True, True, True), output=None) -> Dict:
+    engine = ArbitrageEngine()
+    engine.set_analysis_types(*analysis)
+    # Каждый цикл должен сканировать ответы своего цикла
+    engine.stale_while_revalidate = False
+    engine.prewarm_connections = False
+    # В записи нет стаканов: воспроизводится только скан по тикерам
+    engine.depth_check = False
+    source = ReplaySource()
+    venues: Dict[str, str] = {}
+
+    timings: List[float] = []
+    quotes = skipped = opportunities_total = 0
+    first_cycle = wall_start = None
+    started = time.perf_counter()
+    try:
+        for cycle, records in read_cycles(directory):
+            new_venues = {header['venue']: header['source'] for header, _ in records
+                          if header['venue'] not in venues}
+            if new_venues:
+                venues.update(new_venues)
+                _prepare_engine(engine, source, venues)
+
+            if realtime:
+                # Пауза до момента цикла относительно начала записи
+                if first_cycle is None:
+                    first_cycle, wall_start = cycle, time.monotonic()
+                delay = (cycle - first_cycle) - (time.monotonic() - wall_start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            source.load(records)
+            cycle_started = time.perf_counter()
+            opportunities = await engine.find_arbitrage_opportunities(min_profit, max_profit, investment)
+            timings.append(time.perf_counter() - cycle_started)
+
+            quotes += engine.last_fetch_report.quotes
+            skipped += engine.last_fetch_report.skipped
+            opportunities_total += len(opportunities)
+            if output is not None:
+                for opportunity in opportunities:
+                    output.write(json.dumps({'cycle': cycle, **opportunity}, separators=(',', ':')) + '\n')
+    finally:
+        await engine.close()
+
+    elapsed = time.perf_counter() - started
+    busy = sum(timings)
+    return {
+        'cycles': len(timings),
+        'venues': sorted(venues),
+        'quotes': quotes,
+        'skipped': skipped,
+        'opportunities': opportunities_total,
+        'elapsed_s': elapsed,
+        'cycles_per_s': len(timings) / busy if busy else 0.0,
+        'cycle_ms_median': 1000 * statistics.median(timings) if timings else 0.0,
+        'cycle_ms_max': 1000 * max(timings) if timings else 0.0
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory', help='каталог с сегментами записи')
+    parser.add_argument('--realtime', action='store_true', help='соблюдать исходные интервалы между циклами')
+    parser.add_argument('--analysis', default='spot_spot,spot_futures,futures_futures')
+    parser.add_argument('--min-profit', type=float, default=config.MIN_PROFIT_PERCENT)
+    parser.add_argument('--max-profit', type=float, default=config.MAX_PROFIT_PERCENT)
+    parser.add_argument('--investment', type=float, default=config.DEFAULT_INVESTMENT)
+    parser.add_argument('--opportunities', help='файл для возможностей в формате JSON lines')
+    parser.add_argument('--json', action='store_true', help='вывод статистики в JSON')
+    args = parser.parse_args(argv)
+
+    logger.stream = None
+    analysis = {name.strip() for name in args.analysis.split(',')}
+    output = open(args.opportunities, 'w', encoding='utf-8') if args.opportunities else None
+    try:
+        result = asyncio.run(replay(
+            args.directory, args.realtime, args.min_profit, args.max_profit, args.investment,
+            ('spot_spot' in analysis, 'spot_futures' in analysis, 'futures_futures' in analysis), output
+        ))
+    finally:
+        if output is not None:
+            output.close()
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['cycles']} cycles from {', '.join(result['venues'])}: "
+              f"{result['cycles_per_s']:.1f} cycles/s, median {result['cycle_ms_median']:.1f} ms, "
+              f"max {result['cycle_ms_max']:.1f} ms, {result['quotes']} quotes ({result['skipped']} skipped), "
+              f"{result['opportunities']} opportunities in {result['elapsed_s']:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
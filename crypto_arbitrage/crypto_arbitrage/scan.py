@@ -0,0 +1,158 @@
+"""Консольный сканер без GUI: python -m crypto_arbitrage.scan
+
+Пишет найденные возможности в формате JSON lines (одна строка на возможность)
+в stdout или файл. Не импортирует PyQt и по умолчанию не загружает ccxt.
+"""
+import argparse
+import asyncio
+import json
+import signal
+import sys
+import time
+from typing import Dict, List, TextIO
+from .config import config
+from .core.arbitrage_engine import ArbitrageEngine
+from .core.incremental import OpportunityEvent
+from .core.scheduler import ScanScheduler
+from .utils.debug_logger import DEBUG, logger
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m crypto_arbitrage.scan',
+                                     description='Headless arbitrage scanner writing JSON lines')
+    parser.add_argument('--exchanges', default='Binance,KuCoin,Bybit,Okx,Htx',
+                        help='comma separated exchange names (as in the GUI)')
+    parser.add_argument('--analysis', default='spot_spot',
+                        help='comma separated: spot_spot, spot_futures, futures_futures, triangular, basis')
+    parser.add_argument('--min-profit', type=float, default=config.MIN_PROFIT_PERCENT)
+    parser.add_argument('--max-profit', type=float, default=config.MAX_PROFIT_PERCENT)
+    parser.add_argument('--investment', type=float, default=config.DEFAULT_INVESTMENT)
+    parser.add_argument('--period', type=float, default=config.SCAN_PERIOD, help='target cycle period, seconds')
+    parser.add_argument('--cycles', type=int, default=0, help='stop after N cycles (0 - run until interrupted)')
+    parser.add_argument('--output', default='-', help="output file, '-' for stdout")
+    parser.add_argument('--ccxt', action='store_true', help='use ccxt clients where available instead of adapters')
+    parser.add_argument('--no-depth-check', action='store_true',
+                        help='emit top-of-book candidates without verifying them against order books')
+    parser.add_argument('--record', help='write raw exchange responses to this directory for replay')
+    parser.add_argument('--history', help='append quotes and opportunities to this history store')
+    parser.add_argument('--stream', action='store_true', help='subscribe to WebSocket quote streams')
+    parser.add_argument('--incremental', action='store_true',
+                        help='keep the best opportunity per symbol incrementally and write added/changed/removed '
+                             'events as quotes change')
+    parser.add_argument('--verbose', action='store_true', help='write debug log to stderr')
+    return parser.parse_args(argv)
+
+
+class JsonLinesWriter:
+    """Запись результатов циклов построчно с немедленным сбросом буфера"""
+
+    def __init__(self, output: TextIO):
+        self.output = output
+        self.cycle = 0
+
+    def write(self, opportunities: List[Dict], cycles: List[Dict] = (), basis: List[Dict] = ()):
+        """Возможности цикла скана, циклы обмена треугольного анализа и сделки базиса (с полем kind)"""
+        self.cycle += 1
+        timestamp = time.time()
+        lines = [
+            json.dumps({'ts': timestamp, 'cycle': self.cycle, **opportunity}, separators=(',', ':'))
+            for opportunity in opportunities
+        ]
+        for kind, items in (('triangular', cycles), ('basis', basis)):
+            lines.extend(
+                json.dumps({'ts': timestamp, 'cycle': self.cycle, 'kind': kind, **item}, separators=(',', ':'))
+                for item in items
+            )
+        if lines:
+            self.output.write('\n'.join(lines) + '\n')
+            self.output.flush()
+
+    def write_events(self, events: List[OpportunityEvent]):
+        """События инкрементального движка сразу по мере изменения котировок (kind 'event')"""
+        timestamp = time.time()
+        self.output.write(''.join(
+            json.dumps({'ts': timestamp, 'kind': 'event', 'event': event.kind, **event.opportunity},
+                       separators=(',', ':')) + '\n'
+            for event in events
+        ))
+        self.output.flush()
+
+
+async def run(args: argparse.Namespace, output: TextIO):
+    engine = ArbitrageEngine()
+    exchanges = [name.strip() for name in args.exchanges.split(',') if name.strip()]
+    unknown = [name for name in exchanges if name not in engine.exchanges_config]
+    if unknown:
+        raise ValueError(f"Unknown exchanges: {', '.join(unknown)}")
+    analysis = {name.strip() for name in args.analysis.split(',')}
+    engine.set_exchanges(exchanges)
+    engine.set_analysis_types('spot_spot' in analysis, 'spot_futures' in analysis, 'futures_futures' in analysis,
+                              'triangular' in analysis, 'basis' in analysis)
+    if args.no_depth_check:
+        engine.depth_check = False
+    if args.stream:
+        engine.streaming = True
+
+    writer = JsonLinesWriter(output)
+    if args.incremental:
+        engine.enable_incremental(args.min_profit, args.max_profit, args.investment)
+        engine.opportunity_listeners.append(writer.write_events)
+    done = asyncio.Event()
+
+    def on_result(opportunities: List[Dict]):
+        writer.write(opportunities, engine.last_cycles if engine.analysis_types['triangular'] else (),
+                     engine.last_basis if engine.analysis_types['basis'] else ())
+        if args.cycles and writer.cycle >= args.cycles:
+            done.set()
+
+    def on_error(error: Exception):
+        print(f"Cycle failed: {error}", file=sys.stderr)
+
+    scheduler = ScanScheduler(
+        lambda: engine.find_arbitrage_opportunities(args.min_profit, args.max_profit, args.investment),
+        period=args.period,
+        on_result=on_result,
+        on_error=on_error
+    )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, done.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: остановка по KeyboardInterrupt
+
+    if engine.prewarm_connections:
+        await engine.prewarm()
+    scheduler.start(loop)
+    try:
+        await done.wait()
+    finally:
+        await scheduler.stop()
+        await engine.close()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config.USE_CCXT = args.ccxt
+    if args.record:
+        config.RECORD_DIR = args.record
+    if args.history:
+        config.HISTORY_DIR = args.history
+    # stdout занят данными, поэтому отладочный вывод уходит в stderr или отключается
+    logger.stream = sys.stderr if args.verbose else None
+    if args.verbose:
+        logger.level = DEBUG
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'a', encoding='utf-8')
+    try:
+        asyncio.run(run(args, output))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
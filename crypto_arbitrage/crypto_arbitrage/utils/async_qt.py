@@ -1,38 +1,148 @@
-from PyQt6.QtCore import QObject, pyqtSignal, QTimer
+from PyQt6.QtCore import QObject, pyqtSignal
 import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Callable, Coroutine, Dict, List, Optional
+from ..config import config
+from ..core.incremental import opportunity_key
+from ..core.scheduler import ScanScheduler
+from .error_handler import breaker_states
 
 
 class AsyncQtBridge(QObject):
+    """Связь GUI с движком, который работает в отдельном потоке со своим циклом asyncio.
+
+    Сеть, разбор ответов и скан выполняются только в потоке движка. Команды GUI попадают туда
+    через call_soon_threadsafe / run_coroutine_threadsafe, а результаты возвращаются сигналами:
+    сигнал из чужого потока Qt ставит в очередь событий GUI, так что опрос по таймеру не нужен.
+    """
     update_signal = pyqtSignal(str)
     finished = pyqtSignal(list)
+    live = pyqtSignal(list)  # возможности инкрементального движка между циклами
+    health = pyqtSignal(dict)  # биржа -> состояние автомата и задержки
 
     def __init__(self):
         super().__init__()
         self.loop = asyncio.new_event_loop()
-        self.timer = QTimer()
-        self.timer.timeout.connect(self._process_events)
-        self.timer.start(100)  # 100ms interval
+        self.engine = None
+        self.params = {}
+        self.scheduler = None
+        self._control: Optional[asyncio.Lock] = None
+        self._live_pending = False
+        self._confirmed: List[Dict] = []  # строки последнего цикла, подтвержденные стаканами
+        self._thread = threading.Thread(target=self._run_loop, name='arbitrage-engine', daemon=True)
+        self._thread.start()
 
-    def _process_events(self):
-        """Обработка asyncio событий в Qt event loop"""
-        self.loop.call_soon(self.loop.stop)
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
         self.loop.run_forever()
 
-    def start_arbitrage(self, engine, **params):
-        """Запуск арбитража в фоновом режиме"""
+    def call(self, callback: Callable, *args):
+        """Вызов в потоке движка между шагами цикла, например настройка движка из GUI"""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Запуск корутины в цикле движка; ошибка попадает в строку состояния"""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        future.add_done_callback(self._report_failure)
+        return future
+
+    def _report_failure(self, future: Future):
+        if not future.cancelled() and future.exception() is not None:
+            self.update_signal.emit(f"Error: {future.exception()}")
+
+    def _lock(self) -> asyncio.Lock:
+        # Команды start/stop выполняются по очереди: запуск не должен застать недоотмененный цикл
+        if self._control is None:
+            self._control = asyncio.Lock()
+        return self._control
+
+    def start_arbitrage(self, engine, period: float = None, **params) -> Future:
+        """Запуск непрерывного скана; повторный вызов обновляет параметры и запрашивает внеочередной цикл"""
+        return self.submit(self._start(engine, period, params))
+
+    async def _start(self, engine, period: Optional[float], params: dict):
+        async with self._lock():
+            self.engine = engine
+            self.params = params
+            if self._on_events not in engine.opportunity_listeners:
+                engine.opportunity_listeners.append(self._on_events)
+
+            if self.scheduler is None:
+                self.scheduler = ScanScheduler(
+                    self._run_cycle,
+                    period=period,
+                    on_result=self._on_result,
+                    on_error=self._on_error
+                )
+            elif period:
+                self.scheduler.set_period(period)
 
-        async def _run():
-            try:
+            if self.scheduler.running:
+                self.scheduler.trigger()
+            else:
                 self.update_signal.emit("Starting arbitrage search...")
-                opportunities = await engine.find_arbitrage_opportunities(**params)
-                self.finished.emit(opportunities)
-            except Exception as e:
-                self.update_signal.emit(f"Error: {str(e)}")
-                self.finished.emit([])
+                self.scheduler.start(self.loop)
+
+    async def _run_cycle(self):
+        return await self.engine.find_arbitrage_opportunities(**self.params)
+
+    def _on_result(self, opportunities):
+        report = self.engine.last_fetch_report
+        stats = self.scheduler.stats
+        self.update_signal.emit(
+            f"Cycle {int(stats['cycles'])} in {stats['last_elapsed']:.2f}s "
+            f"(next in {self.scheduler.interval:.1f}s): {report.summary() if report else ''}"
+        )
+        self.health.emit(breaker_states())
+        self._confirmed = opportunities
+        self.finished.emit(opportunities)
+
+    def _on_events(self, events):
+        """События инкрементального движка: таблица получает их не чаще GUI_REFRESH_INTERVAL"""
+        if not self._live_pending:
+            self._live_pending = True
+            self.loop.call_later(config.GUI_REFRESH_INTERVAL, self._emit_live)
+
+    def _emit_live(self):
+        self._live_pending = False
+        if self.engine is None or self.engine.incremental is None:
+            return
+        opportunities = self.engine.incremental.opportunities()
+        if self.engine.depth_check:
+            # Неподтвержденные пары в таблицу не попадают: между циклами из подтвержденных стаканами
+            # строк убираются те, что перестали быть лучшими
+            current = {opportunity_key(opportunity) for opportunity in opportunities}
+            opportunities = [opportunity for opportunity in self._confirmed if opportunity_key(opportunity) in current]
+        self.live.emit(opportunities)
+
+    def _on_error(self, error: Exception):
+        self.update_signal.emit(f"Error: {str(error)}")
+        self.finished.emit([])
+
+    def stop(self) -> Future:
+        """Остановка скана; GUI не ждет отмены текущего цикла"""
+        return self.submit(self._stop())
+
+    async def _stop(self):
+        async with self._lock():
+            if self.scheduler is not None:
+                await self.scheduler.stop()
 
-        self.loop.create_task(_run())
+    async def _shutdown(self):
+        await self._stop()
+        if self.engine is not None:
+            await self.engine.close()
 
     def close(self):
-        """Корректное завершение"""
-        self.timer.stop()
-        self.loop.close()
\ No newline at end of file
+        """Корректное завершение: остановка скана, закрытие соединений и потока движка"""
+        if not self._thread.is_alive():
+            return
+        try:
+            self.submit(self._shutdown()).result(config.ENGINE_CLOSE_TIMEOUT)
+        except Exception:
+            pass  # причина уже в строке состояния, а окно закрывается в любом случае
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(config.ENGINE_CLOSE_TIMEOUT)
+        if not self._thread.is_alive():
+            self.loop.close()
\ No newline at end of file
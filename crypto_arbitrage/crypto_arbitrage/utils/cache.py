@@ -1,43 +1,118 @@
 import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
 from ..config import config
-from ..utils.logger import logger
+
+
+def _retrieve_exception(task: asyncio.Task):
+    # Ошибку получают ожидающие; если все они отменены, она не должна попадать в лог как непрочитанная
+    if not task.cancelled():
+        task.exception()
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    stored: float  # time.monotonic() на момент записи
+    size: int  # оценка занимаемой памяти: длина тела ответа, из которого получено значение
 
 
 class DataCache:
-    def __init__(self):
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        self._lock = asyncio.Lock()
+    """LRU-кэш с TTL, ограничением числа записей и объема, с объединением одновременных запросов.
+
+    Все операции синхронны внутри цикла событий, поэтому общий замок не нужен.
+    Ключи - кортежи (биржа, url, параметры).
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries or config.CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or config.CACHE_MAX_BYTES
+        self._cache: 'OrderedDict[Hashable, CacheEntry]' = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'stale': 0, 'evictions': 0, 'expirations': 0}
 
-    async def get(self, key: str) -> Optional[Dict[str, Any]]:
-        async with self._lock:
-            if not config.CACHE_ENABLED:
-                return None
+    def _lookup(self, key: Hashable, stale_ttl: float = 0.0) -> Optional[CacheEntry]:
+        if not config.CACHE_ENABLED:
+            return None
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.stored > config.CACHE_TTL + stale_ttl:
+            self._remove(key)
+            self.stats['expirations'] += 1
+            return None
+        self._cache.move_to_end(key)
+        return entry
 
-            data = self._cache.get(key)
-            if data is None:
-                return None
+    def _remove(self, key: Hashable):
+        entry = self._cache.pop(key)
+        self._bytes -= entry.size
 
-            if datetime.now() - data['timestamp'] > timedelta(seconds=config.CACHE_TTL):
-                del self._cache[key]
-                return None
+    async def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._lookup(key)
+        self.stats['hits' if entry is not None else 'misses'] += 1
+        return entry.value if entry is not None else None
 
-            return data['value']
+    async def set(self, key: Hashable, value: Any, size: int = 0) -> None:
+        if not config.CACHE_ENABLED:
+            return
+        if key in self._cache:
+            self._remove(key)
+        self._cache[key] = CacheEntry(value, time.monotonic(), size)
+        self._bytes += size
 
-    async def set(self, key: str, value: Any) -> None:
-        async with self._lock:
-            if not config.CACHE_ENABLED:
-                return
+        while len(self._cache) > self.max_entries or (self._bytes > self.max_bytes and len(self._cache) > 1):
+            oldest = next(iter(self._cache))
+            self._remove(oldest)
+            self.stats['evictions'] += 1
 
-            self._cache[key] = {
-                'value': value,
-                'timestamp': datetime.now()
-            }
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Tuple[Any, int]]],
+                           stale_ttl: float = 0.0) -> CacheEntry:
+        """Запись из кэша или один общий запрос на всех одновременно ждущих этот ключ.
+
+        fetch возвращает (значение, размер). Запрос идет отдельной задачей: отмена одного
+        ожидающего (дедлайн цикла) не обрывает его для остальных. Запись старше CACHE_TTL,
+        но моложе CACHE_TTL + stale_ttl отдается сразу, а обновление идет в фоне.
+        """
+        entry = self._lookup(key, stale_ttl)
+        if entry is not None:
+            if time.monotonic() - entry.stored <= config.CACHE_TTL:
+                self.stats['hits'] += 1
+            else:
+                self.stats['stale'] += 1
+                self._refresh(key, fetch)
+            return entry
+
+        task = self._refresh(key, fetch)
+        return await asyncio.shield(task)
+
+    def _refresh(self, key: Hashable, fetch: Callable[[], Awaitable[Tuple[Any, int]]]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is not asyncio.get_running_loop():
+            task = None  # задача осталась от закрытого цикла событий
+        if task is not None:
+            self.stats['coalesced'] += 1
+        else:
+            self.stats['misses'] += 1
+            task = self._inflight[key] = asyncio.ensure_future(self._fill(key, fetch))
+            task.add_done_callback(_retrieve_exception)
+        return task
+
+    async def _fill(self, key: Hashable, fetch: Callable[[], Awaitable[Tuple[Any, int]]]) -> CacheEntry:
+        try:
+            value, size = await fetch()
+            await self.set(key, value, size)
+            return CacheEntry(value, time.monotonic(), size)
+        finally:
+            self._inflight.pop(key, None)
 
     async def clear(self) -> None:
-        async with self._lock:
-            self._cache.clear()
+        self._cache.clear()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
 
 
 cache = DataCache()
\ No newline at end of file
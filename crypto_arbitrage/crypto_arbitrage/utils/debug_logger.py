@@ -1,35 +1,151 @@
+import atexit
+import logging
+import queue
 import sys
+import threading
+from collections import deque
 from datetime import datetime
-from PyQt6.QtWidgets import QTextEdit
+from typing import TYPE_CHECKING, List, Optional, TextIO
+from ..config import config
+
+if TYPE_CHECKING:
+    # Только для аннотаций: движок и консольный режим не должны загружать Qt
+    from PyQt6.QtWidgets import QPlainTextEdit
+
+DEBUG, INFO, WARNING, ERROR = logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR
+
+
+class _StreamWriter(threading.Thread):
+    """Фоновая запись строк в поток вывода пачками: print в цикле событий блокирует его на медленной консоли"""
+
+    def __init__(self):
+        super().__init__(name='debug-log-writer', daemon=True)
+        # Очередь ограничена: на заблокированной консоли строки теряются, а память не растет
+        self.queue: queue.Queue = queue.Queue(maxsize=config.LOG_QUEUE_LINES)
+        self.dropped = 0
+
+    def run(self):
+        while True:
+            items = [self.queue.get()]
+            while len(items) < self.queue.maxsize:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            batch, markers = {}, []
+            for stream, line in items:
+                if stream is None:
+                    markers.append(line)
+                else:
+                    batch.setdefault(stream, []).append(line)
+            for stream, lines in batch.items():
+                try:
+                    stream.write('\n'.join(lines) + '\n')
+                    stream.flush()
+                except (OSError, ValueError):
+                    pass  # поток закрыт
+            for marker in markers:
+                marker.set()
+
+    def write(self, stream: TextIO, line: str):
+        try:
+            self.queue.put_nowait((stream, line))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 1.0):
+        """Ожидание записи всего, что уже поставлено в очередь"""
+        done = threading.Event()
+        try:
+            self.queue.put((None, done), timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
 
 
 class DebugLogger:
-    def __init__(self, output_widget: QTextEdit = None):
+    """Журнал приложения для консоли и окна GUI.
+
+    Уровень проверяется до форматирования: аргументы сообщения (log("... %s", value))
+    подставляются только для принятых записей. Последние сообщения хранятся в кольцевом буфере,
+    консоль пишется фоновым потоком, а окно GUI получает строки пачками при flush_widget().
+    """
+
+    def __init__(self, output_widget: 'QPlainTextEdit' = None, stream: Optional[TextIO] = sys.stdout,
+                 level: int = None, capacity: int = None):
         self.output_widget = output_widget
-        self.log_buffer = []
+        self.stream = stream
+        self.level = logging.getLevelName(config.LOG_LEVEL) if level is None else level
+        self.log_buffer = deque(maxlen=capacity or config.LOG_BUFFER_LINES)
+        self._widget_pending = deque(maxlen=capacity or config.LOG_BUFFER_LINES)
+        self._writer = _StreamWriter()
+        self._writer.start()
+        self.stats = {'written': 0, 'filtered': 0, 'dropped': 0}
+
+    def enabled(self, level: int) -> bool:
+        return level >= self.level
 
-    def log(self, message: str):
+    def log(self, message: str, *args, level: int = INFO):
         """Логирование сообщения с временной меткой"""
+        if level < self.level:
+            self.stats['filtered'] += 1
+            return
+        if args:
+            message = message % args
         timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
         full_message = f"[{timestamp}] {message}"
+        self.stats['written'] += 1
 
         # Вывод в консоль
-        print(full_message)
+        if self.stream is not None:
+            self._writer.write(self.stream, full_message)
+            self.stats['dropped'] = self._writer.dropped
 
-        # Вывод в GUI
-        if self.output_widget:
-            self.output_widget.append(full_message)
-            self.output_widget.verticalScrollBar().setValue(
-                self.output_widget.verticalScrollBar().maximum()
-            )
+        # Вывод в GUI - пачкой при следующем flush_widget()
+        if self.output_widget is not None:
+            self._widget_pending.append(full_message)
 
         # Сохранение в буфер
         self.log_buffer.append(full_message)
 
+    def debug(self, message: str, *args):
+        self.log(message, *args, level=DEBUG)
+
+    def info(self, message: str, *args):
+        self.log(message, *args, level=INFO)
+
+    def warning(self, message: str, *args):
+        self.log(message, *args, level=WARNING)
+
+    def error(self, message: str, *args):
+        self.log(message, *args, level=ERROR)
+
+    def take_pending(self) -> List[str]:
+        """Строки, еще не показанные в окне GUI"""
+        lines = []
+        pending = self._widget_pending
+        while pending:
+            lines.append(pending.popleft())
+        return lines
+
+    def flush_widget(self):
+        """Вывод накопленных строк в окно одной вставкой; вызывается таймером GUI"""
+        lines = self.take_pending()
+        if self.output_widget is None or not lines:
+            return
+        self.output_widget.appendPlainText('\n'.join(lines))
+        scrollbar = self.output_widget.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+
+    def flush(self):
+        """Дописать консольный вывод (перед выходом из процесса)"""
+        self._writer.flush()
+
     def get_logs(self) -> str:
         """Получить все логи"""
         return "\n".join(self.log_buffer)
 
 
 # Глобальный экземпляр логгера
-logger = DebugLogger()
\ No newline at end of file
+logger = DebugLogger()
+atexit.register(logger.flush)
\ No newline at end of file
@@ -1,27 +1,214 @@
 import asyncio
-from typing import Callable, Any, Coroutine, TypeVar
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Any, Coroutine, Dict, Optional, TypeVar
 from functools import wraps
 from ..utils.logger import logger
+from ..utils.rate_limiter import RateLimitExceeded
 from ..config import config
 
 T = TypeVar('T')
 
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
 
-def async_retry(max_retries: int = None, delay: float = None):
-    """Декоратор для повторных попыток выполнения асинхронных функций"""
+
+class CircuitOpen(Exception):
+    """Биржа пропущена без запроса: автомат разомкнут после серии ошибок или медленных ответов"""
+
+
+class CircuitBreaker:
+    """Автомат биржи: closed -> open по доле ошибок и медленных ответов в скользящем окне,
+    open -> half-open по истечении паузы, half-open -> closed после успешной пробы.
+
+    Он же хранит сетевые задержки успешных ответов (hedged) для порога хеджирования (p95).
+    Время ожидания собственного лимита запросов не входит ни в задержки, ни в медленные вызовы:
+    бюджет берется до guard() (см. async_retry(prepare=...)).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=config.BREAKER_WINDOW)  # True - ошибка или медленный ответ
+        self._latencies = deque(maxlen=100)
+        self._opened_at = 0.0
+        self._open_for = config.BREAKER_OPEN_SECONDS
+        self._probe = False
+        self.stats = {'trips': 0, 'rejected': 0, 'hedges': 0, 'hedge_wins': 0}
+
+    @property
+    def failure_rate(self) -> float:
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    def latency(self, quantile: float) -> Optional[float]:
+        if len(self._latencies) < config.HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+    def blocked(self) -> bool:
+        """Разомкнут и пауза не истекла: запрос будет отклонен без обращения к бирже"""
+        return self.state == OPEN and time.monotonic() - self._opened_at < self._open_for
+
+    def allow(self) -> bool:
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self._open_for:
+            self.state = HALF_OPEN
+            self._probe = False
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._probe:
+            # Пропускаем один пробный запрос
+            self._probe = True
+            return True
+        self.stats['rejected'] += 1
+        return False
+
+    def record_success(self, latency: float):
+        slow = latency > config.BREAKER_SLOW_CALL
+        if self.state == HALF_OPEN:
+            if slow:
+                self._trip()
+            else:
+                self._close()
+            return
+        self._outcomes.append(slow)
+        self._check()
+
+    def record_failure(self):
+        if self.state == HALF_OPEN:
+            self._trip()
+            return
+        self._outcomes.append(True)
+        self._check()
+
+    def _check(self):
+        if (self.state == CLOSED and len(self._outcomes) >= config.BREAKER_MIN_CALLS
+                and self.failure_rate >= config.BREAKER_FAILURE_RATE):
+            self._trip()
+
+    def _trip(self):
+        # Повторное размыкание после неудачной пробы удваивает паузу
+        if self.state == HALF_OPEN:
+            self._open_for = min(self._open_for * 2, config.BREAKER_MAX_OPEN_SECONDS)
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._probe = False
+        self.stats['trips'] += 1
+        logger.warning(f"Circuit open for {self.name} for {self._open_for:.0f}s "
+                       f"(failure rate {self.failure_rate:.0%})")
+
+    def _close(self):
+        self.state = CLOSED
+        self._outcomes.clear()
+        self._open_for = config.BREAKER_OPEN_SECONDS
+        self._probe = False
+        logger.info(f"Circuit closed for {self.name}")
+
+    @asynccontextmanager
+    async def guard(self):
+        """Учет результата и задержки вызова; CircuitOpen, если автомат не пропускает запрос"""
+        if not self.allow():
+            raise CircuitOpen(f"Circuit open for {self.name}")
+        started = time.monotonic()
+        try:
+            yield
+        except RateLimitExceeded:
+            # Собственный лимит запросов не говорит о состоянии биржи
+            if self.state == HALF_OPEN:
+                self._probe = False
+            raise
+        except (Exception, asyncio.CancelledError):
+            # Отмена по дедлайну цикла - тоже признак медленной биржи
+            self.record_failure()
+            raise
+        self.record_success(time.monotonic() - started)
+
+    async def hedged(self, send: Callable[[], Awaitable[T]], can_hedge: Callable[[], bool] = lambda: True) -> T:
+        """Идемпотентный запрос с дублем, если первый не ответил за p95 задержки биржи"""
+        delay = self.latency(0.95) if config.HEDGE_REQUESTS else None
+        started = time.monotonic()
+        first = asyncio.ensure_future(send())
+        tasks = [first]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and can_hedge():
+                    self.stats['hedges'] += 1
+                    tasks.append(asyncio.ensure_future(send()))
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.stats['hedge_wins'] += 1
+                        self._latencies.append(time.monotonic() - started)
+                        return task.result()
+            return first.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Состояние для UI и метрик"""
+        return {
+            'state': self.state,
+            'failure_rate': self.failure_rate,
+            'p50': self.latency(0.5),
+            'p95': self.latency(0.95),
+            **self.stats
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(venue: str) -> CircuitBreaker:
+    key = venue.lower()
+    breaker = _breakers.get(key)
+    if breaker is None:
+        breaker = _breakers[key] = CircuitBreaker(key)
+    return breaker
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    return {venue: breaker.snapshot() for venue, breaker in _breakers.items()}
+
+
+def async_retry(max_retries: int = None, delay: float = None, venue: Callable[..., str] = None,
+                prepare: Callable[..., Coroutine[Any, Any, Any]] = None):
+    """Декоратор для повторных попыток выполнения асинхронных функций.
+
+    venue(*args, **kwargs) - имя биржи для автомата: ее вызовы учитываются,
+    а при разомкнутом автомате повторы прекращаются сразу (CircuitOpen).
+    prepare(*args, **kwargs) - корутина перед каждой попыткой вне автомата, например ожидание
+    лимита запросов: ее время не должно считаться задержкой биржи.
+    """
 
     def decorator(f: Callable[..., Coroutine[Any, Any, T]]) -> Callable[..., Coroutine[Any, Any, T]]:
         @wraps(f)
         async def wrapper(*args, **kwargs) -> T:
             _max_retries = max_retries or config.RETRY_COUNT
             _delay = delay or config.RETRY_DELAY
+            breaker = get_breaker(venue(*args, **kwargs)) if venue is not None else None
 
             last_exception = None
             for attempt in range(1, _max_retries + 1):
                 try:
-                    return await f(*args, **kwargs)
+                    if prepare is not None and not (breaker is not None and breaker.blocked()):
+                        await prepare(*args, **kwargs)
+                    if breaker is None:
+                        return await f(*args, **kwargs)
+                    async with breaker.guard():
+                        return await f(*args, **kwargs)
+                except (RateLimitExceeded, CircuitOpen):
+                    # Повтор только добавил бы запросов к исчерпанному лимиту или лежащей бирже
+                    raise
                 except Exception as e:
                     last_exception = e
+                    if breaker is not None and breaker.state == OPEN:
+                        break
                     if attempt < _max_retries:
                         wait_time = _delay * attempt
                         logger.warning(
@@ -0,0 +1,449 @@
+import atexit
+import json
+import mmap
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from ..config import config
+from ..core.data_processor import MARKET_INDEX, MARKET_TYPES, PriceBookView
+from .logger import logger
+
+
+DAY_MS = 86_400_000
+KINDS = ('scan', 'basis')  # источник возможности: скан пар рынков или базис спот - фьючерс
+
+# Колонки таблиц и их типы на диске. Время - миллисекунды от начала суток UTC раздела,
+# символы и биржи - номера в общем словаре хранилища
+TABLES = {
+    'quotes': {
+        'time': np.uint32, 'symbol': np.uint32, 'venue': np.uint8, 'market': np.uint8,
+        'bid': np.float64, 'ask': np.float64
+    },
+    'opportunities': {
+        'time': np.uint32, 'symbol': np.uint32, 'kind': np.uint8,
+        'buy_venue': np.uint8, 'buy_market': np.uint8, 'sell_venue': np.uint8, 'sell_market': np.uint8,
+        'buy_price': np.float64, 'sell_price': np.float64, 'spread': np.float32, 'profit': np.float32
+    }
+}
+# Колонки со ссылками на словари и сами словари
+ENCODED = {'symbol': 'symbols', 'venue': 'venues', 'buy_venue': 'venues', 'sell_venue': 'venues'}
+MARKETS = {'market', 'buy_market', 'sell_market'}
+
+# Файл сегмента: метка, длина заголовка (uint64), заголовок JSON с типами и смещениями колонок,
+# затем колонки подряд, каждая с границы ALIGNMENT байт
+MAGIC = b'CAHIST01'
+ALIGNMENT = 64
+
+
+def _write_segment(path: Path, columns: Dict[str, np.ndarray]):
+    rows = len(next(iter(columns.values())))
+    layout, offset = [], 0
+    for name, values in columns.items():
+        layout.append([name, values.dtype.str, offset])
+        offset += -(-values.nbytes // ALIGNMENT) * ALIGNMENT
+    header = json.dumps({'rows': rows, 'columns': layout}).encode()
+    start = -(-(len(MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+    with open(path, 'wb') as f:
+        f.write(MAGIC + np.uint64(len(header)).tobytes() + header)
+        for (_, _, column_offset), values in zip(layout, columns.values()):
+            f.seek(start + column_offset)
+            f.write(np.ascontiguousarray(values).tobytes())
+
+
+def _map_segment(path: Path) -> Dict[str, np.ndarray]:
+    """Колонки сегмента без чтения данных: массивы поверх отображения файла в память"""
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"Not a history segment: {path.name}")
+    size = int(np.frombuffer(buffer, np.uint64, 1, len(MAGIC))[0])
+    header = json.loads(buffer[len(MAGIC) + 8:len(MAGIC) + 8 + size])
+    start = -(-(len(MAGIC) + 8 + size) // ALIGNMENT) * ALIGNMENT
+    return {name: np.frombuffer(buffer, np.dtype(dtype), header['rows'], start + offset)
+            for name, dtype, offset in header['columns']}
+
+
+class _Dictionary:
+    """Словарь строк хранилища: номер не меняется, новые строки только дописываются"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.values: Dict[str, List[str]] = {'symbols': [], 'venues': []}
+        if path.exists():
+            self.values.update(json.loads(path.read_text(encoding='utf-8')))
+        self._ids = {name: {value: i for i, value in enumerate(values)} for name, values in self.values.items()}
+        self.dirty = False
+
+    def encode(self, name: str, values: Sequence[str]) -> np.ndarray:
+        ids, known = self._ids[name], self.values[name]
+        codes = np.empty(len(values), dtype=np.int64)
+        for i, value in enumerate(values):
+            code = ids.get(value)
+            if code is None:
+                code = ids[value] = len(known)
+                known.append(value)
+                self.dirty = True
+            codes[i] = code
+        return codes
+
+    def save(self):
+        """Атомарная запись: читатель видит либо старый, либо новый словарь целиком"""
+        if not self.dirty:
+            return
+        temporary = self.path.with_suffix('.tmp')
+        temporary.write_text(json.dumps(self.values, ensure_ascii=False), encoding='utf-8')
+        os.replace(temporary, self.path)
+        self.dirty = False
+
+
+class HistoryStore:
+    """Хранилище истории котировок и возможностей: колоночные сегменты только на дозапись.
+
+    Данные разбиты на разделы по суткам UTC; каждый сброс пачки создает в разделе файл сегмента
+    с колонками подряд, строки которого отсортированы по символу и времени. Сжатие - словарные
+    коды символов и бирж и узкие типы колонок, поэтому сегменты читаются через memory map
+    без распаковки. Из котировок пишутся только изменившиеся с прошлого цикла.
+    В цикле событий выполняется только выборка изменений и постановка в очередь, кодирование,
+    сортировка и запись - в фоновом потоке.
+    """
+
+    def __init__(self, directory: str, flush_seconds: float = None, segment_rows: int = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.flush_seconds = flush_seconds or config.HISTORY_FLUSH_SECONDS
+        self.segment_rows = segment_rows or config.HISTORY_SEGMENT_ROWS
+        self.stats = {'quotes': 0, 'opportunities': 0, 'segments': 0, 'dropped': 0}
+
+        self._dictionary = _Dictionary(self.directory / 'dictionary.json')
+        self._last: Optional[Tuple[Tuple[str, ...], np.ndarray, np.ndarray]] = None
+        self._symbol_codes: Tuple[Tuple[str, ...], np.ndarray] = ((), np.empty(0, dtype=np.int64))
+        self._pending: Dict[str, List[Dict[str, np.ndarray]]] = {table: [] for table in TABLES}
+        self._pending_rows = {table: 0 for table in TABLES}
+        self._pending_since = {table: 0.0 for table in TABLES}
+        self._sequence = 0
+
+        self._queue: queue.Queue = queue.Queue(maxsize=config.HISTORY_QUEUE)
+        self._thread = threading.Thread(target=self._write_loop, name='history-writer', daemon=True)
+        self._thread.start()
+
+    def append_quotes(self, prices: PriceBookView):
+        """Котировки книги, изменившиеся с прошлого вызова"""
+        bid, ask = prices.bid, prices.ask
+        last = self._last
+        changed = ~np.isnan(bid)
+        if last is not None and last[0] == tuple(prices.venues):
+            rows = min(len(last[1]), len(bid))
+            changed[:rows] &= (bid[:rows] != last[1][:rows]) | (ask[:rows] != last[2][:rows])
+        self._last = (tuple(prices.venues), bid.copy(), ask.copy())
+
+        rows, venues, markets = np.nonzero(changed)
+        if not len(rows):
+            return
+        timestamp = prices.timestamp[rows, venues, markets]
+        timestamp = np.where(np.isnan(timestamp), time.time(), timestamp)
+        self._put('quotes', {
+            'symbols': prices.symbols, 'venues': prices.venues,
+            'time': timestamp, 'symbol': rows, 'venue': venues, 'market': markets,
+            'bid': bid[rows, venues, markets], 'ask': ask[rows, venues, markets]
+        })
+
+    def append_opportunities(self, opportunities: List[Dict], kind: str = 'scan', timestamp: float = None):
+        """Возможности цикла; разбор словарей выполняется в фоновом потоке"""
+        if opportunities:
+            self._put('opportunities', {'time': timestamp or time.time(), 'kind': KINDS.index(kind),
+                                        'items': opportunities})
+
+    def _put(self, table: str, batch: Dict):
+        try:
+            self._queue.put_nowait((table, batch))
+        except queue.Full:
+            # Диск не успевает: теряем пачку, но не тормозим цикл
+            self.stats['dropped'] += 1
+
+    def flush(self, timeout: float = None):
+        """Запись всего поставленного в очередь отдельными сегментами и ожидание ее окончания"""
+        done = threading.Event()
+        self._queue.put((None, done))
+        done.wait(timeout)
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _write_loop(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_seconds / 4)
+            except queue.Empty:
+                item = ()
+            if item is None:
+                break
+            try:
+                if item and item[0] is None:
+                    try:
+                        for table in TABLES:
+                            self._flush(table)
+                    finally:
+                        item[1].set()
+                    continue
+                if item:
+                    self._buffer(*item)
+                now = time.time()
+                for table, rows in self._pending_rows.items():
+                    if rows and (rows >= self.segment_rows or now - self._pending_since[table] >= self.flush_seconds):
+                        self._flush(table)
+            except Exception as e:
+                logger.error(f"Failed to write history: {str(e)}")
+        for table in TABLES:
+            try:
+                self._flush(table)
+            except Exception as e:
+                logger.error(f"Failed to write history: {str(e)}")
+
+    def _buffer(self, table: str, batch: Dict):
+        if table == 'quotes':
+            columns = self._encode_quotes(batch)
+        else:
+            columns = self._encode_opportunities(batch)
+        if not len(columns['time']):
+            return
+        if not self._pending_rows[table]:
+            self._pending_since[table] = time.time()
+        self._pending[table].append(columns)
+        self._pending_rows[table] += len(columns['time'])
+        self.stats[table] += len(columns['time'])
+
+    def _encode_quotes(self, batch: Dict) -> Dict[str, np.ndarray]:
+        symbols, codes = self._symbol_codes
+        if batch['symbols'] != symbols:
+            # Книга цен только добавляет символы: кодируются лишь новые строки
+            if batch['symbols'][:len(symbols)] == symbols:
+                tail = self._dictionary.encode('symbols', batch['symbols'][len(symbols):])
+                codes = np.concatenate([codes, tail])
+            else:
+                codes = self._dictionary.encode('symbols', batch['symbols'])
+            self._symbol_codes = (batch['symbols'], codes)
+        venues = self._dictionary.encode('venues', batch['venues'])
+        return {
+            'time': np.round(batch['time'] * 1000).astype(np.int64),
+            'symbol': codes[batch['symbol']], 'venue': venues[batch['venue']], 'market': batch['market'],
+            'bid': batch['bid'], 'ask': batch['ask']
+        }
+
+    def _encode_opportunities(self, batch: Dict) -> Dict[str, np.ndarray]:
+        items = batch['items']
+        encode = self._dictionary.encode
+        return {
+            'time': np.full(len(items), round(batch['time'] * 1000), dtype=np.int64),
+            'symbol': encode('symbols', [item['symbol'] for item in items]),
+            'kind': np.full(len(items), batch['kind']),
+            'buy_venue': encode('venues', [item['buy_exchange'] for item in items]),
+            'buy_market': np.array([MARKET_INDEX[item['buy_market_type']] for item in items]),
+            'sell_venue': encode('venues', [item['sell_exchange'] for item in items]),
+            'sell_market': np.array([MARKET_INDEX[item['sell_market_type']] for item in items]),
+            'buy_price': np.array([item['buy_price'] for item in items], dtype=float),
+            'sell_price': np.array([item['sell_price'] for item in items], dtype=float),
+            'spread': np.array([item['spread_percent'] for item in items], dtype=float),
+            'profit': np.array([item['profit_amount'] for item in items], dtype=float)
+        }
+
+    def _flush(self, table: str):
+        """Запись накопленной пачки: по сегменту на сутки, строки по символу и времени"""
+        batches = self._pending[table]
+        if not batches:
+            return
+        columns = {name: np.concatenate([batch[name] for batch in batches]) for name in TABLES[table]}
+        self._pending[table] = []
+        self._pending_rows[table] = 0
+        # Словарь пишется раньше сегментов, которые на него ссылаются
+        self._dictionary.save()
+
+        days = columns['time'] // DAY_MS
+        for day in np.unique(days).tolist():
+            selected = np.flatnonzero(days == day)
+            rows = selected[np.lexsort((columns['time'][selected], columns['symbol'][selected]))]
+            milliseconds = columns['time'][rows]
+            partition = self.directory / table / _day_name(day)
+            partition.mkdir(parents=True, exist_ok=True)
+            self._sequence += 1
+            name = f"{milliseconds.min()}-{milliseconds.max()}-{self._sequence:06d}"
+            segment = {}
+            for column, dtype in TABLES[table].items():
+                values = milliseconds - day * DAY_MS if column == 'time' else columns[column][rows]
+                segment[column] = values.astype(dtype)
+            # Читатель не видит сегмент, пока он не записан целиком
+            temporary = partition / (name + '.tmp')
+            _write_segment(temporary, segment)
+            os.replace(temporary, partition / (name + '.seg'))
+            self.stats['segments'] += 1
+
+
+def _day_name(day: int) -> str:
+    return datetime.fromtimestamp(day * 86400, timezone.utc).strftime('%Y%m%d')
+
+
+class HistoryReader:
+    """Запросы к хранилищу истории по интервалу времени, символу и бирже.
+
+    Сегменты вне интервала отбрасываются по имени раздела и сегмента, строки символа находятся
+    двоичным поиском по отсортированной колонке, а колонки отображаются в память и читаются
+    только в найденном диапазоне строк.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self._dictionary: Dict[str, List[str]] = {}
+        self._dictionary_mtime = None
+        self._ids: Dict[str, Dict[str, int]] = {}
+
+    def _load_dictionary(self):
+        path = self.directory / 'dictionary.json'
+        mtime = path.stat().st_mtime_ns if path.exists() else None
+        if mtime != self._dictionary_mtime:
+            self._dictionary = json.loads(path.read_text(encoding='utf-8')) if mtime else {'symbols': [], 'venues': []}
+            self._ids = {name: {value: i for i, value in enumerate(values)}
+                         for name, values in self._dictionary.items()}
+            self._dictionary_mtime = mtime
+
+    def _segments(self, table: str, start: float, end: float) -> Iterator[Tuple[int, Path]]:
+        """Сегменты, пересекающие [start, end]: (начало суток раздела в мс, файл)"""
+        first = datetime.fromtimestamp(start, timezone.utc).date()
+        last = datetime.fromtimestamp(end, timezone.utc).date()
+        start_ms, end_ms = start * 1000, end * 1000
+        day = first
+        while day <= last:
+            partition = self.directory / table / day.strftime('%Y%m%d')
+            base = int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp()) * 1000
+            if partition.is_dir():
+                for segment in sorted(partition.iterdir()):
+                    if segment.suffix != '.seg':
+                        continue
+                    low, high, _ = segment.stem.split('-')
+                    if int(high) >= start_ms and int(low) <= end_ms:
+                        yield base, segment
+            day += timedelta(days=1)
+
+    def _query(self, table: str, start: float, end: float, symbol: Optional[str],
+               filters: Dict[str, int], any_venue: Optional[int]) -> Dict[str, np.ndarray]:
+        names = TABLES[table]
+        symbol_id = None
+        if symbol is not None:
+            symbol_id = self._ids['symbols'].get(symbol)
+            if symbol_id is None:
+                return self._decode({name: np.empty(0, dtype=dtype) for name, dtype in names.items()}, np.empty(0))
+
+        parts, times = [], []
+        for base, path in self._segments(table, start, end):
+            segment = _map_segment(path)
+            low, high = 0, None
+            if symbol_id is not None:
+                low, high = np.searchsorted(segment['symbol'], [symbol_id, symbol_id + 1]).tolist()
+                if low == high:
+                    continue
+            milliseconds = base + segment['time'][low:high].astype(np.int64)
+            mask = (milliseconds >= start * 1000) & (milliseconds <= end * 1000)
+            columns = {name: column[low:high] for name, column in segment.items() if name != 'time'}
+            for name, value in filters.items():
+                mask &= columns[name] == value
+            if any_venue is not None:
+                mask &= (columns['buy_venue'] == any_venue) | (columns['sell_venue'] == any_venue)
+            if not mask.any():
+                continue
+            parts.append({name: column[mask] for name, column in columns.items()})
+            times.append(milliseconds[mask])
+
+        if not parts:
+            return self._decode({name: np.empty(0, dtype=dtype) for name, dtype in names.items()}, np.empty(0))
+        columns = {name: np.concatenate([part[name] for part in parts]) for name in names if name != 'time'}
+        milliseconds = np.concatenate(times)
+        order = np.argsort(milliseconds, kind='stable')
+        return self._decode({name: column[order] for name, column in columns.items()}, milliseconds[order])
+
+    def _decode(self, columns: Dict[str, np.ndarray], milliseconds: np.ndarray) -> Dict[str, np.ndarray]:
+        """Время в unix-секундах, символы и биржи - строками"""
+        result = {'time': milliseconds / 1000}
+        for name, column in columns.items():
+            if name == 'time':
+                continue
+            if name in ENCODED:
+                values = np.array(self._dictionary[ENCODED[name]], dtype=object)
+                result[name] = values[column.astype(np.intp)] if len(values) else column.astype(object)
+            elif name in MARKETS:
+                result[name] = np.array(MARKET_TYPES, dtype=object)[column.astype(np.intp)]
+            elif name == 'kind':
+                result[name] = np.array(KINDS, dtype=object)[column.astype(np.intp)]
+            else:
+                result[name] = column
+        return result
+
+    def quotes(self, start: float, end: float, symbol: Optional[str] = None, venue: Optional[str] = None,
+               market_type: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """Котировки за [start, end] (unix-секунды) по колонкам, по возрастанию времени"""
+        self._load_dictionary()
+        filters = {}
+        if venue is not None:
+            filters['venue'] = self._ids['venues'].get(venue, -1)
+        if market_type is not None:
+            filters['market'] = MARKET_INDEX[market_type]
+        return self._query('quotes', start, end, symbol, filters, None)
+
+    def opportunities(self, start: float, end: float, symbol: Optional[str] = None,
+                      venue: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """Возможности за [start, end]; venue - биржа покупки или продажи"""
+        self._load_dictionary()
+        any_venue = self._ids['venues'].get(venue, -1) if venue is not None else None
+        return self._query('opportunities', start, end, symbol, {}, any_venue)
+
+
+def opportunity_runs(columns: Dict[str, np.ndarray], max_gap: float = None) -> Dict[str, np.ndarray]:
+    """Непрерывные периоды существования возможностей (по результату HistoryReader.opportunities).
+
+    Возможность - символ и направление сделки; период прерывается, если между появлениями
+    прошло больше max_gap секунд (по умолчанию два периода скана). Периоды - от самого долгого.
+    """
+    max_gap = max_gap or 2 * config.SCAN_PERIOD
+    keys = ('symbol', 'kind', 'buy_venue', 'buy_market', 'sell_venue', 'sell_market')
+    times = columns['time']
+    # Номер возможности: коды ключей в порядке строк, затем группировка одним lexsort
+    codes = [np.unique(columns[key].astype(str), return_inverse=True)[1].ravel() for key in keys]
+    order = np.lexsort([times] + codes[::-1])
+    breaks = np.ones(len(order), dtype=bool)
+    if len(order) > 1:
+        same = np.diff(times[order]) <= max_gap
+        for code in codes:
+            same &= code[order][1:] == code[order][:-1]
+        breaks[1:] = ~same
+    starts = np.flatnonzero(breaks)
+    ends = np.append(starts[1:], len(order)) - 1
+
+    first, last = order[starts], order[ends]
+    spread = columns['spread'][order]
+    runs = {key: columns[key][first] for key in keys}
+    runs.update({
+        'start': times[first],
+        'end': times[last],
+        'duration': times[last] - times[first],
+        'observations': ends - starts + 1,
+        'max_spread': np.maximum.reduceat(spread, starts) if len(starts) else spread,
+        'mean_spread': np.add.reduceat(spread, starts) / (ends - starts + 1) if len(starts) else spread
+    })
+    longest = np.argsort(-runs['duration'], kind='stable')
+    return {name: column[longest] for name, column in runs.items()}
+
+
+_history: Optional[HistoryStore] = None
+
+
+def get_history() -> Optional[HistoryStore]:
+    """Общее хранилище истории процесса; None, если оно выключено (config.HISTORY_DIR не задан)"""
+    global _history
+    if _history is None and config.HISTORY_DIR:
+        _history = HistoryStore(config.HISTORY_DIR)
+        atexit.register(_history.close)
+    return _history
\ No newline at end of file
@@ -0,0 +1,94 @@
+import asyncio
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from ..config import config
+from .logger import logger
+
+
+class HttpClient:
+    """Общий на процесс пул соединений для адаптеров бирж и клиентов ccxt.
+
+    Один TCPConnector с ограничением соединений на хост, keep-alive и кэшем DNS вместо
+    отдельной сессии на каждый адаптер. Сжатие ответов (gzip/deflate, br при установленном Brotli)
+    aiohttp запрашивает и распаковывает сам.
+    """
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {'requests': 0, 'connections_created': 0, 'connections_reused': 0,
+                      'dns_hits': 0, 'dns_misses': 0, 'prewarmed': 0}
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        def counter(name):
+            async def on_event(session, context, params):
+                self.stats[name] += 1
+            return on_event
+
+        trace.on_request_start.append(counter('requests'))
+        trace.on_connection_create_end.append(counter('connections_created'))
+        trace.on_connection_reuseconn.append(counter('connections_reused'))
+        trace.on_dns_cache_hit.append(counter('dns_hits'))
+        trace.on_dns_cache_miss.append(counter('dns_misses'))
+        return trace
+
+    def session(self) -> aiohttp.ClientSession:
+        """Сессия текущего цикла событий; создается при первом обращении"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=config.HTTP_POOL_LIMIT,
+                limit_per_host=config.HTTP_LIMIT_PER_HOST,
+                keepalive_timeout=config.HTTP_KEEPALIVE,
+                ttl_dns_cache=config.HTTP_DNS_TTL,
+                use_dns_cache=True
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=config.REQUEST_TIMEOUT),
+                trace_configs=[self._trace_config()]
+            )
+            self._loop = loop
+        return self._session
+
+    async def prewarm(self, urls: Iterable[str]):
+        """Установка соединений (DNS, TCP, TLS) со всеми хостами заранее, до первого цикла"""
+        origins = sorted({f"{parts.scheme}://{parts.netloc}" for parts in map(urlsplit, urls) if parts.netloc})
+        session = self.session()
+
+        async def touch(origin: str) -> bool:
+            try:
+                async with session.head(origin + '/', allow_redirects=False) as response:
+                    await response.read()
+                return True
+            except Exception as e:
+                logger.debug(f"Prewarm failed for {origin}: {str(e)}")
+                return False
+
+        warmed = sum(await asyncio.gather(*(touch(origin) for origin in origins)))
+        self.stats['prewarmed'] += warmed
+        logger.debug(f"Prewarmed {warmed}/{len(origins)} hosts")
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Доля запросов, ушедших по уже открытому соединению"""
+        total = self.stats['connections_created'] + self.stats['connections_reused']
+        return self.stats['connections_reused'] / total if total else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.stats['requests']} requests, {self.stats['connections_created']} connections opened, "
+                f"reuse {self.reuse_ratio:.0%}")
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+http_client = HttpClient()
\ No newline at end of file
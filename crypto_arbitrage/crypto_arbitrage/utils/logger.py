@@ -1,11 +1,47 @@
+import atexit
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from datetime import datetime
 from ..config import config
 
 
+class _DeferredQueueHandler(QueueHandler):
+    """Передача записи в очередь без форматирования: сообщение собирается уже в потоке записи.
+
+    Очередь ограничена: если диск или консоль не успевают, запись теряется и учитывается в dropped.
+    """
+
+    def __init__(self, records: queue.Queue):
+        super().__init__(records)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _BoundedQueueListener(QueueListener):
+    def enqueue_sentinel(self):
+        # При переполненной очереди ждем место для метки остановки, а не падаем при выходе
+        try:
+            self.queue.put(self._sentinel, timeout=1.0)
+        except queue.Full:
+            pass
+
+
 def setup_logger(name: str) -> logging.Logger:
-    """Настройка логгера с записью в файл и консоль"""
+    """Настройка логгера с записью в файл и консоль.
+
+    Вызывающий поток (цикл событий) только кладет запись в очередь; форматирование
+    и запись в файл и консоль выполняет фоновый поток QueueListener.
+    """
     logs_dir = Path('logs')
     logs_dir.mkdir(exist_ok=True)
 
@@ -29,9 +65,12 @@ def setup_logger(name: str) -> logging.Logger:
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
 
-    # Добавляем обработчики
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Добавляем обработчики за очередью
+    records = queue.Queue(maxsize=config.LOG_QUEUE_LINES)
+    listener = _BoundedQueueListener(records, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    logger.addHandler(_DeferredQueueHandler(records))
 
     return logger
 
@@ -0,0 +1,49 @@
+import asyncio
+import time
+from typing import Dict, Optional
+from ..config import config
+
+
+class LoopMonitor:
+    """Замер простоев цикла событий: насколько позже срока просыпается короткий sleep.
+
+    Пока цикл занят синхронной работой (разбор ответа, скан), опаздывают все ожидающие:
+    сетевые запросы, таймеры, мост Qt. Опоздание больше порога считается простоем.
+    """
+
+    def __init__(self, interval: Optional[float] = None, threshold: Optional[float] = None):
+        self.interval = interval or config.LOOP_MONITOR_INTERVAL
+        self.threshold = config.LOOP_STALL_THRESHOLD if threshold is None else threshold
+        self._task: Optional[asyncio.Task] = None
+        self.stats = self._empty()
+
+    @staticmethod
+    def _empty() -> Dict[str, float]:
+        return {'stalls': 0, 'stalled': 0.0, 'max_stall': 0.0}
+
+    def start(self):
+        """Запуск в текущем цикле событий; повторный вызов ничего не делает"""
+        if self._task is not None and not self._task.done() and self._task.get_loop() is asyncio.get_running_loop():
+            return
+        self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - started - self.interval
+            if lag > self.threshold:
+                self.stats['stalls'] += 1
+                self.stats['stalled'] += lag
+                self.stats['max_stall'] = max(self.stats['max_stall'], lag)
+
+    def take(self) -> Dict[str, float]:
+        """Простои с прошлого вызова"""
+        stats, self.stats = self.stats, self._empty()
+        return stats
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
\ No newline at end of file
@@ -0,0 +1,196 @@
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer
+from PyQt6.QtGui import QColor
+from ..config import config
+
+
+def _price(value: float) -> str:
+    return f"{value:.8f}".rstrip('0').rstrip('.')
+
+
+# (заголовок, поле возможности, форматирование ячейки)
+COLUMNS: List[Tuple[str, str, Callable[[Any], str]]] = [
+    ('Pair', 'symbol', str),
+    ('Buy Exchange', 'buy_exchange', str),
+    ('Buy Market', 'buy_market_type', str.capitalize),
+    ('Sell Exchange', 'sell_exchange', str),
+    ('Sell Market', 'sell_market_type', str.capitalize),
+    ('Buy Price', 'buy_price', _price),
+    ('Sell Price', 'sell_price', _price),
+    ('Spread %', 'spread_percent', lambda value: f"{value:.2f}%"),
+    ('Profit $', 'profit_amount', lambda value: f"${value:.2f}"),
+    ('Investment', 'investment', lambda value: f"${value:.2f}")
+]
+
+# Цветовая маркировка по проценту спреда: (порог, цвет фона)
+SPREAD_COLORS = [
+    (5, QColor(0, 100, 0)),  # Темно-зеленый
+    (2, QColor(0, 70, 0)),  # Зеленый
+    (1, QColor(100, 100, 0))  # Желтый
+]
+
+Key = Tuple[str, str, str, str, str]
+
+
+def opportunity_key(opportunity: Dict) -> Key:
+    """Идентичность возможности между циклами: символ и обе ноги сделки"""
+    return (opportunity['symbol'], opportunity['buy_exchange'], opportunity['buy_market_type'],
+            opportunity['sell_exchange'], opportunity['sell_market_type'])
+
+
+class OpportunityTableModel(QAbstractTableModel):
+    """Модель таблицы возможностей для QTableView.
+
+    Новый результат скана применяется как разница со строками на экране: удаление исчезнувших,
+    обновление изменившихся и добавление новых по идентичности возможности, не чаще
+    раза в GUI_REFRESH_INTERVAL. Текст ячеек форматируется только для видимых строк в data().
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[Dict] = []
+        self._keys: List[Key] = []
+        self._sort_column: Optional[int] = None
+        self._sort_order = Qt.SortOrder.AscendingOrder
+        self._pending: Optional[List[Dict]] = None
+        self._applied_at = 0.0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._apply_pending)
+        self.stats = {'applies': 0, 'inserted': 0, 'updated': 0, 'removed': 0, 'dropped': 0}
+
+    # --- QAbstractTableModel ---
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section][0]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        opportunity = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            _, field, formatter = COLUMNS[index.column()]
+            return formatter(opportunity[field])
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        if role == Qt.ItemDataRole.BackgroundRole:
+            spread = opportunity['spread_percent']
+            for threshold, color in SPREAD_COLORS:
+                if spread > threshold:
+                    return color
+            return None
+        if role == Qt.ItemDataRole.UserRole:
+            return opportunity[COLUMNS[index.column()][1]]
+        return None
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
+        self._sort_column = column
+        self._sort_order = order
+        self._reorder()
+
+    # --- Обновление ---
+
+    def opportunity(self, row: int) -> Dict:
+        return self._rows[row]
+
+    def set_opportunities(self, opportunities: List[Dict]):
+        """Результат цикла; на экран попадает последний из пришедших за интервал перерисовки"""
+        if self._pending is not None:
+            self.stats['dropped'] += 1
+        self._pending = opportunities
+        if not self._timer.isActive():
+            wait = config.GUI_REFRESH_INTERVAL - (time.monotonic() - self._applied_at)
+            self._timer.start(max(0, int(wait * 1000)))
+
+    def _apply_pending(self):
+        opportunities, self._pending = self._pending, None
+        if opportunities is not None:
+            self.apply(opportunities)
+
+    def apply(self, opportunities: List[Dict]):
+        """Применение результата скана разницей по строкам.
+
+        Изменившиеся строки обновляются на месте, новые добавляются в конец; затем одной сменой
+        раскладки строки сортируются, а исчезнувшие сдвигаются в хвост и удаляются одним диапазоном.
+        Так число уведомлений представлению не зависит от того, насколько разбросаны изменения.
+        """
+        self._applied_at = time.monotonic()
+        self.stats['applies'] += 1
+        incoming: Dict[Key, Dict] = {}
+        for opportunity in opportunities:
+            incoming[opportunity_key(opportunity)] = opportunity
+
+        dead = []
+        changed = []
+        for row, key in enumerate(self._keys):
+            opportunity = incoming.pop(key, None)
+            if opportunity is None:
+                dead.append(row)
+            elif opportunity != self._rows[row]:
+                self._rows[row] = opportunity
+                changed.append(row)
+        if changed:
+            # Одно уведомление на охватывающий диапазон
+            self.dataChanged.emit(self.index(changed[0], 0), self.index(changed[-1], len(COLUMNS) - 1))
+
+        # Оставшиеся в incoming - новые возможности
+        if incoming:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(incoming) - 1)
+            self._keys.extend(incoming)
+            self._rows.extend(incoming.values())
+            self.endInsertRows()
+
+        if dead or ((changed or incoming) and self._sort_column is not None):
+            self._reorder(dead)
+        if dead:
+            first = len(self._rows) - len(dead)
+            self.beginRemoveRows(QModelIndex(), first, len(self._rows) - 1)
+            del self._rows[first:]
+            del self._keys[first:]
+            self.endRemoveRows()
+
+        self.stats['inserted'] += len(incoming)
+        self.stats['updated'] += len(changed)
+        self.stats['removed'] += len(dead)
+
+    def _reorder(self, dead: List[int] = ()):
+        """Сортировка живых строк; строки из dead уходят в хвост в прежнем порядке"""
+        dead_rows = set(dead)
+        alive = [row for row in range(len(self._rows)) if row not in dead_rows] if dead_rows else list(
+            range(len(self._rows)))
+        if self._sort_column is not None:
+            field = COLUMNS[self._sort_column][1]
+            values = [opportunity[field] for opportunity in self._rows]
+            alive.sort(key=values.__getitem__, reverse=self._sort_order == Qt.SortOrder.DescendingOrder)
+        order = alive + list(dead)
+        if order == list(range(len(order))):
+            return
+
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        position = {old: new for new, old in enumerate(order)}
+        self._rows = [self._rows[row] for row in order]
+        self._keys = [self._keys[row] for row in order]
+        # Выделение и текущая ячейка остаются на той же возможности
+        self.changePersistentIndexList(
+            persistent, [self.index(position[index.row()], index.column()) for index in persistent])
+        self.layoutChanged.emit()
+
+    def clear(self):
+        self._pending = None
+        self._timer.stop()
+        self.beginResetModel()
+        self._rows = []
+        self._keys = []
+        self.endResetModel()
\ No newline at end of file
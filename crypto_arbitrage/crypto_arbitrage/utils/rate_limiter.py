@@ -1,29 +1,144 @@
 import asyncio
-from typing import Optional
-from ..config import config
+import time
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional
 from ..utils.logger import logger
 
 
+class Window(NamedTuple):
+    limit: float  # суммарный вес запросов за период
+    period: float  # секунд
+    burst: Optional[float] = None  # емкость корзины (допустимый всплеск); по умолчанию limit
+
+
+class UsageHeader(NamedTuple):
+    name: str  # например X-MBX-USED-WEIGHT-1M
+    period: float  # окно, к которому относится счетчик биржи
+    remaining: bool = False  # в заголовке остаток, а не израсходованный вес
+
+
+class RateLimitExceeded(Exception):
+    """Бюджет запросов исчерпан или биржа ответила 429/418; повторять сразу бессмысленно"""
+
+
+class _Bucket:
+    __slots__ = ('limit', 'period', 'capacity', 'rate', 'tokens', 'updated')
+
+    def __init__(self, window: Window, now: float):
+        self.limit = window.limit
+        self.period = window.period
+        self.capacity = window.burst or window.limit
+        self.rate = window.limit / window.period
+        self.tokens = self.capacity
+        self.updated = now
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, weight: float) -> float:
+        # Вес больше емкости иначе не прошел бы никогда
+        return max(0.0, (min(weight, self.capacity) - self.tokens) / self.rate)
+
+
 class RateLimiter:
-    def __init__(self, max_rate: float = 5):
+    """Корзины токенов по нескольким окнам (в секунду, в минуту) с весами запросов.
+
+    Запросы идут параллельно, пока есть бюджет во всех окнах; ожидающие обслуживаются по очереди.
+    Счетчики бирж из заголовков ответа (X-MBX-USED-WEIGHT-1M) подправляют локальный остаток,
+    а 429/418 блокирует запросы на время Retry-After.
+    """
+
+    def __init__(self, max_rate: float = 5, windows: Optional[Iterable] = None,
+                 weights: Optional[Mapping[str, float]] = None, usage_headers: Iterable = ()):
         self.max_rate = max_rate
-        self.time_period = 1.0  # 1 секунда
-        self._semaphore = asyncio.Semaphore(max_rate)
-        self._last_call_time: Optional[float] = None
+        now = time.monotonic()
+        self._buckets: List[_Bucket] = [_Bucket(Window(*window), now) for window in windows or [(max_rate, 1.0)]]
+        self.weights: Dict[str, float] = dict(weights or {})
+        self.usage_headers = [UsageHeader(*header) for header in usage_headers]
+        self._blocked_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self.stats = {'acquired': 0, 'weight': 0.0, 'waits': 0, 'waited': 0.0, 'rejected': 0,
+                      'resyncs': 0, 'penalties': 0}
 
-    async def __aenter__(self):
-        await self._semaphore.acquire()
-        now = asyncio.get_event_loop().time()
+    def weight(self, url: str) -> float:
+        """Вес запроса по первому совпавшему фрагменту адреса; по умолчанию 1"""
+        for pattern, weight in self.weights.items():
+            if pattern in url:
+                return weight
+        return 1
+
+    def _delay(self, weight: float, now: float) -> float:
+        delay = self._blocked_until - now
+        for bucket in self._buckets:
+            bucket.refill(now)
+            delay = max(delay, bucket.wait_time(weight))
+        return delay
+
+    def _take(self, weight: float):
+        for bucket in self._buckets:
+            bucket.tokens -= weight
+        self.stats['acquired'] += 1
+        self.stats['weight'] += weight
 
-        if self._last_call_time is not None:
-            elapsed = now - self._last_call_time
-            wait_time = max(0.0, self.time_period / self.max_rate - elapsed)
-            if wait_time > 0:
-                logger.debug(f"Rate limiting - waiting {wait_time:.2f}s")
-                await asyncio.sleep(wait_time)
+    def try_acquire(self, weight: float = 1) -> bool:
+        """Взять бюджет без ожидания; False - запрос лучше пропустить"""
+        waiting = self._lock is not None and self._lock.locked()
+        if waiting or self._delay(weight, time.monotonic()) > 0:
+            self.stats['rejected'] += 1
+            return False
+        self._take(weight)
+        return True
 
-        self._last_call_time = asyncio.get_event_loop().time()
+    async def acquire(self, weight: float = 1):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # Замок держится только на время ожидания бюджета, не на время запроса
+        async with self._lock:
+            while True:
+                delay = self._delay(weight, time.monotonic())
+                if delay <= 0:
+                    break
+                logger.debug("Rate limiting - waiting %.2fs", delay)
+                self.stats['waits'] += 1
+                self.stats['waited'] += delay
+                await asyncio.sleep(delay)
+            self._take(weight)
+
+    def sync_usage(self, used: float, period: float):
+        """Остаток окна по счетчику биржи: он учитывает и запросы других клиентов с того же IP"""
+        for bucket in self._buckets:
+            if bucket.period == period:
+                bucket.refill(time.monotonic())
+                bucket.tokens = min(bucket.capacity, bucket.limit - used)
+                self.stats['resyncs'] += 1
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        for header in self.usage_headers:
+            value = headers.get(header.name)
+            if value is None:
+                continue
+            try:
+                value = float(value)
+            except ValueError:
+                continue
+            for bucket in self._buckets:
+                if bucket.period == header.period:
+                    self.sync_usage(bucket.limit - value if header.remaining else value, header.period)
+                    break
+
+    def penalize(self, seconds: float):
+        """Ответ 429/418: никаких запросов до истечения Retry-After"""
+        now = time.monotonic()
+        self._blocked_until = max(self._blocked_until, now + seconds)
+        for bucket in self._buckets:
+            bucket.refill(now)
+            bucket.tokens = min(bucket.tokens, 0.0)
+        self.stats['penalties'] += 1
+        logger.warning(f"Rate limit hit - blocking requests for {seconds:.1f}s")
+
+    async def __aenter__(self):
+        await self.acquire()
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
-        self._semaphore.release()
\ No newline at end of file
+        pass
\ No newline at end of file
@@ -0,0 +1,134 @@
+import atexit
+import gzip
+import json
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from ..config import config
+from .logger import logger
+
+
+Record = Tuple[Dict[str, Any], bytes]  # (заголовок, сырое тело ответа)
+
+
+class ResponseRecorder:
+    """Запись сырых ответов бирж в сжатые сегменты только на дозапись.
+
+    Формат записи: строка JSON-заголовка с полем size, затем size байт тела и перевод строки.
+    Сжатие и запись на диск выполняются фоновым потоком, в цикле событий только постановка в очередь.
+    """
+
+    def __init__(self, directory: str, segment_seconds: float = 300.0, compresslevel: int = 5):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_seconds = segment_seconds
+        self.compresslevel = compresslevel
+        self.cycle = 0.0
+        self.stats = {'records': 0, 'bytes': 0, 'segments': 0, 'dropped': 0}
+
+        self._queue: queue.Queue = queue.Queue(maxsize=1000)
+        self._segment = None
+        self._segment_started = 0.0
+        self._thread = threading.Thread(target=self._write_loop, name='response-recorder', daemon=True)
+        self._thread.start()
+
+    def begin_cycle(self):
+        """Начало цикла сбора цен: записи цикла помечаются временем его старта"""
+        self.cycle = time.time()
+
+    def record(self, source: str, venue: str, market_type: Optional[str], url: Optional[str],
+               body: bytes, params: Optional[Dict] = None):
+        header = {
+            't': time.time(),
+            'cycle': self.cycle,
+            'source': source,
+            'venue': venue,
+            'market_type': market_type,
+            'url': url,
+            'params': params,
+            'size': len(body)
+        }
+        try:
+            self._queue.put_nowait((header, body))
+        except queue.Full:
+            # Диск не успевает: теряем запись, но не тормозим сбор цен
+            self.stats['dropped'] += 1
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    def _open_segment(self, now: float):
+        if self._segment is not None:
+            self._segment.close()
+        name = time.strftime('%Y%m%d-%H%M%S', time.gmtime(now)) + f"-{int(now * 1000) % 1000:03d}.rec.gz"
+        self._segment = gzip.open(self.directory / name, 'ab', compresslevel=self.compresslevel)
+        self._segment_started = now
+        self.stats['segments'] += 1
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            header, body = item
+            try:
+                if self._segment is None or header['t'] - self._segment_started >= self.segment_seconds:
+                    self._open_segment(header['t'])
+                self._segment.write(json.dumps(header).encode() + b'\n' + body + b'\n')
+                if self._queue.empty():
+                    self._segment.flush()
+                self.stats['records'] += 1
+                self.stats['bytes'] += len(body)
+            except Exception as e:
+                logger.error(f"Failed to record response from {header['venue']}: {str(e)}")
+
+
+def read_records(directory: str) -> Iterator[Record]:
+    """Записи всех сегментов каталога по порядку; оборванный хвост сегмента пропускается"""
+    for path in sorted(Path(directory).glob('*.rec.gz')):
+        try:
+            with gzip.open(path, 'rb') as f:
+                while True:
+                    line = f.readline()
+                    if not line:
+                        break
+                    header = json.loads(line)
+                    body = f.read(header['size'])
+                    if len(body) < header['size']:
+                        break
+                    f.read(1)
+                    yield header, body
+        except (EOFError, gzip.BadGzipFile, ValueError) as e:
+            logger.warning(f"Truncated recording segment {path.name}: {str(e)}")
+
+
+def read_cycles(directory: str) -> Iterator[Tuple[float, List[Record]]]:
+    """Записи, сгруппированные по циклам сбора цен"""
+    cycle, records = None, []
+    for header, body in read_records(directory):
+        if records and header['cycle'] != cycle:
+            yield cycle, records
+            records = []
+        cycle = header['cycle']
+        records.append((header, body))
+    if records:
+        yield cycle, records
+
+
+_recorder: Optional[ResponseRecorder] = None
+
+
+def get_recorder() -> Optional[ResponseRecorder]:
+    """Общий регистратор процесса; None, если запись выключена (config.RECORD_DIR не задан)"""
+    global _recorder
+    if _recorder is None and config.RECORD_DIR:
+        _recorder = ResponseRecorder(config.RECORD_DIR, config.RECORD_SEGMENT_SECONDS)
+        atexit.register(_recorder.close)
+    return _recorder
\ No newline at end of file
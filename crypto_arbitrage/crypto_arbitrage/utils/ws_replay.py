@@ -0,0 +1,99 @@
+import asyncio
+import json
+from typing import Any, List, Optional
+from aiohttp import web, ClientSession, WSMsgType
+
+
+class ReplayServer:
+    """Локальная замена WebSocket биржи: проигрывает записанные кадры после подписки клиента"""
+
+    def __init__(self, frames: List[str], host: str = '127.0.0.1', port: int = 0,
+                 interval: float = 0.0, disconnect_after: Optional[int] = None):
+        self.frames = frames
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.disconnect_after = disconnect_after
+        self.received: List[str] = []
+        self.connections = 0
+        self._position = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    @staticmethod
+    def load_frames(path: str) -> List[str]:
+        """Кадры из JSONL-файла: одна строка - одно сообщение биржи"""
+        with open(path, encoding='utf-8') as f:
+            return [line.rstrip('\n') for line in f if line.strip()]
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/"
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get('/', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self.url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+
+        # Кадры идут только после первого сообщения клиента (подписки)
+        first = await ws.receive()
+        if first.type != WSMsgType.TEXT:
+            return ws
+        self.received.append(first.data)
+        reader = asyncio.create_task(self._read(ws))
+
+        sent = 0
+        while self._position < len(self.frames) and not ws.closed:
+            await ws.send_str(self.frames[self._position])
+            self._position += 1
+            sent += 1
+            if self.disconnect_after and sent >= self.disconnect_after:
+                break
+            await asyncio.sleep(self.interval)
+
+        # Имитация обрыва: следующее соединение продолжит с того же места
+        if self.disconnect_after and sent >= self.disconnect_after:
+            await ws.close()
+        else:
+            await reader
+        reader.cancel()
+        return ws
+
+    async def _read(self, ws: web.WebSocketResponse):
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            self.received.append(msg.data)
+            if msg.data == 'ping':
+                await ws.send_str('pong')
+
+
+async def record_frames(url: str, subscribe_messages: List[Any], path: str, count: int = 1000):
+    """Запись кадров реальной биржи в JSONL для последующего проигрывания"""
+    async with ClientSession() as session:
+        async with session.ws_connect(url) as ws:
+            for message in subscribe_messages:
+                await ws.send_str(message if isinstance(message, str) else json.dumps(message))
+            with open(path, 'w', encoding='utf-8') as f:
+                written = 0
+                async for msg in ws:
+                    if msg.type != WSMsgType.TEXT:
+                        continue
+                    f.write(msg.data + '\n')
+                    written += 1
+                    if written >= count:
+                        break
\ No newline at end of file
@@ -8,5 +8,9 @@ setup(
         'aiohttp',
         'PyQt6',
         'ccxt',
+        'numpy',
     ],
+    extras_require={
+        'fast': ['orjson', 'Brotli'],
+    },
 )
\ No newline at end of file
@@ -0,0 +1,62 @@
+"""Исполнение рыночных заявок по стаканам: средневзвешенная цена и частичное исполнение.
+
+Запуск: python -m pytest -q tests (из каталога с setup.py)
+"""
+import numpy as np
+import pytest
+
+from crypto_arbitrage.core.depth import DepthChecker, fill
+from crypto_arbitrage.exchanges.base_exchange import OrderBook
+
+ASKS = np.array([[100.0, 1.0], [101.0, 2.0], [103.0, 1.5]])
+BIDS = np.array([[102.0, 0.5], [101.5, 1.0], [99.0, 4.0]])
+
+
+@pytest.mark.parametrize('amount, expected', [
+    (0.5, (0.5, 50.0)),
+    (1.0, (1.0, 100.0)),
+    (2.5, (2.5, 100.0 + 1.5 * 101.0)),
+    (4.5, (4.5, 100.0 + 2 * 101.0 + 1.5 * 103.0)),
+    # Глубины не хватает: исполняется весь стакан
+    (10.0, (4.5, 100.0 + 2 * 101.0 + 1.5 * 103.0)),
+    (0.0, (0.0, 0.0)),
+])
+def test_fill_quantity(amount, expected):
+    assert fill(ASKS, amount) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('amount, expected', [
+    (50.0, (0.5, 50.0)),
+    (100.0 + 101.0, (2.0, 201.0)),
+    (100.0 + 202.0 + 51.5, (3.5, 353.5)),
+    (1000.0, (4.5, 456.5)),
+])
+def test_fill_notional(amount, expected):
+    assert fill(ASKS, amount, notional=True) == pytest.approx(expected)
+
+
+def test_fill_empty_book():
+    assert fill(np.empty((0, 2)), 1.0) == (0.0, 0.0)
+
+
+def test_evaluate_vwap_limited_by_sell_depth():
+    fees = {'Binance': {'spot': 0.1}, 'Gate': {'spot': 0.2}}
+    opportunity = {'symbol': 'X/USDT', 'buy_exchange': 'Binance', 'buy_market_type': 'spot',
+                   'sell_exchange': 'Gate', 'sell_market_type': 'spot'}
+    buy_book = OrderBook(np.empty((0, 2)), np.array([[100.0, 1.0], [101.0, 5.0]]))
+    sell_book = OrderBook(np.array([[104.0, 1.0], [103.0, 1.0]]), np.empty((0, 2)))
+
+    result = DepthChecker(fees).evaluate(opportunity, buy_book, sell_book, 300.0, 0.5, 10.0)
+
+    # На 300 покупается 1 + 200/101, но стакан продажи принимает только 2
+    assert result['buy_volume'] == pytest.approx(1 + 200 / 101)
+    assert result['sell_volume'] == pytest.approx(2.0)
+    assert result['buy_price'] == pytest.approx(100.5)
+    assert result['sell_price'] == pytest.approx(103.5)
+    assert result['investment'] == pytest.approx(201.0)
+    assert result['spread_percent'] == pytest.approx(3 / 100.5 * 100)
+    assert result['profit_amount'] == pytest.approx(207.0 - 201.0 - 0.201 - 0.414)
+    assert (result['top_buy_price'], result['top_sell_price']) == (100.0, 104.0)
+
+    # Тот же стакан, но спред по VWAP ниже порога
+    assert DepthChecker(fees).evaluate(opportunity, buy_book, sell_book, 300.0, 3.5, 10.0) is None
\ No newline at end of file
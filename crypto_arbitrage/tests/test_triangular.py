@@ -0,0 +1,123 @@
+"""Поиск циклов графа цен против полного перебора циклов из 3 и 4 сделок на небольшой случайной книге.
+
+Запуск: python -m pytest -q tests (из каталога с setup.py)
+"""
+import itertools
+import math
+import random
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from crypto_arbitrage.core.data_processor import PriceBook, PriceBookView
+from crypto_arbitrage.core.triangular import PriceGraph
+
+ASSETS = ('USDT', 'BTC', 'ETH', 'SOL', 'XRP', 'ADA', 'DOT')
+QUOTES = ('USDT', 'BTC', 'ETH')
+VENUES = ('Binance', 'Okx')
+FEES = {'Binance': 0.1, 'Okx': 0.08}
+
+
+def make_book(seed: int) -> PriceBookView:
+    """Пары против котируемых валют с пропусками и шумом цен до 2%: прибыльных циклов много"""
+    rng = random.Random(seed)
+    usd = {asset: 10 ** rng.uniform(-1, 3) for asset in ASSETS}
+    usd['USDT'] = 1.0
+    book = PriceBook(VENUES)
+    for base, quote in itertools.permutations(ASSETS, 2):
+        if quote not in QUOTES or base in QUOTES and QUOTES.index(base) <= QUOTES.index(quote):
+            continue
+        for venue in VENUES:
+            if rng.random() < 0.25:
+                continue
+            mid = usd[base] / usd[quote] * rng.uniform(0.98, 1.02)
+            book.upsert(f'{base}/{quote}', venue, 'spot', mid * 0.999, mid * 1.001)
+    return book.view()
+
+
+def brute_force(prices: PriceBookView, venue: Optional[int] = None) -> Dict[Tuple[str, str, int], Tuple[float, List]]:
+    """Все простые циклы из 3 и 4 сделок: лучший вес для (стартовая валюта, последняя сделка, длина).
+
+    venue None - общий слой, где каждая сделка идет по лучшей цене среди бирж.
+    """
+    edges = []  # (откуда, куда, вес, сделка)
+    for row, symbol in enumerate(prices.symbols):
+        base, quote = symbol.split('/')
+        for side, src, dst in (('buy', quote, base), ('sell', base, quote)):
+            costs = []
+            for column, name in enumerate(prices.venues):
+                if venue is not None and column != venue:
+                    continue
+                keep = math.log1p(-FEES[name] / 100)
+                price = prices.ask[row, column, 0] if side == 'buy' else prices.bid[row, column, 0]
+                if not math.isnan(price):
+                    costs.append(math.log(price) - keep if side == 'buy' else -math.log(price) - keep)
+            if costs:
+                edges.append((src, dst, min(costs), (symbol, side)))
+
+    best = {}
+
+    def walk(start, node, path, visited):
+        for src, dst, cost, step in edges:
+            if src != node:
+                continue
+            legs = path + [(cost, step)]
+            if dst == start and len(legs) >= 3:
+                key = (start, step, len(legs))
+                total = sum(cost for cost, _ in legs)
+                if total < best.get(key, (math.inf,))[0]:
+                    best[key] = (total, [step for _, step in legs])
+            elif dst not in visited and len(legs) < 4:
+                walk(start, dst, legs, visited | {dst})
+
+    for start in QUOTES:
+        walk(start, start, [], {start})
+    return best
+
+
+def searched(graph: PriceGraph, layer) -> Dict[Tuple[str, str, int], Tuple[float, List]]:
+    """Циклы _search слоя в том же виде, что и перебор"""
+    result = {}
+    for total, edges in graph._search(layer, -math.inf, math.inf):
+        steps = [(graph._symbols[layer.row[edge]], 'buy' if layer.buy[edge] else 'sell') for edge in edges]
+        start = graph.assets[layer.src[edges[0]]]
+        result[(start, steps[-1], len(edges))] = (total, steps)
+    return result
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_search_matches_brute_force(seed):
+    prices = make_book(seed)
+    graph = PriceGraph(max_legs=4, max_cycles=1000)
+    graph.refresh(prices, FEES)
+
+    for layer in graph._layers:
+        expected = brute_force(prices, layer.venue)
+        found = searched(graph, layer)
+        # Для каждой стартовой валюты и замыкающей сделки - лучший простой цикл каждой длины
+        assert found.keys() == expected.keys()
+        for key, (total, _) in expected.items():
+            assert found[key][0] == pytest.approx(total, abs=1e-12)
+            assert len(set(found[key][1])) == len(found[key][1])
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_find_cycles_best_first(seed):
+    prices = make_book(seed)
+    graph = PriceGraph(max_legs=4, max_cycles=1000)
+    graph.refresh(prices, FEES)
+    cycles = graph.find_cycles(0.0, 100.0, 1000.0)
+
+    profits = sorted(((math.exp(-total) - 1) * 100 for total, _ in brute_force(prices).values()), reverse=True)
+    assert cycles and profits[0] > 0
+    assert cycles[0]['profit_percent'] == pytest.approx(profits[0])
+    assert [cycle['profit_percent'] for cycle in cycles] == sorted((cycle['profit_percent'] for cycle in cycles),
+                                                                    reverse=True)
+    for cycle in cycles:
+        # Доходность цикла пересчитывается по ценам и комиссиям его сделок
+        rate = 1.0
+        for leg in cycle['legs']:
+            keep = 1 - FEES[leg['exchange']] / 100
+            rate *= keep / leg['price'] if leg['side'] == 'buy' else keep * leg['price']
+        assert cycle['profit_percent'] == pytest.approx((rate - 1) * 100)
+        assert cycle['path'][0] == cycle['path'][-1] and len(set(cycle['path'][:-1])) == len(cycle['legs'])
\ No newline at end of file
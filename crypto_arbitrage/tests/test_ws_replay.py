@@ -0,0 +1,130 @@
+"""Потоковый режим адаптеров против локального сервера, проигрывающего записанные кадры бирж.
+
+Запуск: python -m pytest -q tests (из каталога с setup.py)
+"""
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pytest
+
+from crypto_arbitrage.exchanges import get_exchange
+from crypto_arbitrage.utils.http_client import http_client
+from crypto_arbitrage.utils.ws_replay import ReplayServer
+
+FRAMES = Path(__file__).parent / 'frames'
+TIMEOUT = 10.0
+
+
+def load(name: str) -> List[str]:
+    return ReplayServer.load_frames(str(FRAMES / name))
+
+
+async def replay(exchange: str, frames: List[str], snapshot: Dict[str, Dict],
+                 disconnect_after: Optional[int] = None):
+    """Поток спота адаптера с начальным снимком snapshot до получения всех кадров"""
+    server = ReplayServer(frames, disconnect_after=disconnect_after)
+    await server.start()
+    adapter = get_exchange(exchange)
+    adapter.config = {**adapter.config, 'spot_ws_url': server.url}
+
+    async def get_spot_prices():
+        return {symbol: dict(quote, market_type='spot') for symbol, quote in snapshot.items()}
+
+    adapter.get_spot_prices = get_spot_prices
+    try:
+        await adapter.start_streaming(['spot'])
+        deadline = time.monotonic() + TIMEOUT
+        while adapter.stream_stats['spot']['messages'] < len(frames):
+            assert time.monotonic() < deadline, f"replayed {adapter.stream_stats['spot']}"
+            await asyncio.sleep(0.01)
+    finally:
+        await adapter.stop_streaming()
+        await http_client.close()
+        await server.stop()
+    return adapter, server
+
+
+def quote(original: str, bid: float, ask: float) -> Dict:
+    return {'original': original, 'bid': bid, 'ask': ask, 'bid_volume': 0.0, 'ask_volume': 0.0}
+
+
+@pytest.mark.parametrize('exchange, name, snapshot, expected', [
+    ('binance', 'binance_book_ticker.jsonl',
+     {'BTC/USDT': quote('BTCUSDT', 67000.0, 67000.1), 'ETH/USDT': quote('ETHUSDT', 3500.0, 3500.1)},
+     {'BTC/USDT': (67013.5, 67013.51, 0.8, 2.1), 'ETH/USDT': (3520.98, 3520.99, 9.1, 7.3)}),
+    ('okx', 'okx_bbo_tbt.jsonl',
+     {'BTC/USDT': quote('BTC-USDT', 67000.0, 67000.1)},
+     {'BTC/USDT': (67021.9, 67022.0, 0.5, 0.3)}),
+    ('bybit', 'bybit_orderbook_1.jsonl',
+     {'BTC/USDT': quote('BTCUSDT', 67000.0, 67000.1)},
+     {'BTC/USDT': (67005.15, 67005.2, 0.5, 1.031)}),
+    ('gate', 'gate_book_ticker.jsonl',
+     {'BTC/USDT': quote('BTC_USDT', 67000.0, 67000.1), 'ETH/USDT': quote('ETH_USDT', 3500.0, 3500.1)},
+     {'BTC/USDT': (67000.0, 67000.1, 5.0, 5.0), 'ETH/USDT': (3521.1, 3521.2, 1.5, 2.25)}),
+])
+def test_live_table(exchange, name, snapshot, expected):
+    adapter, server = asyncio.run(replay(exchange, load(name), snapshot))
+
+    table = adapter.live_quotes['spot']
+    assert {symbol: (q['bid'], q['ask'], q['bid_volume'], q['ask_volume']) for symbol, q in table.items()} == expected
+    assert all(q['market_type'] == 'spot' and 'timestamp' in q for q in table.values())
+    # Подписка на все символы снимка одним соединением
+    assert server.connections == 1 and adapter.stream_stats['spot']['connects'] == 1
+    subscribed = json.dumps(adapter._ws_subscribe_messages('spot', [q['original'] for q in snapshot.values()])[0])
+    assert [json.loads(message) for message in server.received[:1]] == [json.loads(subscribed)]
+
+
+def test_reconnect_resubscribes():
+    frames = load('binance_book_ticker.jsonl')
+    snapshot = {'BTC/USDT': quote('BTCUSDT', 67000.0, 67000.1), 'ETH/USDT': quote('ETHUSDT', 3500.0, 3500.1)}
+    # Сервер обрывает соединение после трех кадров; клиент переподключается и подписывается заново
+    adapter, server = asyncio.run(replay('binance', frames, snapshot, disconnect_after=3))
+
+    assert server.connections == 3
+    assert adapter.stream_stats['spot']['connects'] == 3
+    subscriptions = [json.loads(message) for message in server.received if message.startswith('{')]
+    assert len(subscriptions) == 3 and all(message == subscriptions[0] for message in subscriptions)
+    assert sorted(subscriptions[0]['params']) == ['btcusdt@bookTicker', 'ethusdt@bookTicker']
+    assert adapter.live_quotes['spot']['ETH/USDT']['bid'] == 3520.98
+
+
+def test_stale_and_out_of_order_rejected():
+    snapshot = {'BTC/USDT': quote('BTCUSDT', 67000.0, 67000.1), 'ETH/USDT': quote('ETHUSDT', 3500.0, 3500.1)}
+    adapter, _ = asyncio.run(replay('binance', load('binance_book_ticker.jsonl'), snapshot))
+
+    stats = adapter.stream_stats['spot']
+    # BTCUSDT u=400900221 после 400900225 отброшен; пересеченная книга ETHUSDT не применяется
+    assert adapter.live_quotes['spot']['BTC/USDT']['bid'] == 67013.5
+    assert stats['stale'] == 1
+    assert stats['gaps'] == 0
+    assert stats['updates'] == 4
+
+
+def test_sequence_gap_counted():
+    snapshot = {'BTC/USDT': quote('BTC-USDT', 67000.0, 67000.1)}
+    adapter, _ = asyncio.run(replay('okx', load('okx_bbo_tbt.jsonl'), snapshot))
+
+    stats = adapter.stream_stats['spot']
+    # prevSeqId 123465 вместо 123460: разрыв учитывается, но лучшая цена применяется
+    assert stats['gaps'] == 1
+    assert stats['stale'] == 1
+    assert adapter.live_quotes['spot']['BTC/USDT']['bid'] == 67021.9
+
+
+def test_check_sequence():
+    adapter = get_exchange('okx')
+    adapter.stream_stats['spot'] = {'connects': 0, 'messages': 0, 'updates': 0, 'gaps': 0, 'stale': 0}
+    adapter._sequences['spot'] = {}
+
+    assert adapter._ws_check_sequence('spot', 'BTC-USDT', None, None)
+    assert adapter._ws_check_sequence('spot', 'BTC-USDT', 10, None)
+    assert adapter._ws_check_sequence('spot', 'BTC-USDT', 11, 10)
+    assert not adapter._ws_check_sequence('spot', 'BTC-USDT', 11, 10)
+    assert not adapter._ws_check_sequence('spot', 'BTC-USDT', 9, 8)
+    assert adapter._ws_check_sequence('spot', 'BTC-USDT', 15, 13)
+    assert adapter._ws_check_sequence('spot', 'ETH-USDT', 3, 1)
+    assert adapter.stream_stats['spot']['stale'] == 2
+    assert adapter.stream_stats['spot']['gaps'] == 1
\ No newline at end of file